@@ -7,8 +7,8 @@ Compact ROC-based Walking Detection for Raspberry Pi
 
 import time
 import numpy as np
-import tensorflow as tf
 from collections import deque
+from numpy.lib.stride_tricks import sliding_window_view
 import signal
 import sys
 import pickle
@@ -20,6 +20,7 @@ import websockets
 from datetime import datetime, timezone, timedelta
 from enum import Enum
 import warnings
+from walking_runtime import DeadlineScheduler, InferenceRuntime, load_roc_params
 warnings.filterwarnings("ignore")
 
 try:
@@ -33,7 +34,7 @@ DEV_ADDR, PWR_MGMT_1 = 0x68, 0x6B
 ACCEL_REGS = [0x3B, 0x3D, 0x3F]
 GYRO_REGS = [0x43, 0x45, 0x47]
 SENS_ACCEL, SENS_GYRO = 16384.0, 131.0
-MODEL_PATH = 'models/fall_detection.tflite'
+MODEL_PATH = 'models/fall_detection_builtin.tflite'  # 🔧 MODIFIED: Flex 연산 제거 모델 (tflite-runtime 호환)
 SEQ_LENGTH, STRIDE = 150, 5
 USER_ID = "raspberry_pi_01"
 WS_SERVER = "ws://192.168.0.177:8000"
@@ -60,6 +61,17 @@ class ROCWalkingDetector:
         # F1 최적화 가중치
         self.weights = {'acc_mean': 0.25, 'acc_std': 0.25, 'step_freq': 0.35, 'regularity': 0.15}
         
+        # 🆕 재학습 파라미터 (models/roc_params.json) 있으면 대체
+        params = load_roc_params()
+        if params:
+            t = params['thresholds']
+            self.thresholds = {
+                'acc_mean': (t['acc_mean_min'], t['acc_mean_max']), 'acc_std': t['acc_std_min'],
+                'step_freq': (t['step_freq_min'], t['step_freq_max']),
+                'regularity': t['regularity_min'], 'confidence': t['confidence_min']
+            }
+            self.weights.update({k: v for k, v in params['weights'].items() if k in self.weights})
+        
         self.buffer = deque(maxlen=150)  # 1.5초 @ 100Hz
         self.is_walking = False
         self.confidence = 0.0
@@ -84,11 +96,11 @@ class ROCWalkingDetector:
         acc_mean, acc_std = np.mean(acc_data), np.std(acc_data)
         acc_smooth = np.convolve(acc_data, np.ones(5)/5, mode='same')
         
-        # 피크 검출
+        # 피크 검출 (슬라이딩 윈도우 최대값 벡터 연산)
         threshold = np.mean(acc_smooth) + 0.3 * np.std(acc_smooth)
-        peaks = [i for i in range(5, len(acc_smooth)-5) 
-                if acc_smooth[i] > threshold and 
-                acc_smooth[i] == np.max(acc_smooth[i-5:i+6])]
+        center = acc_smooth[5:-5]
+        local_max = sliding_window_view(acc_smooth, 11).max(axis=1)
+        peaks = np.flatnonzero((center > threshold) & (center == local_max)) + 5
         
         # 보행 특징
         step_freq = regularity = 0.0
@@ -153,8 +165,7 @@ class CompactFallDetector:
     def __init__(self):
         self.buffer = deque(maxlen=SEQ_LENGTH)
         self.counter = 0
-        self.interpreter = tf.lite.Interpreter(model_path=MODEL_PATH)
-        self.interpreter.allocate_tensors()
+        self.runtime = InferenceRuntime(MODEL_PATH)  # 지연 로드 (tflite_runtime 우선)
 
     def add_data(self, data):
         self.buffer.append(data)
@@ -165,9 +176,8 @@ class CompactFallDetector:
             return None
         try:
             input_data = np.expand_dims(np.array(list(self.buffer)), axis=0).astype(np.float32)
-            self.interpreter.set_tensor(self.interpreter.get_input_details()[0]['index'], input_data)
-            self.interpreter.invoke()
-            output = self.interpreter.get_tensor(self.interpreter.get_output_details()[0]['index'])
+            self.runtime.set_input(input_data)
+            output = self.runtime.invoke()
             prob = float(output.flatten()[0])
             return {'prediction': 1 if prob >= 0.5 else 0, 'probability': prob}
         except:
@@ -272,10 +282,11 @@ def main():
     
     threading.Thread(target=ws_thread, daemon=True).start()
     
-    # 초기 버퍼 채우기
+    # 초기 버퍼 채우기 (절대 데드라인 100Hz)
+    scheduler = DeadlineScheduler(rate=100)
     for _ in range(SEQ_LENGTH):
+        scheduler.wait()
         fall_detector.add_data(sensor.get_data())
-        time.sleep(0.01)
     
     print("🎯 ROC detection started")
     
@@ -285,6 +296,7 @@ def main():
     
     while True:
         try:
+            scheduler.wait()
             data = sensor.get_data()
             current_time = time.time()
             
@@ -323,12 +335,12 @@ def main():
             
             # 상태 출력 (10초마다)
             if current_time - last_print >= 10:
+                timing = scheduler.get_stats()
                 print(f"📊 {state_manager.state.value}, ROC Walk: {is_walking}, "
-                      f"Conf: {confidence:.3f}, WS: {data_sender.connected}")
+                      f"Conf: {confidence:.3f}, WS: {data_sender.connected}, "
+                      f"Jitter p99: {timing.get('jitter_p99_ms', 0):.2f}ms, Missed: {timing['missed_slots']}")
                 last_print = current_time
             
-            time.sleep(0.01)  # 100Hz
-            
         except Exception as e:
             print(f"Error: {e}")
             time.sleep(1)
@@ -7,21 +7,26 @@ Optimized Walking Detection System for Raspberry Pi
 """
 
 import time
+import math
 import numpy as np
-import tensorflow as tf
 from collections import deque
+from numpy.lib.stride_tricks import sliding_window_view
 import signal
 import sys
-import pickle
+import hashlib
 import os
 import json
+import struct
+import zlib
 import threading
 import asyncio
-import websockets
+import bisect
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-import queue
 from enum import Enum
 import warnings
+# 🔧 MODIFIED: Compact_ROC_Walking.py와 공유하는 런타임 헬퍼/설정은 walking_runtime.py (여기서 재노출)
+from walking_runtime import ROC_PARAMS_PATH, DeadlineScheduler, InferenceRuntime, _current_rss_mb, load_roc_params
 
 warnings.filterwarnings("ignore")
 
@@ -40,8 +45,32 @@ GYRO_REGISTERS = [0x43, 0x45, 0x47]
 SENSITIVE_ACCEL = 16384.0
 SENSITIVE_GYRO = 131.0
 
-MODEL_PATH = 'models/fall_detection.tflite'
+# 🆕 MPU6050 버스트/FIFO 읽기 설정
+SENSOR_READ_MODE = 'burst'  # 'word' (레지스터별 12회 읽기) | 'burst' (14바이트 1회) | 'fifo' (하드웨어 FIFO 배치)
+ACCEL_XOUT_H = 0x3B         # 가속도(6) + 온도(2) + 자이로(6) 연속 레지스터 시작
+BURST_LENGTH = 14
+SMPLRT_DIV = 0x19
+MPU_CONFIG = 0x1A
+FIFO_EN = 0x23
+INT_STATUS = 0x3A
+USER_CTRL = 0x6A
+FIFO_COUNT_H = 0x72
+FIFO_R_W = 0x74
+FIFO_ACCEL_GYRO = 0x78      # FIFO_EN: XG/YG/ZG/ACCEL
+FIFO_ENABLE_BIT = 0x40      # USER_CTRL
+FIFO_RESET_BIT = 0x04       # USER_CTRL
+FIFO_OFLOW_BIT = 0x10       # INT_STATUS
+FIFO_SAMPLE_BYTES = 12      # 가속도 6 + 자이로 6
+# 🔧 MODIFIED: 샘플마다 폴링하지 않고 약 N개가 쌓일 때까지 잠든 뒤 한 번에 읽기 (INT_STATUS/FIFO_COUNT 확인 비용을 N개에 분산)
+FIFO_BATCH_SAMPLES = 5      # = STRIDE (50ms 지연, 1024바이트 FIFO 용량의 6%)
+I2C_BLOCK_MAX = 32          # SMBus 블록 읽기 최대 길이
+
+# 🔧 MODIFIED: Flex 연산을 내장 연산으로 바꾼 모델 (tools/convert_fall_model.py) → tflite-runtime에서 실행 가능
+MODEL_PATH = 'models/fall_detection_builtin.tflite'
 SCALERS_DIR = 'scalers'
+# 🔧 MODIFIED: 실행 중 생성하는 캐시는 소스 트리 밖 (XDG 캐시 디렉터리)에 저장
+CACHE_DIR = os.path.join(os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'walkerholic')
+SCALER_CACHE_PATH = os.path.join(CACHE_DIR, 'fused_scaler.npz')  # 🆕 접힌 스케일러 파라미터 캐시
 SEQ_LENGTH = 150
 STRIDE = 5
 SAMPLING_RATE = 100
@@ -58,12 +87,363 @@ RECONNECT_DELAY = 5.0      # 재연결 대기 시간
 MAX_RECONNECT_ATTEMPTS = 10  # 최대 재연결 시도
 # 🆕 낙상 감지 임계값 추가
 FALL_DETECTION_THRESHOLD = 0.7  # 낙상 감지 임계값을 0.7로 상향 조정
+# 🆕 피크 검출 모드: 'streaming' (샘플당 1개 인덱스 검사) | 'batch' (전체 윈도우 벡터 연산)
+PEAK_DETECTION_MODE = 'streaming'
+# 🆕 수집/추론 스레드 분리: 소비자가 밀려도 덮어쓰지 않도록 링버퍼에 여유 구간 확보
+SAMPLE_BUFFER_HEADROOM = SAMPLING_RATE  # 소비자 허용 지연 (1초)
+ACQUISITION_RT_PRIORITY = 50            # 수집 스레드 SCHED_FIFO 우선순위 (root 필요, 실패 시 기본값)
+# 🆕 낙상 추론 모드: 'windowed' (stride마다 150샘플 윈도우 전체 추론) | 'streaming' (LSTM 상태 유지, 새 샘플만 처리)
+FALL_INFERENCE_MODE = 'streaming'
+STREAMING_MODEL_PATH = 'models/fall_detection_stream.npz'  # tools/streaming_fall_model.py로 생성
+STREAMING_FALL_STATES = SEQ_LENGTH // STRIDE  # 엇갈린 LSTM 상태 수 (SEQ_LENGTH의 약수, 30 = 윈도우 추론과 동일, 작을수록 문맥 근사)
+# 🆕 낙상 모델 실행 게이트: 'gate' (움직임 이벤트/하트비트 때만 실행) | 'shadow' (항상 실행, 게이트 누락만 집계) | 'off'
+# (streaming 모드에서는 건너뛴 stride도 LSTM 상태에 반영 → 게이트는 출력 계산만 생략, 재실행 시 윈도우 재계산 없음)
+FALL_GATE_MODE = 'gate'
+FALL_GATE_STAGES = ('spike', 'free_fall', 'jerk', 'tilt')  # 캐스케이드 1단계 검사 항목
+GATE_SPIKE_G = 1.8          # 가속도 크기 급증 (g)
+GATE_FREE_FALL_G = 0.5      # 자유낙하 구간 (g)
+GATE_JERK_G_PER_S = 80.0    # 가속도 크기 변화율 (g/s)
+GATE_TILT_DEG = 20.0        # 이전 검사 대비 중력 방향(자세) 변화 (도)
+FALL_GATE_HEARTBEAT = 2.0   # 이벤트가 없어도 모델을 실행하는 최대 간격 (초)
+
+# 🆕 IMU 전송 형식: 'binary' (접속 시 협상, 서버 미지원 시 JSON 유지) | 'json'
+FRAME_FORMAT = 'binary'
+IMU_FRAME_FORMAT = 'imu_frame_v1'   # 서버 backend/app/core/imu_frame.py와 같은 형식 이름
+FRAME_SAMPLE_ENCODING = 'float32'   # 'float32' (JSON과 같은 값) | 'int16' (±FRAME_INT16_RANGE 양자화, 절반 크기)
+FRAME_INT16_RANGE = 8.0             # int16 양자화 범위 (정규화된 값 기준)
+FRAME_BATCH_SIZE = SEND_RATE        # 바이너리 메시지당 샘플 수 (1초 분량)
+FRAME_MAX_DELAY = 1.0               # 배치가 덜 찼어도 전송하는 최대 대기 (초)
+FRAME_NEGOTIATION_TIMEOUT = 3.0     # 협상 응답 대기 (초)
+FRAME_HEADER = struct.Struct('<4sBBHdfBf')  # magic, version, flags, count, base_time, scale, state, confidence
+FRAME_STATE_CODES = {'Daily': 0, 'Walking': 1, 'Fall': 2}
+# 🆕 오프라인 전송 스풀 (연결 끊김 동안 IMU/낙상을 디스크에 보관 → 재연결 후 순서대로 재전송)
+SPOOL_ENABLED = True
+SPOOL_DIR = 'spool'
+SPOOL_MAX_BYTES = 64 * 2**20     # 전체 용량 상한 (초과 시 가장 오래된 세그먼트 삭제)
+SPOOL_SEGMENT_BYTES = 2**20      # 세그먼트 파일 크기
+SPOOL_FLUSH_INTERVAL = 5.0       # 일괄 기록 주기 (초, SD 카드 쓰기 횟수 절감)
+SPOOL_FSYNC_POLICY = 'batch'     # 'always' (레코드마다 기록+fsync) | 'batch' (일괄 기록마다 fsync) | 'never'
+SPOOL_REPLAY_RATE = 20.0         # 재전송 메시지/초 상한 (실시간 전송이 항상 우선)
+# 🆕 보행 IMU 업로드 모드: 'fixed' (SEND_RATE 고정 간격) | 'deadband' (서버 선형 보간 복원 오차가 허용 범위를 넘을 때만 전송)
+IMU_UPLOAD_MODE = 'deadband'
+DEADBAND_ERROR = 0.5             # 축별 최대 복원 오차 (정규화된 값 기준)
+DEADBAND_MAX_INTERVAL = 1.0      # 변화가 없어도 샘플을 보내는 최대 간격 (초)
+# 🆕 단계별 실행 시간 계측 (롤링 히스토그램) + 로컬 통계 엔드포인트 (GET http://127.0.0.1:STATS_HTTP_PORT/stats)
+METRICS_ENABLED = True
+METRICS_WINDOW = 60.0            # 롤링 히스토그램 구간 (초)
+METRICS_SLICES = 6               # 구간을 나눈 조각 수 (조각 단위로 오래된 기록 폐기)
+STATS_HTTP_HOST = '127.0.0.1'    # 로컬에서만 접근
+STATS_HTTP_PORT = 8089           # None: 엔드포인트 비활성
+# 🆕 빠른 시작 설정
+STARTUP_MODE = 'parallel'        # 'parallel' (센서/낙상 모델/전송 계층 동시 초기화) | 'sequential'
+BUFFER_SNAPSHOT_PATH = '/dev/shm/walkerholic_buffer.npz'  # tmpfs: 프로세스 재시작 시 복원 (재부팅 시 삭제), None: 비활성
+BUFFER_SNAPSHOT_INTERVAL = 1.0   # 스냅샷 기록 주기 (초)
+BUFFER_SNAPSHOT_MAX_AGE = 5.0    # 이보다 오래된 스냅샷은 복원하지 않음 (초)
 
 class UserState(Enum):
     DAILY = "Idle"
     WALKING = "Walking"
     FALL = "Fall"
 
+class SampleRingBuffer:
+    """
+    6축 IMU 샘플 + 타임스탬프 공유 링버퍼 (사전 할당, float32)
+    - 보행/낙상 감지기가 하나의 샘플 이력을 공유 (deque 3개 → 버퍼 1개)
+    - 같은 샘플을 i와 i+capacity에 기록하여 최근 n개 윈도우를 복사 없이 연속 뷰로 제공
+    - 타임스탬프는 epoch 정밀도 유지를 위해 float64
+    - 단일 생산자: 샘플 기록 후 count를 갱신하므로 소비자는 락 없이 count 스냅샷 기준으로 읽음
+    """
+
+    def __init__(self, capacity=SEQ_LENGTH, channels=6):
+        self.capacity = capacity
+        self.channels = channels
+        self._data = np.zeros((2 * capacity, channels), dtype=np.float32)
+        self._times = np.zeros(2 * capacity)
+        self.count = 0  # 누적 샘플 수
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def is_full(self):
+        return self.count >= self.capacity
+
+    def append(self, sample, timestamp):
+        idx = self.count % self.capacity
+        self._data[idx] = self._data[idx + self.capacity] = sample
+        self._times[idx] = self._times[idx + self.capacity] = timestamp
+        self.count += 1
+
+    def _span(self, n, end=None):
+        end = self.count if end is None else end
+        available = min(end, self.capacity)
+        n = available if n is None else min(n, available)
+        stop = (end - 1) % self.capacity + self.capacity + 1
+        return stop - n, stop
+
+    def window(self, n=None, end=None):
+        """최근 n개 샘플 (n, channels) 연속 뷰 - 복사 없음 (end: 누적 샘플 번호 기준 스냅샷)"""
+        start, stop = self._span(n, end)
+        return self._data[start:stop]
+
+    def times(self, n=None, end=None):
+        """최근 n개 타임스탬프 뷰 - 복사 없음"""
+        start, stop = self._span(n, end)
+        return self._times[start:stop]
+
+    def sample_at(self, seq):
+        """누적 샘플 번호 seq의 샘플과 타임스탬프"""
+        idx = seq % self.capacity
+        return self._data[idx], self._times.item(idx)
+
+    def is_intact(self, end, n):
+        """end 스냅샷의 최근 n개가 아직 생산자에게 덮어써지지 않았는지 확인"""
+        return self.count - end <= self.capacity - n
+
+    def latest(self):
+        """가장 최근 샘플과 타임스탬프"""
+        idx = (self.count - 1) % self.capacity
+        return self._data[idx], self._times.item(idx)
+
+    def save_snapshot(self, path, n=None):
+        """🆕 최근 n개 샘플/타임스탬프를 파일로 저장 (임시 파일 기록 후 교체 → 읽는 쪽은 항상 완전한 파일)"""
+        end = self.count
+        if not end:
+            return False
+        data = self.window(n, end).copy()
+        times = self.times(n, end).copy()
+        if not self.is_intact(end, len(data)):
+            return False  # 복사 중 생산자에게 덮어써짐 → 다음 주기에 기록
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            np.savez(f, data=data, times=times)
+        os.replace(temp_path, path)
+        return True
+
+    def restore_snapshot(self, path, max_age, now=None):
+        """🆕 빈 버퍼를 스냅샷으로 채움 (마지막 샘플이 max_age초 이내일 때만) → 복원한 샘플 수"""
+        if self.count:
+            return 0
+        try:
+            with np.load(path) as snapshot:
+                data, times = snapshot['data'], snapshot['times']
+        except (OSError, KeyError, ValueError):
+            return 0
+        if data.ndim != 2 or data.shape[1] != self.channels or len(data) != len(times) or not len(data):
+            return 0
+        age = (time.time() if now is None else now) - times[-1]
+        if not 0 <= age <= max_age or np.any(np.diff(times) <= 0):
+            return 0
+        for sample, timestamp in zip(data[-self.capacity:], times[-self.capacity:]):
+            self.append(sample, timestamp)
+        return self.count
+
+class StreamingWindowStats:
+    """
+    슬라이딩 윈도우 스트리밍 통계 엔진
+    - 누적합/제곱합으로 평균·표준편차를 샘플당 O(1) 갱신
+    - 5포인트 이동평균을 증분 계산 (np.convolve(..., mode='same')과 동일한 결과)
+    - 이중 기록(mirror) 링버퍼로 윈도우를 복사 없이 연속 뷰로 제공
+    - 파생 신호(가속도 크기)만 보관, 원본 샘플/타임스탬프는 SampleRingBuffer가 관리
+    """
+
+    def __init__(self, size=150, smooth_width=5):
+        if smooth_width % 2 == 0 or smooth_width > size:
+            raise ValueError("smooth_width must be odd and not larger than size")
+
+        self.size = size
+        self.smooth_width = smooth_width
+        self._half = smooth_width // 2
+
+        # 같은 값을 i와 i+size에 기록 → 어느 시점이든 [start:start+size]가 연속 윈도우
+        self._acc = np.zeros(2 * size)
+        self._smooth = np.zeros(2 * size)
+        self._recent = deque(maxlen=smooth_width)  # 이동평균용 최근 원본 값
+
+        self.count = 0  # 누적 샘플 수
+        self._sum = 0.0
+        self._sumsq = 0.0
+        # 윈도우 내부(가장자리 제외) 이동평균 값의 누적합/제곱합
+        self._smooth_sum = 0.0
+        self._smooth_sumsq = 0.0
+        self._edges = None
+        self._edges_count = -1
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+    def is_full(self):
+        return self.count >= self.size
+
+    def push(self, value):
+        """새 샘플 추가 (상각 O(1))"""
+        value = float(value)
+        size, half = self.size, self._half
+        idx = self.count % size
+
+        if self.count >= size:
+            old = self._acc.item(idx)
+            self._sum -= old
+            self._sumsq -= old * old
+
+        self._acc[idx] = self._acc[idx + size] = value
+        self._sum += value
+        self._sumsq += value * value
+        self._recent.append(value)
+        self.count += 1
+
+        # 중심 샘플(count-1-half)의 이동평균이 이번 샘플로 완성됨
+        center = self.count - 1 - half
+        if center >= half:
+            smooth = sum(self._recent) / self.smooth_width
+            pos = center % size
+            self._smooth[pos] = self._smooth[pos + size] = smooth
+            self._smooth_sum += smooth
+            self._smooth_sumsq += smooth * smooth
+
+            # 윈도우 내부 구간을 벗어난 이동평균 값 제거
+            leaving = center - (size - 2 * half)
+            if leaving >= half:
+                old = self._smooth.item(leaving % size)
+                self._smooth_sum -= old
+                self._smooth_sumsq -= old * old
+
+        # 한 바퀴마다 누적 오차 재동기화 (상각 O(1))
+        if self.count % size == 0:
+            self._resync()
+
+    def _resync(self):
+        acc = self.values()
+        self._sum = float(np.sum(acc))
+        self._sumsq = float(np.dot(acc, acc))
+        if self.is_full():
+            half = self._half
+            interior = self._window(self._smooth)[half:self.size - half]
+            self._smooth_sum = float(np.sum(interior))
+            self._smooth_sumsq = float(np.dot(interior, interior))
+
+    def _window(self, ring):
+        if self.count < self.size:
+            return ring[:self.count]
+        start = self.count % self.size
+        return ring[start:start + self.size]
+
+    def values(self):
+        """원본 신호 윈도우 (읽기 전용 뷰)"""
+        return self._window(self._acc)
+
+    def mean(self):
+        n = len(self)
+        return self._sum / n if n else 0.0
+
+    def std(self):
+        n = len(self)
+        if not n:
+            return 0.0
+        mean = self._sum / n
+        return math.sqrt(max(self._sumsq / n - mean * mean, 0.0))
+
+    def _edge_values(self):
+        """mode='same' 제로 패딩 가장자리 값 (앞뒤 half개씩, 샘플당 한 번만 계산)"""
+        if self._edges_count != self.count:
+            half, width = self._half, self.smooth_width
+            first = self.values()[:2 * half].tolist()
+            last = list(self._recent)[-2 * half:]
+            head = [sum(first[:p + half + 1]) / width for p in range(half)]
+            tail = [sum(last[p:]) / width for p in range(half)]
+            self._edges = (head, tail)
+            self._edges_count = self.count
+        return self._edges
+
+    def smoothed(self):
+        """5포인트 이동평균 윈도우 (윈도우가 가득 찼을 때만 유효한 뷰)"""
+        view = self._window(self._smooth)
+        head, tail = self._edge_values()
+        half = self._half
+        view[:half] = head
+        view[self.size - half:] = tail
+        return view
+
+    def smoothed_mean_std(self):
+        """이동평균 신호의 평균/표준편차 (가장자리 포함, O(1))"""
+        head, tail = self._edge_values()
+        edges = head + tail
+        total = self._smooth_sum + sum(edges)
+        total_sq = self._smooth_sumsq + sum(e * e for e in edges)
+        mean = total / self.size
+        return mean, math.sqrt(max(total_sq / self.size - mean * mean, 0.0))
+
+class PeakDetector:
+    """
+    이동평균 신호 피크 검출기
+    - 규칙: signal[i] > threshold 이고 signal[i-window:i+window+1]의 최대값
+    - batch: 슬라이딩 윈도우 최대값으로 전체 윈도우를 한 번에 벡터 검출
+    - streaming: 새로 확정된 인덱스 하나와 가장자리 인덱스만 샘플마다 검사
+    - 두 모드 모두 윈도우 내 위치 인덱스(np.ndarray)를 반환 → time_data[peaks]로 바로 사용
+    """
+
+    def __init__(self, window=5, edge=2, mode='streaming'):
+        if mode not in ('streaming', 'batch'):
+            raise ValueError(f"Unknown peak detection mode: {mode}")
+        self.window = window
+        self.edge = edge  # 매 샘플 값이 바뀌는 이동평균 가장자리 샘플 수
+        self.mode = mode
+        self._candidates = deque()  # 확정된 국소 최대값의 절대 샘플 번호
+        self._last_count = None
+
+    def find(self, signal, threshold, count=None):
+        """설정된 모드로 피크 검출 (streaming은 누적 샘플 수 count 필요)"""
+        if self.mode == 'batch' or count is None:
+            return self.detect(signal, threshold)
+        return self.update(signal, threshold, count)
+
+    def detect(self, signal, threshold):
+        """배치 모드: 전체 윈도우 벡터 검출"""
+        w = self.window
+        if len(signal) < 2 * w + 1:
+            return np.empty(0, dtype=np.intp)
+        local_max = sliding_window_view(signal, 2 * w + 1).max(axis=1)
+        center = signal[w:len(signal) - w]
+        return np.flatnonzero((center > threshold) & (center == local_max)) + w
+
+    def update(self, signal, threshold, count):
+        """스트리밍 모드: 윈도우가 한 샘플 이동할 때마다 호출"""
+        n, w, e = len(signal), self.window, self.edge
+        # 비교 구간이 가장자리에 닿지 않는 위치는 값이 더 이상 바뀌지 않음
+        stable_lo, stable_hi = w + e, n - w - e
+        if stable_hi <= stable_lo:
+            return self.detect(signal, threshold)
+
+        offset = count - n  # 윈도우 첫 샘플의 절대 번호
+        if self._last_count is None or count != self._last_count + 1:
+            self._rebuild(signal, offset, stable_lo, stable_hi)
+        else:
+            # 새로 확정된 인덱스 하나만 검사
+            i = stable_hi - 1
+            value = signal.item(i)
+            if value == max(signal[i - w:i + w + 1].tolist()):
+                self._candidates.append(offset + i)
+        self._last_count = count
+
+        while self._candidates and self._candidates[0] < offset + stable_lo:
+            self._candidates.popleft()
+
+        peaks = self._edge_peaks(signal, threshold, w, stable_lo)
+        peaks.extend(c - offset for c in self._candidates if signal.item(c - offset) > threshold)
+        peaks.extend(self._edge_peaks(signal, threshold, stable_hi, n - w))
+        return np.array(peaks, dtype=np.intp)
+
+    def _rebuild(self, signal, offset, stable_lo, stable_hi):
+        w = self.window
+        local_max = sliding_window_view(signal[stable_lo - w:stable_hi + w], 2 * w + 1).max(axis=1)
+        center = signal[stable_lo:stable_hi]
+        self._candidates = deque((np.flatnonzero(center == local_max) + stable_lo + offset).tolist())
+
+    def _edge_peaks(self, signal, threshold, lo, hi):
+        w = self.window
+        values = signal[lo - w:hi + w].tolist()
+        return [lo + k for k in range(hi - lo)
+                if values[k + w] > threshold and values[k + w] == max(values[k:k + 2 * w + 1])]
+
 class OptimizedROCWalkingDetector:
     """
     과학적 ROC 분석 기반 + 라즈베리파이 최적화 보행 감지기
@@ -72,7 +452,8 @@ class OptimizedROCWalkingDetector:
     - CPU 최적화된 특징 계산
     """
     
-    def __init__(self):
+    def __init__(self, sample_buffer=None, clock=time.time, roc_params_path=ROC_PARAMS_PATH):
+        self._clock = clock  # 전용 버퍼 사용 시 샘플 시각 (재생 시 주입)
         # 🎯 ROC 분석 기반 최적화된 임계값 (KFall 데이터셋)
         self.ROC_THRESHOLDS = {
             'acc_mean_min': 0.918,      # acc_range: AUC 0.843
@@ -92,10 +473,24 @@ class OptimizedROCWalkingDetector:
             'regularity': 0.15          # 규칙성
         }
         
+        # 🆕 거주자 데이터로 재학습한 파라미터가 있으면 기본값 대체 (알 수 없는 키는 무시)
+        self.roc_params = load_roc_params(roc_params_path)
+        if self.roc_params:
+            for target, loaded in ((self.ROC_THRESHOLDS, self.roc_params['thresholds']),
+                                   (self.ROC_WEIGHTS, self.roc_params['weights'])):
+                target.update({k: v for k, v in loaded.items() if k in target})
+        
         # 메모리 최적화: 1.5초 버퍼 (150샘플 @ 100Hz)
         self.buffer_size = 150
-        self.acc_buffer = deque(maxlen=self.buffer_size)
-        self.time_buffer = deque(maxlen=self.buffer_size)
+        # 공유 샘플 버퍼 (없으면 가속도 3축 전용 버퍼 생성)
+        if sample_buffer is None:
+            sample_buffer = SampleRingBuffer(self.buffer_size, channels=3)
+        self.sample_buffer = sample_buffer
+        # 스트리밍 통계 엔진: 샘플당 O(1) 평균/표준편차/이동평균 갱신
+        self.window_stats = StreamingWindowStats(self.buffer_size)
+        self.peak_detector = PeakDetector(
+            window=5, edge=self.window_stats.smooth_width // 2, mode=PEAK_DETECTION_MODE
+        )
         
         # 상태 변수
         self.is_walking = False
@@ -108,42 +503,68 @@ class OptimizedROCWalkingDetector:
         self.last_state_change = 0
         self.walking_start_time = None
         
+        # 🆕 소비 위치 추적 (수집 스레드와 분리된 자체 일정으로 처리)
+        self.processed_count = self.sample_buffer.count
+        self.dropped_samples = 0  # 처리 전에 덮어써져 건너뛴 샘플 수
+        self.max_lag = 0          # 최대 처리 지연 (샘플)
+        
         print("🎯 Optimized ROC Walking Detector initialized")
-        print(f"📊 Based on KFall dataset: 32 subjects, 21,696 windows")
-        print(f"⚡ F1 Score: 0.641, Memory optimized: {self.buffer_size} samples")
+        if self.roc_params:
+            print(f"📊 ROC parameters: {roc_params_path} ({self.roc_params.get('windows', '?')} windows, "
+                  f"F1 Score: {self.roc_params.get('f1', float('nan')):.3f})")
+        else:
+            print(f"📊 Based on KFall dataset: 32 subjects, 21,696 windows")
+            print(f"⚡ F1 Score: 0.641, Memory optimized: {self.buffer_size} samples")
 
     def add_data(self, acc_x, acc_y, acc_z):
-        """센서 데이터 추가 및 실시간 보행 감지"""
-        acc_magnitude = np.sqrt(acc_x**2 + acc_y**2 + acc_z**2)
-        current_time = time.time()
+        """센서 데이터 추가 및 실시간 보행 감지 (전용 버퍼 사용 시)"""
+        self.sample_buffer.append((acc_x, acc_y, acc_z), self._clock())
+        return self.update()
+
+    def update(self):
+        """샘플 버퍼에 새로 들어온 샘플을 순서대로 처리하여 실시간 보행 감지"""
+        buffer = self.sample_buffer
+        count = buffer.count
+        lag = count - self.processed_count
+        self.max_lag = max(self.max_lag, lag)
         
-        self.acc_buffer.append(acc_magnitude)
-        self.time_buffer.append(current_time)
+        # 분석 윈도우가 덮어써지기 전인 가장 오래된 샘플부터 처리
+        oldest = count - buffer.capacity + self.buffer_size - 1
+        if self.processed_count < oldest:
+            self.dropped_samples += oldest - self.processed_count
+            self.processed_count = oldest
         
-        # 충분한 데이터가 있으면 ROC 기반 분석
-        if len(self.acc_buffer) >= self.buffer_size:
-            self._roc_analysis()
+        for seq in range(self.processed_count, count):
+            sample, timestamp = buffer.sample_at(seq)
+            acc_x, acc_y, acc_z = sample[:3].tolist()
+            acc_magnitude = math.sqrt(acc_x**2 + acc_y**2 + acc_z**2)
+            
+            self.window_stats.push(acc_magnitude)
+            
+            # 충분한 데이터가 있으면 ROC 기반 분석
+            if self.window_stats.is_full():
+                self._roc_analysis(seq + 1, timestamp)
+        self.processed_count = count
         
         return self.is_walking, self.confidence
 
-    def _roc_analysis(self):
-        """ROC 분석 기반 보행 감지 (CPU 최적화)"""
-        current_time = time.time()
-        
-        # 데이터 변환 (한 번만)
-        acc_data = np.array(self.acc_buffer)
-        time_data = np.array(self.time_buffer)
+    def _roc_analysis(self, end, current_time):
+        """ROC 분석 기반 보행 감지 (CPU 최적화) - end: 분석 윈도우 끝 샘플 번호"""
+        # 스트리밍 엔진에서 증분 갱신된 값 사용 (배열 재생성 없음)
+        stats = self.window_stats
+        time_data = self.sample_buffer.times(self.buffer_size, end)
         
         # 1. 이동평균 필터링 (5포인트)
-        acc_smooth = np.convolve(acc_data, np.ones(5)/5, mode='same')
+        acc_smooth = stats.smoothed()
         
         # 2. 기본 특징 계산
-        acc_mean = np.mean(acc_data)
-        acc_std = np.std(acc_data)
+        acc_mean = stats.mean()
+        acc_std = stats.std()
         
         # 3. 효율적 피크 검출
-        threshold = np.mean(acc_smooth) + 0.3 * np.std(acc_smooth)
-        peaks = self._fast_peak_detection(acc_smooth, threshold)
+        smooth_mean, smooth_std = stats.smoothed_mean_std()
+        threshold = smooth_mean + 0.3 * smooth_std
+        peaks = self.peak_detector.find(acc_smooth, threshold, stats.count)
         
         # 4. 보행 주기 및 규칙성 계산
         step_frequency, regularity = self._calculate_gait_features(time_data, peaks)
@@ -166,18 +587,6 @@ class OptimizedROCWalkingDetector:
             'confidence': confidence_score
         }
 
-    def _fast_peak_detection(self, acc_smooth, threshold):
-        """CPU 최적화된 피크 검출"""
-        peaks = []
-        window = 5
-        
-        for i in range(window, len(acc_smooth) - window):
-            if (acc_smooth[i] > threshold and 
-                acc_smooth[i] == np.max(acc_smooth[i-window:i+window+1])):
-                peaks.append(i)
-        
-        return peaks
-
     def _calculate_gait_features(self, time_data, peaks):
         """보행 특징 계산 (주기 및 규칙성)"""
         if len(peaks) < 2:
@@ -266,14 +675,15 @@ class OptimizedROCWalkingDetector:
 
 class OptimizedStateManager:
     """Optimized state manager"""
-    def __init__(self):
+    def __init__(self, clock=time.time):
+        self._clock = clock  # 🆕 재생 하네스에서 샘플 시각 주입
         self.current_state = UserState.DAILY
-        self.state_start_time = time.time()
+        self.state_start_time = clock()
         self.last_fall_time = None
         self.fall_cooldown = FALL_COOLDOWN_TIME  # 🔧 MODIFIED: 쿨다운 시간 증가
 
     def update_state(self, is_walking, fall_detected):
-        current_time = time.time()
+        current_time = self._clock()
         
         # 낙상 감지 (최우선)
         if fall_detected and self._can_detect_fall():
@@ -306,99 +716,819 @@ class OptimizedStateManager:
     def _can_detect_fall(self):
         if self.last_fall_time is None:
             return True
-        return time.time() - self.last_fall_time > self.fall_cooldown
+        return self._clock() - self.last_fall_time > self.fall_cooldown
 
     def should_send_data(self):
         return self.current_state != UserState.DAILY
 
+class DeadbandCompressor:
+    """
+    🆕 적응형 데드밴드 업로드 압축 (swing-door 구간 선형 근사)
+    - 서버는 받은 샘플 사이를 선형 보간해 복원 (backend/app/core/deadband.py)
+    - 마지막 전송 샘플에서 현재 샘플까지의 직선이 사이 샘플 모두를 축별 DEADBAND_ERROR 이내로
+      지나는 동안은 전송하지 않음 → 허용 기울기 범위를 샘플당 O(1)로 좁혀 가며 판정
+    - 움직임이 클수록 자주, 정지/등속 구간은 DEADBAND_MAX_INTERVAL마다 전송 → 업로드 주기가 움직임 에너지를 따라감
+    - 구간이 닫힐 때 실제 복원 오차(최대/RMS) 집계
+    """
+    def __init__(self, error_bound=DEADBAND_ERROR, max_interval=DEADBAND_MAX_INTERVAL):
+        self.error_bound = error_bound
+        self.max_interval = max_interval
+        self.samples_in = 0
+        self.points_out = 0
+        self.max_error = 0.0
+        self._squared_error = 0.0
+        self.reset()
+
+    def reset(self):
+        """전송 구간 초기화 (다음 샘플을 새 구간 시작점으로 전송)"""
+        self._anchor = None       # (timestamp, sample) 마지막 전송 샘플
+        self._segment = []        # 앵커 이후 아직 전송하지 않은 (timestamp, sample)
+        self._low = None
+        self._high = None
+
+    def update(self, timestamp, sample):
+        """샘플 입력 → 전송할 (timestamp, sample) 목록 (대부분 비어 있음)"""
+        sample = np.asarray(sample, dtype=np.float64)
+        self.samples_in += 1
+        if self._anchor is None:
+            return self._emit(timestamp, sample)
+
+        points = []
+        anchor_time, anchor = self._anchor
+        dt = timestamp - anchor_time
+        if dt <= 0:
+            return points  # 시각이 되돌아간 샘플은 무시
+        slope = (sample - anchor) / dt
+        if self._segment and (dt > self.max_interval or np.any(slope < self._low) or np.any(slope > self._high)):
+            # 직선이 허용 범위를 벗어남 → 직전 샘플로 구간을 닫고 새 앵커로 사용
+            points = self._emit(*self._segment.pop())
+            anchor_time, anchor = self._anchor
+            dt = timestamp - anchor_time
+            if dt <= 0:
+                return points
+        self._segment.append((timestamp, sample))
+        low = (sample - self.error_bound - anchor) / dt
+        high = (sample + self.error_bound - anchor) / dt
+        self._low = low if self._low is None else np.maximum(self._low, low)
+        self._high = high if self._high is None else np.minimum(self._high, high)
+        return points
+
+    def flush(self):
+        """보류 중인 마지막 샘플 전송 후 구간 초기화 (보행 종료 시)"""
+        points = self._emit(*self._segment.pop()) if self._segment else []
+        self.reset()
+        return points
+
+    def _emit(self, timestamp, sample):
+        if self._anchor is not None and self._segment:
+            # 서버 복원 직선과 구간 내 실제 샘플의 오차
+            anchor_time, anchor = self._anchor
+            times = np.array([t for t, _ in self._segment])
+            values = np.array([v for _, v in self._segment])
+            ratio = ((times - anchor_time) / (timestamp - anchor_time))[:, None]
+            error = np.abs(anchor + ratio * (sample - anchor) - values)
+            self.max_error = max(self.max_error, float(error.max()))
+            self._squared_error += float(np.square(error).sum())
+        self._anchor = (timestamp, sample)
+        self._segment = []
+        self._low = self._high = None
+        self.points_out += 1
+        return [(timestamp, sample)]
+
+    def get_stats(self):
+        return {
+            'samples': self.samples_in,
+            'points': self.points_out,
+            'compression_ratio': self.samples_in / self.points_out if self.points_out else 0.0,
+            'max_error': self.max_error,
+            'rms_error': math.sqrt(self._squared_error / (6 * self.samples_in)) if self.samples_in else 0.0,
+            'error_bound': self.error_bound,
+        }
+
+class OutboundSpool:
+    """
+    🆕 오프라인 전송 스풀 (디스크 기반 store-and-forward)
+    - 연결이 끊긴 동안 IMU 샘플(바이너리 프레임으로 묶음)과 낙상 알림을 추가 전용 세그먼트 파일에 기록
+    - 레코드: [길이 u32][CRC32 u32][종류 u8][페이로드] - 전원 차단으로 잘린 꼬리는 CRC/길이로 감지해 건너뜀
+    - SD 카드 마모 방지: 메모리에 모았다가 백그라운드 스레드가 SPOOL_FLUSH_INTERVAL마다 일괄 기록
+      (낙상 알림은 즉시 기록), fsync 정책 'always' | 'batch' | 'never'
+    - 용량 상한 초과 시 가장 오래된 세그먼트부터 삭제 (삭제 바이트 집계)
+    - 읽기 위치(cursor)를 파일로 보존 → 재시작 후 이어서 재전송 (최소 1회 전송, 재시작 직전 레코드는 중복 가능)
+    """
+    RECORD_HEADER = struct.Struct('<IIB')
+    KIND_FALL = 1        # 낙상 패키지 JSON
+    KIND_IMU_FRAME = 2   # encode_imu_frame 바이너리 프레임
+
+    def __init__(self, directory=SPOOL_DIR, max_bytes=SPOOL_MAX_BYTES, segment_bytes=SPOOL_SEGMENT_BYTES,
+                 flush_interval=SPOOL_FLUSH_INTERVAL, fsync_policy=SPOOL_FSYNC_POLICY):
+        if fsync_policy not in ('always', 'batch', 'never'):
+            raise ValueError(f"Unknown spool fsync policy: {fsync_policy}")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+        self.fsync_policy = fsync_policy
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending = []          # 기록 대기: ('fall', package) | ('imu', (timestamp, data, state_info))
+        self._flush_event = threading.Event()
+        self._flush_lock = threading.Lock()  # 백그라운드/종료 시 기록 직렬화
+        # 기록된 세그먼트 번호 → 디스크에 기록된 바이트 수
+        self._sizes = {}
+        for name in os.listdir(directory):
+            if name.startswith('segment_') and name.endswith('.log'):
+                seq = int(name[8:-4])
+                self._sizes[seq] = os.path.getsize(self._path(seq))
+        # 재시작 시 기존 세그먼트는 읽기 전용 (잘린 꼬리 뒤에 이어 쓰지 않음)
+        self._write_seq = max(self._sizes, default=-1) + 1
+        self._write_file = None
+        self._read_seq, self._read_offset = self._load_cursor()
+        self._reader = None         # (세그먼트 번호, 파일)
+        self._next_offset = None    # peek한 레코드 다음 위치
+        self._cursor_dirty = False
+
+        # 통계
+        self.records_written = 0
+        self.records_replayed = 0
+        self.bytes_written = 0
+        self.flushes = 0
+        self.fsyncs = 0
+        self.evicted_bytes = 0
+        self.corrupt_segments = 0
+
+        self._thread = threading.Thread(target=self._run, name='spool-flusher', daemon=True)
+        self._thread.start()
+        if self._sizes:
+            print(f"💾 Spool: {self.backlog_bytes() / 1024:.1f}KB pending from previous run ({directory})")
+
+    def _path(self, seq):
+        return os.path.join(self.directory, f'segment_{seq:08d}.log')
+
+    def _cursor_path(self):
+        return os.path.join(self.directory, 'cursor.json')
+
+    def _load_cursor(self):
+        try:
+            with open(self._cursor_path()) as f:
+                cursor = json.load(f)
+            if cursor['segment'] in self._sizes:
+                return cursor['segment'], cursor['offset']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return min(self._sizes, default=0), 0
+
+    def append_fall(self, package):
+        """낙상 알림 추가 (즉시 기록 요청)"""
+        with self._lock:
+            self._pending.append(('fall', package))
+        self._flush_event.set()
+
+    def request_flush(self):
+        """다음 주기를 기다리지 않고 기록"""
+        self._flush_event.set()
+
+    def append_imu(self, timestamp, data, state_info=None):
+        """IMU 샘플 추가 (기록 시 연속 샘플을 FRAME_BATCH_SIZE개씩 프레임으로 묶음)"""
+        with self._lock:
+            self._pending.append(('imu', (timestamp, data, state_info)))
+        if self.fsync_policy == 'always':
+            self._flush_event.set()
+
+    def _encode(self, pending):
+        """기록 대기 항목 → 레코드 바이트 (순서 유지, 연속 IMU 샘플은 프레임으로 묶음)"""
+        records = []
+        imu = []
+
+        def frame_records():
+            for i in range(0, len(imu), FRAME_BATCH_SIZE):
+                timestamps, samples, infos = zip(*imu[i:i + FRAME_BATCH_SIZE])
+                records.append((self.KIND_IMU_FRAME, encode_imu_frame(samples, timestamps, infos[-1])))
+            imu.clear()
+
+        for kind, item in pending:
+            if kind == 'imu':
+                # 프레임 오프셋(uint16 ms) 범위를 넘는 공백이 생기면 새 프레임 시작
+                if imu and item[0] - imu[0][0] > 60.0:
+                    frame_records()
+                imu.append(item)
+            else:
+                frame_records()
+                records.append((self.KIND_FALL, json.dumps(item, ensure_ascii=False).encode('utf-8')))
+        frame_records()
+        return b''.join(self.RECORD_HEADER.pack(len(payload), zlib.crc32(payload), kind) + payload
+                        for kind, payload in records), len(records)
+
+    def _run(self):
+        while True:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Spool flush failed: {e}")
+
+    def flush(self):
+        """대기 항목 일괄 기록 (+fsync 정책), 용량 상한 적용, 읽기 위치 저장"""
+        with self._flush_lock:
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            data, count = self._encode(pending)
+            if self._write_file is None or self._sizes.get(self._write_seq, 0) >= self.segment_bytes:
+                self._rotate()
+            self._write_file.write(data)
+            self._write_file.flush()
+            if self.fsync_policy != 'never':
+                os.fsync(self._write_file.fileno())
+                self.fsyncs += 1
+            with self._lock:
+                self._sizes[self._write_seq] += len(data)
+            self.records_written += count
+            self.bytes_written += len(data)
+            self.flushes += 1
+            self._evict()
+        if self._cursor_dirty:
+            self._save_cursor()
+
+    def _rotate(self):
+        if self._write_file is not None:
+            self._write_file.close()
+            self._write_seq += 1
+        self._write_file = open(self._path(self._write_seq), 'ab')
+        with self._lock:
+            self._sizes[self._write_seq] = 0
+
+    def _evict(self):
+        with self._lock:
+            while sum(self._sizes.values()) > self.max_bytes and len(self._sizes) > 1:
+                seq = min(self._sizes)
+                self.evicted_bytes += self._sizes.pop(seq) - (self._read_offset if seq == self._read_seq else 0)
+                self._remove(seq)
+
+    def _remove(self, seq):
+        """세그먼트 삭제 (잠금 상태에서 호출), 읽던 세그먼트면 다음 세그먼트로 이동"""
+        if self._reader and self._reader[0] == seq:
+            self._reader[1].close()
+            self._reader = None
+        try:
+            os.remove(self._path(seq))
+        except OSError:
+            pass
+        if seq == self._read_seq:
+            self._read_seq, self._read_offset = min(self._sizes, default=self._write_seq), 0
+            self._next_offset = None
+            self._cursor_dirty = True
+
+    def _save_cursor(self):
+        with self._lock:
+            cursor = {'segment': self._read_seq, 'offset': self._read_offset}
+            self._cursor_dirty = False
+        tmp = self._cursor_path() + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(cursor, f)
+        os.replace(tmp, self._cursor_path())
+
+    def peek(self):
+        """다음 재전송 레코드 (종류, 페이로드) - 디스크에 기록된 것만, 없으면 None"""
+        with self._lock:
+            while self._read_seq in self._sizes:
+                seq, offset = self._read_seq, self._read_offset
+                size = self._sizes[seq]
+                sealed = seq != self._write_seq or self._write_file is None
+                record = self._read_record(seq, offset, size) if offset < size else None
+                if record is not None:
+                    kind, payload, self._next_offset = record
+                    return kind, payload
+                if not sealed:
+                    return None  # 기록 중인 세그먼트: 다음 일괄 기록 대기
+                if offset < size:
+                    self.corrupt_segments += 1  # 잘린/손상된 꼬리 건너뜀
+                # 다 읽은 세그먼트 삭제
+                del self._sizes[seq]
+                self._remove(seq)
+            return None
+
+    def _read_record(self, seq, offset, size):
+        header_size = self.RECORD_HEADER.size
+        if offset + header_size > size:
+            return None
+        if self._reader is None or self._reader[0] != seq:
+            if self._reader:
+                self._reader[1].close()
+            self._reader = (seq, open(self._path(seq), 'rb'))
+        f = self._reader[1]
+        f.seek(offset)
+        length, crc, kind = self.RECORD_HEADER.unpack(f.read(header_size))
+        end = offset + header_size + length
+        if end > size:
+            return None
+        payload = f.read(length)
+        if zlib.crc32(payload) != crc:
+            return None
+        return kind, payload, end
+
+    def ack(self):
+        """peek한 레코드 전송 완료 → 읽기 위치 이동 (다음 일괄 기록 때 파일로 저장)"""
+        with self._lock:
+            if self._next_offset is not None:
+                self._read_offset = self._next_offset
+                self._next_offset = None
+                self._cursor_dirty = True
+                self.records_replayed += 1
+
+    def backlog_bytes(self):
+        with self._lock:
+            return sum(self._sizes.values()) - self._read_offset if self._read_seq in self._sizes \
+                else sum(self._sizes.values())
+
+    def has_backlog(self):
+        with self._lock:
+            return bool(self._pending) or any(
+                size > (self._read_offset if seq == self._read_seq else 0) for seq, size in self._sizes.items())
+
+    def get_stats(self):
+        return {
+            'backlog_kb': self.backlog_bytes() / 1024,
+            'segments': len(self._sizes),
+            'records_written': self.records_written,
+            'records_replayed': self.records_replayed,
+            'flushes': self.flushes,
+            'fsyncs': self.fsyncs,
+            'evicted_kb': self.evicted_bytes / 1024,
+            'corrupt_segments': self.corrupt_segments,
+        }
+
 class OptimizedDataSender:
-    """Optimized data sender"""
-    def __init__(self):
-        self.imu_queue = queue.Queue(maxsize=30)
-        self.fall_queue = queue.Queue(maxsize=50)
+    """
+    Optimized data sender - 🔧 MODIFIED: 이벤트 기반 우선순위 전송
+    - 낙상 알림 전용 레인: 엄격한 우선순위 (대기 중인 IMU보다 항상 먼저, 즉시 깨움)
+    - IMU 레인: 대기 중인 샘플을 바이너리 프레임으로 묶어 전송 (JSON은 연속 전송)
+    - 메인 스레드 → 전송 루프(WebSocket 스레드) 깨우기는 call_soon_threadsafe, 고정 sleep 없음
+    - 큐 깊이, 레인별 전송 지연(enqueue → send), 드롭/전송 실패 수 집계
+    - 🆕 spool (OutboundSpool): 연결 끊김 동안 IMU/낙상을 디스크에 보관, 재연결 후 실시간 전송이 빈 틈에
+      SPOOL_REPLAY_RATE로 순서대로 재전송 (전송 성공 후에만 ack)
+    """
+    def __init__(self, history=1000, spool=None):
+        # 🔧 MODIFIED: queue.Queue 폴링 → deque 레인 (단일 생산자 append / 단일 소비자 popleft)
+        self.imu_queue = deque(maxlen=30)  # 가득 차면 append가 가장 오래된 샘플을 원자적으로 버림
+        self.fall_queue = deque()
+        self.fall_queue_max = 50
         self.websocket = None
         self.connected = False
         # 🔧 MODIFIED: 재연결 관리 추가
         self.reconnect_attempts = 0
         self.last_disconnect_time = 0
         self.connection_stable = False
+        self.connections = 0  # 🆕 성공한 연결 수 (재연결 통계)
+        # 🆕 연결마다 협상된 IMU 전송 형식 ('json' | IMU_FRAME_FORMAT)
+        self.frame_format = 'json'
+        self._imu_batch = []  # 바이너리 프레임으로 묶을 (timestamp, data, analysis_info, enqueued_at)
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        # 🆕 이벤트 기반 깨우기 (전송 루프가 시작된 이벤트 루프에 바인딩)
+        self._loop = None
+        self._wakeup = None
+        # 🆕 전송 통계
+        self.falls_sent = 0
+        self.imu_samples_sent = 0
+        self.dropped_imu = 0
+        self.dropped_falls = 0
+        self.send_failures = 0
+        self.fall_latency = deque(maxlen=history)  # 초
+        self.imu_latency = deque(maxlen=history)
+        # 🆕 오프라인 스풀 (_queue_lock: 연결 상태 확인 + 적재, 연결 종료 + 큐 비우기를 각각 한 단계로)
+        self.spool = spool
+        self._queue_lock = threading.Lock()
+        # 🆕 데드밴드 업로드 압축기 (하트비트에 압축률/복원 오차 보고)
+        self.compressor = None
+        # 🆕 런타임 계측 (하트비트에 요약 포함)
+        self.metrics = None
+        self.startup = None
+        self._next_replay = 0.0
+        self.spool_replayed = 0
 
-    def add_imu_data(self, data):
-        try:
-            self.imu_queue.put_nowait(data)
-        except queue.Full:
+    def _notify(self):
+        """다른 스레드에서 전송 루프 깨우기"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
             try:
-                self.imu_queue.get_nowait()
-                self.imu_queue.put_nowait(data)
-            except queue.Empty:
-                pass
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # 이벤트 루프 종료됨
+
+    def add_imu_data(self, data, timestamp, analysis_info=None):
+        """IMU 샘플 추가 - 전송 시 협상된 형식(JSON 패키지 / 바이너리 배치 프레임)으로 변환 (가득 차면 가장 오래된 샘플 버림)"""
+        # 🔧 MODIFIED: 연결 종료 처리(spool_pending)와 겹쳐도 샘플이 큐에 남지 않도록 상태 확인과 적재를 함께 잠금
+        with self._queue_lock:
+            if self.spool is not None and not self.connected:
+                self.spool.append_imu(timestamp, data, frame_state_info(analysis_info))
+                return
+            if len(self.imu_queue) == self.imu_queue.maxlen:
+                self.dropped_imu += 1
+            self.imu_queue.append((timestamp, data, analysis_info, time.monotonic()))
+        self._notify()
 
     def add_fall_data(self, data):
-        try:
-            self.fall_queue.put_nowait(data)
-        except queue.Full:
-            pass
+        with self._queue_lock:
+            if self.spool is not None and not self.connected:
+                self.spool.append_fall(data)
+                return
+            if len(self.fall_queue) >= self.fall_queue_max:
+                self.dropped_falls += 1
+                return
+            self.fall_queue.append((data, time.monotonic()))
+        self._notify()
+
+    def spool_pending(self):
+        """
+        🆕 연결 종료: connected=False 전환 + 전송하지 못한 낙상 알림/IMU 샘플을 스풀로 이동 (낙상 먼저)
+        - 🔧 MODIFIED: 전환과 큐 비우기를 한 잠금 안에서 처리 → 전환 직전에 연결 상태를 확인한 샘플이
+          큐에 남았다가 재연결 후 스풀의 더 오래된 레코드보다 먼저 전송되는 일이 없음
+        """
+        with self._queue_lock:
+            self.connected = False
+            if self.spool is None:
+                return
+            while self.fall_queue:
+                self.spool.append_fall(self.fall_queue.popleft()[0])
+            batch, self._imu_batch = self._imu_batch, []
+            while self.imu_queue:
+                batch.append(self.imu_queue.popleft())
+            for timestamp, data, analysis_info, _ in batch:
+                self.spool.append_imu(timestamp, data, frame_state_info(analysis_info))
+        self.spool.request_flush()
 
     async def send_loop(self):
+        """🔧 MODIFIED: 이벤트 기반 전송 루프 (0.1초 sleep 폴링 제거)"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
         while True:
             try:
-                if not self.fall_queue.empty():
-                    fall_data = self.fall_queue.get_nowait()
-                    await self._send_data(fall_data)
-                elif self.connected and not self.imu_queue.empty():
-                    imu_data = self.imu_queue.get_nowait()
-                    await self._send_data(imu_data)
+                # 확인 전에 지워서 확인 이후 도착한 데이터의 깨우기를 놓치지 않음
+                self._wakeup.clear()
+                
+                # 1. 낙상 알림 우선
+                if self.fall_queue:
+                    if not await self._send_fall():
+                        await asyncio.sleep(1)  # 전송 실패: 알림은 큐에 남겨 재시도
+                    continue
+                
+                # 2. IMU (다음 배치 마감까지 남은 시간, 없으면 새 데이터까지 대기)
+                timeout = await self._send_imu() if self.connected else None
+                if self.fall_queue:
+                    continue
                 
-                await asyncio.sleep(0.1)
+                # 3. 🆕 스풀 재전송 (실시간 레인이 비었을 때만, 속도 제한)
+                if self.connected and self.spool is not None and self.spool.has_backlog() \
+                        and not self.imu_queue and len(self._imu_batch) < FRAME_BATCH_SIZE:
+                    delay = self._next_replay - time.monotonic()
+                    if delay <= 0:
+                        await self._replay_spool()
+                        delay = 1.0 / SPOOL_REPLAY_RATE
+                    timeout = delay if timeout is None else min(timeout, delay)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
             except Exception:
                 await asyncio.sleep(1)
 
+    async def _send_fall(self):
+        """가장 오래된 낙상 알림 전송 - 성공해야 큐에서 제거"""
+        package, enqueued_at = self.fall_queue[0]
+        if not await self._send_data(package):
+            return False
+        self.fall_queue.popleft()
+        self.falls_sent += 1
+        self.fall_latency.append(time.monotonic() - enqueued_at)
+        return True
+
+    async def _send_imu(self):
+        """대기 중인 IMU 샘플 전송 → 다음 확인까지 대기 시간 (None: 새 데이터가 올 때까지)"""
+        if self.frame_format == IMU_FRAME_FORMAT:
+            return await self._send_imu_frame()
+        
+        # 협상 전/구버전 서버: 샘플당 JSON 패키지 연속 전송 (형식 변경 전 남은 배치부터, 낙상 도착 시 중단)
+        while (self._imu_batch or self.imu_queue) and not self.fall_queue:
+            # 🔧 MODIFIED: 전송 성공 후에만 제거 (실패 시 _imu_batch에 남아 재시도, 연결 종료 시 스풀로 이동)
+            if not self._imu_batch:
+                self._imu_batch.append(self.imu_queue.popleft())
+            timestamp, data, analysis_info, enqueued_at = self._imu_batch[0]
+            if not await self._send_data(create_imu_package(data, USER_ID, analysis_info, timestamp)):
+                return 1.0
+            self._imu_batch.pop(0)
+            self.imu_samples_sent += 1
+            self.imu_latency.append(time.monotonic() - enqueued_at)
+        return None
+
+    async def _send_imu_frame(self):
+        """🆕 대기 중인 IMU 샘플을 FRAME_BATCH_SIZE개 또는 FRAME_MAX_DELAY 경과 시 바이너리 프레임 1개로 전송"""
+        while len(self._imu_batch) < FRAME_BATCH_SIZE and self.imu_queue:
+            self._imu_batch.append(self.imu_queue.popleft())
+        if not self._imu_batch:
+            return None
+        age = time.monotonic() - self._imu_batch[0][3]
+        if len(self._imu_batch) < FRAME_BATCH_SIZE and age < FRAME_MAX_DELAY:
+            return FRAME_MAX_DELAY - age
+        
+        # 🔧 MODIFIED: 배치는 전송 성공 후에만 제거 (실패 시 _imu_batch에 남아 재시도, 연결 종료 시 스풀로 이동)
+        batch = list(self._imu_batch)
+        timestamps, samples, infos, enqueued = zip(*batch)
+        if not await self._send_data(encode_imu_frame(samples, timestamps, frame_state_info(infos[-1]))):
+            return 1.0
+        del self._imu_batch[:len(batch)]
+        now = time.monotonic()
+        self.imu_samples_sent += len(batch)
+        self.imu_latency.extend(now - t for t in enqueued)
+        return 0  # 큐에 남은 샘플이 있을 수 있으므로 바로 다시 확인
+
+    async def _replay_spool(self):
+        """🆕 스풀 레코드 1개 재전송 - 성공해야 ack (실패 시 다음 재전송 때 같은 레코드부터)"""
+        self._next_replay = time.monotonic() + 1.0 / SPOOL_REPLAY_RATE
+        record = self.spool.peek()
+        if record is None:
+            return
+        kind, payload = record
+        if kind == OutboundSpool.KIND_FALL:
+            messages = [json.loads(payload)]
+        elif self.frame_format == IMU_FRAME_FORMAT:
+            messages = [payload]
+        else:
+            messages = imu_frame_to_packages(payload, USER_ID)  # 바이너리 미협상 서버: 샘플당 JSON
+        for message in messages:
+            if not await self._send_data(message):
+                self._next_replay = time.monotonic() + 1.0
+                return
+        self.spool.ack()
+        self.spool_replayed += 1
+
     async def _send_data(self, data):
+        """전송 성공 여부 반환"""
         if not self.websocket:
-            return
+            return False
         try:
-            json_data = json.dumps(data, ensure_ascii=False)
-            await self.websocket.send(json_data)
+            # bytes: 바이너리 프레임, dict: JSON 패키지
+            payload = data if isinstance(data, bytes) else json.dumps(data, ensure_ascii=False)
+            await self.websocket.send(payload)
+            self.messages_sent += 1
+            self.bytes_sent += len(payload) if isinstance(payload, bytes) else len(payload.encode('utf-8'))
             # 🔧 MODIFIED: 연결 안정성 추적
             self.connection_stable = True
+            return True
         except Exception as e:
             print(f"Data transmission failed: {e}")
             self.connection_stable = False
+            self.send_failures += 1
+            return False
+
+    def get_stats(self):
+        """🆕 큐 깊이, 레인별 전송 지연, 드롭/실패 통계"""
+        stats = {
+            'fall_queue': len(self.fall_queue),
+            'imu_queue': len(self.imu_queue) + len(self._imu_batch),
+            'falls_sent': self.falls_sent,
+            'imu_samples_sent': self.imu_samples_sent,
+            'messages_sent': self.messages_sent,
+            'bytes_sent': self.bytes_sent,
+            'dropped_imu': self.dropped_imu,
+            'dropped_falls': self.dropped_falls,
+            'send_failures': self.send_failures,
+            'spool_replayed': self.spool_replayed,
+            # 🆕 연결/재연결 통계
+            'connected': self.connected,
+            'connections': self.connections,
+            'reconnect_attempts': self.reconnect_attempts,
+            'since_disconnect_s': time.time() - self.last_disconnect_time if self.last_disconnect_time else None,
+        }
+        for lane, latency in (('fall', self.fall_latency), ('imu', self.imu_latency)):
+            if latency:
+                stats[f'{lane}_latency_ms_p50'] = float(np.percentile(latency, 50)) * 1000
+                stats[f'{lane}_latency_ms_p99'] = float(np.percentile(latency, 99)) * 1000
+                stats[f'{lane}_latency_ms_max'] = float(max(latency)) * 1000
+        return stats
     
     def is_connection_healthy(self):
         """Check connection status"""
         return self.connected and self.connection_stable and self.websocket is not None
 
-class OptimizedSensor:
-    """Optimized sensor class"""
-    def __init__(self):
-        if not SENSOR_AVAILABLE:
-            raise ImportError("Sensor library missing.")
-        
-        self.bus = SMBus(1)
-        self.bus.write_byte_data(DEV_ADDR, PWR_MGMT_1, 0)
-        time.sleep(0.1)
-        self.scalers = self._load_scalers()
+class SimulatedSMBus:
+    """
+    MPU6050 소프트웨어 대체 버스 (하드웨어 없이 테스트/벤치마크용)
+    - smbus2.SMBus와 같은 메서드 제공 (read_byte_data, write_byte_data, read_i2c_block_data)
+    - 레지스터 맵, 샘플레이트(SMPLRT_DIV/CONFIG), 1024바이트 FIFO 및 오버플로 동작 재현
+    - samples: (n, 6) 물리 단위(g, deg/s) 배열을 반복 재생, 없으면 합성 보행 신호 생성
+    - transactions: 버스 트랜잭션 수 (벤치마크용)
+    """
+    FIFO_SIZE = 1024
+
+    def __init__(self, samples=None, clock=time.monotonic):
+        self.registers = bytearray(128)
+        self.registers[PWR_MGMT_1] = 0x40  # 전원 인가 시 sleep 상태
+        self.fifo = bytearray()
+        self.transactions = 0
+        self._samples = None if samples is None else np.asarray(samples, dtype=np.float64)
+        self._clock = clock
+        self._last_time = clock()
+        self._index = 0
+        self._pending_time = 0.0
+        self._scale = np.array([SENSITIVE_ACCEL] * 3 + [SENSITIVE_GYRO] * 3)
+
+    def _sample_rate(self):
+        dlpf = self.registers[MPU_CONFIG] & 0x07
+        base = 8000.0 if dlpf in (0, 7) else 1000.0
+        return base / (1 + self.registers[SMPLRT_DIV])
+
+    def _sample_counts(self, index):
+        if self._samples is not None:
+            values = self._samples[index % len(self._samples)]
+        else:
+            t = index / self._sample_rate()
+            step = math.sin(2 * math.pi * 1.8 * t)
+            values = [0.05 * step, 0.3 * step, 1.0 + 0.25 * step * step,
+                      5.0 * step, 2.0 * math.cos(2 * math.pi * 1.8 * t), 0.5]
+        return np.clip(np.round(np.asarray(values) * self._scale), -32768, 32767).astype('>i2')
+
+    def _advance(self):
+        now = self._clock()
+        if self.registers[PWR_MGMT_1] & 0x40:
+            self._last_time = now
+            return
+        self._pending_time += (now - self._last_time) * self._sample_rate()
+        self._last_time = now
+        count = int(self._pending_time)
+        if count <= 0:
+            return
+        self._pending_time -= count
 
-    def _load_scalers(self):
-        scalers = {}
-        features = ['AccX', 'AccY', 'AccZ', 'GyrX', 'GyrY', 'GyrZ']
+        fifo_on = (self.registers[USER_CTRL] & FIFO_ENABLE_BIT) and self.registers[FIFO_EN]
+        # FIFO 비활성 시 마지막 샘플만, 활성 시 FIFO 용량만큼만 생성
+        keep = self.FIFO_SIZE // FIFO_SAMPLE_BYTES + 1 if fifo_on else 1
+        for index in range(self._index + max(0, count - keep), self._index + count):
+            counts = self._sample_counts(index)
+            if fifo_on:
+                self.fifo.extend(counts.tobytes())
+        self._index += count
+
+        # 데이터 레지스터는 마지막 샘플 반영
+        counts = counts.tobytes()
+        self.registers[ACCEL_XOUT_H:ACCEL_XOUT_H + 6] = counts[:6]
+        self.registers[ACCEL_XOUT_H + 8:ACCEL_XOUT_H + 14] = counts[6:]
+
+        if len(self.fifo) > self.FIFO_SIZE:
+            # 가득 차면 가장 오래된 데이터가 버려지고 오버플로 플래그 설정
+            del self.fifo[:len(self.fifo) - self.FIFO_SIZE]
+            self.registers[INT_STATUS] |= FIFO_OFLOW_BIT
+
+    def _read(self, reg, length):
+        self._advance()
+        if reg == FIFO_R_W:
+            data = bytes(self.fifo[:length]).ljust(length, b'\x00')
+            del self.fifo[:length]
+            return list(data)
+        count = len(self.fifo)
+        self.registers[FIFO_COUNT_H] = count >> 8
+        self.registers[FIFO_COUNT_H + 1] = count & 0xFF
+        data = list(self.registers[reg:reg + length])
+        if reg <= INT_STATUS < reg + length:
+            self.registers[INT_STATUS] = 0  # 읽으면 해제
+        return data
+
+    def read_byte_data(self, addr, reg):
+        self.transactions += 1
+        return self._read(reg, 1)[0]
+
+    def read_i2c_block_data(self, addr, reg, length):
+        self.transactions += 1
+        return self._read(reg, length)
+
+    def write_byte_data(self, addr, reg, value):
+        self.transactions += 1
+        self._advance()
+        if reg == USER_CTRL and value & FIFO_RESET_BIT:
+            self.fifo.clear()
+            value &= ~FIFO_RESET_BIT  # 자동 해제 비트
+        self.registers[reg] = value & 0xFF
+
+    def close(self):
+        pass
+
+class FusedScaler:
+    """
+    StandardScaler → MinMaxScaler 2단계 정규화를 6축 벡터 연산 a * x + b 하나로 접은 스케일러
+    - a = minmax.scale / standard.scale, b = minmax.min - standard.mean * a
+    - 접힌 파라미터는 .npz로 캐시 → 다음 시작부터 12개 sklearn 객체 unpickle 생략
+    - 캐시는 원본 .pkl 파일 내용 해시로 검증 (스케일러 교체 시 자동 재생성)
+    """
+    FEATURES = ['AccX', 'AccY', 'AccZ', 'GyrX', 'GyrY', 'GyrZ']
+
+    def __init__(self, a, b):
+        self.a = np.asarray(a, dtype=np.float64)
+        self.b = np.asarray(b, dtype=np.float64)
+
+    def transform(self, sample):
+        """단일 샘플 (6,) 정규화"""
+        return np.asarray(sample, dtype=np.float64) * self.a + self.b
+
+    def transform_batch(self, samples):
+        """윈도우 (n, 6) 일괄 정규화"""
+        return np.asarray(samples, dtype=np.float64) * self.a + self.b
+
+    @classmethod
+    def _pickle_paths(cls, scalers_dir):
+        return [os.path.join(scalers_dir, f"{feature}_{kind}_scaler.pkl")
+                for feature in cls.FEATURES for kind in ('standard', 'minmax')]
+
+    @classmethod
+    def _fingerprint(cls, scalers_dir):
+        digest = hashlib.sha1()
+        for path in cls._pickle_paths(scalers_dir):
+            digest.update(os.path.basename(path).encode())
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+        return digest.hexdigest()
+
+    @classmethod
+    def load(cls, scalers_dir=SCALERS_DIR, cache_path=SCALER_CACHE_PATH):
+        """캐시가 유효하면 .npz에서, 아니면 pickle에서 로드 후 캐시 저장 (스케일러 없으면 None)"""
+        fingerprint = cls._fingerprint(scalers_dir)
+        try:
+            with np.load(cache_path) as cache:
+                if str(cache['fingerprint']) == fingerprint:
+                    return cls(cache['a'], cache['b']) if bool(cache['available']) else None
+        except Exception:
+            pass
+
+        scaler = cls.from_pickles(scalers_dir)
+        try:
+            os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+            np.savez(cache_path,
+                     a=scaler.a if scaler else np.ones(6),
+                     b=scaler.b if scaler else np.zeros(6),
+                     available=scaler is not None,
+                     fingerprint=fingerprint)
+        except Exception:
+            pass
+        return scaler
+
+    @classmethod
+    def from_pickles(cls, scalers_dir=SCALERS_DIR):
+        """sklearn 스케일러 pickle을 읽어 파라미터 접기 (누락된 단계는 항등 변환)"""
+        import pickle  # 🆕 캐시가 유효하면 필요 없음 (시작 경로에서 제외)
+        a = np.ones(len(cls.FEATURES))
+        b = np.zeros(len(cls.FEATURES))
+        loaded = False
         
-        for feature in features:
+        for i, feature in enumerate(cls.FEATURES):
             try:
-                std_path = os.path.join(SCALERS_DIR, f"{feature}_standard_scaler.pkl")
-                minmax_path = os.path.join(SCALERS_DIR, f"{feature}_minmax_scaler.pkl")
+                std_path = os.path.join(scalers_dir, f"{feature}_standard_scaler.pkl")
+                minmax_path = os.path.join(scalers_dir, f"{feature}_minmax_scaler.pkl")
                 
                 with warnings.catch_warnings():
                     warnings.simplefilter("ignore")
                     with open(std_path, 'rb') as f:
-                        scalers[f"{feature}_standard"] = pickle.load(f)
+                        scaler = pickle.load(f)
+                    # (x - mean) / scale
+                    a[i] = 1.0 / scaler.scale_[0]
+                    b[i] = -scaler.mean_[0] / scaler.scale_[0]
+                    loaded = True
                     with open(minmax_path, 'rb') as f:
-                        scalers[f"{feature}_minmax"] = pickle.load(f)
+                        scaler = pickle.load(f)
+                    # v * scale + min
+                    a[i] *= scaler.scale_[0]
+                    b[i] = b[i] * scaler.scale_[0] + scaler.min_[0]
             except Exception:
                 pass
         
-        return scalers
+        return cls(a, b) if loaded else None
+
+class OptimizedSensor:
+    """Optimized sensor class - word / burst / FIFO register reads"""
+    def __init__(self, bus=None, read_mode=SENSOR_READ_MODE):
+        if read_mode not in ('word', 'burst', 'fifo'):
+            raise ValueError(f"Unknown sensor read mode: {read_mode}")
+        if bus is None:
+            if not SENSOR_AVAILABLE:
+                raise ImportError("Sensor library missing.")
+            bus = SMBus(1)
+        
+        self.bus = bus
+        self.read_mode = read_mode
+        self.bus.write_byte_data(DEV_ADDR, PWR_MGMT_1, 0)
+        time.sleep(0.1)
+        self.scaler = FusedScaler.load()
+        
+        # FIFO 모드 상태
+        self.last_timestamp = None
+        self.fifo_overflows = 0
+        self._pending = deque()
+        self._fifo_scale = np.array([SENSITIVE_ACCEL] * 3 + [SENSITIVE_GYRO] * 3)
+        if read_mode == 'fifo':
+            self._configure_fifo()
 
     def _read_word_2c(self, reg):
         high = self.bus.read_byte_data(DEV_ADDR, reg)
@@ -406,58 +1536,477 @@ class OptimizedSensor:
         val = (high << 8) + low
         return -((65535 - val) + 1) if val >= 0x8000 else val
 
-    def get_data(self):
+    def _configure_fifo(self):
+        """하드웨어 샘플레이트를 SAMPLING_RATE로 맞추고 가속도/자이로 FIFO 활성화"""
+        self.bus.write_byte_data(DEV_ADDR, MPU_CONFIG, 0x03)  # DLPF 44Hz → 자이로 출력 1kHz
+        self.bus.write_byte_data(DEV_ADDR, SMPLRT_DIV, 1000 // SAMPLING_RATE - 1)
+        self._reset_fifo()
+
+    def _reset_fifo(self):
+        self.bus.write_byte_data(DEV_ADDR, FIFO_EN, 0)
+        self.bus.write_byte_data(DEV_ADDR, USER_CTRL, FIFO_RESET_BIT)
+        self.bus.write_byte_data(DEV_ADDR, USER_CTRL, FIFO_ENABLE_BIT)
+        self.bus.write_byte_data(DEV_ADDR, FIFO_EN, FIFO_ACCEL_GYRO)
+        self._pending.clear()
+        self._fifo_next_time = time.time()
+        self._last_drain = self._fifo_next_time
+
+    def drain_fifo(self):
+        """FIFO에 쌓인 샘플을 한 번에 읽어 대기열에 추가 (샘플 시각은 정확히 1/SAMPLING_RATE 간격)"""
+        if self.bus.read_byte_data(DEV_ADDR, INT_STATUS) & FIFO_OFLOW_BIT:
+            # 오버플로 시 샘플 정렬이 깨지므로 FIFO 초기화
+            self.fifo_overflows += 1
+            self._reset_fifo()
+            return 0
+        
+        high, low = self.bus.read_i2c_block_data(DEV_ADDR, FIFO_COUNT_H, 2)
+        available = ((high << 8) | low) // FIFO_SAMPLE_BYTES * FIFO_SAMPLE_BYTES
+        chunk = I2C_BLOCK_MAX // FIFO_SAMPLE_BYTES * FIFO_SAMPLE_BYTES
+        raw = bytearray()
+        while len(raw) < available:
+            raw.extend(self.bus.read_i2c_block_data(DEV_ADDR, FIFO_R_W, min(chunk, available - len(raw))))
+        self._last_drain = time.time()
+        
+        samples = np.frombuffer(bytes(raw), dtype='>i2').reshape(-1, 6) / self._fifo_scale
+        if self.scaler:
+            samples = self.scaler.transform_batch(samples)
+        period = 1.0 / SAMPLING_RATE
+        for row in samples:
+            self._pending.append((row, self._fifo_next_time))
+            self._fifo_next_time += period
+        return len(samples)
+
+    def pending(self):
+        """FIFO에서 읽어 두었지만 아직 처리되지 않은 샘플 수"""
+        return len(self._pending)
+
+    def _read_fifo_sample(self, timeout=1.0):
+        """
+        대기열이 비면 마지막 배치 이후 FIFO_BATCH_SAMPLES개가 쌓일 시각까지 잠든 뒤 한 번에 읽기
+        (빈 FIFO 폴링마다 INT_STATUS + FIFO_COUNT 2회 트랜잭션이 들기 때문)
+        """
+        deadline = time.time() + timeout
+        while not self._pending:
+            wait = self._last_drain + FIFO_BATCH_SAMPLES / SAMPLING_RATE - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            if not self.drain_fifo() and time.time() > deadline:
+                raise IOError("MPU6050 FIFO timeout")
+        return self._pending.popleft()
+
+    def _read_words(self):
         raw_data = []
         for reg in ACCEL_REGISTERS:
             raw_data.append(self._read_word_2c(reg) / SENSITIVE_ACCEL)
         for reg in GYRO_REGISTERS:
             raw_data.append(self._read_word_2c(reg) / SENSITIVE_GYRO)
+        return raw_data
 
-        if self.scalers:
-            features = ['AccX', 'AccY', 'AccZ', 'GyrX', 'GyrY', 'GyrZ']
-            normalized = []
-            for i, feature in enumerate(features):
-                val = raw_data[i]
-                
-                if f"{feature}_standard" in self.scalers:
-                    scaler = self.scalers[f"{feature}_standard"]
-                    val = (val - scaler.mean_[0]) / scaler.scale_[0]
-                
-                if f"{feature}_minmax" in self.scalers:
-                    scaler = self.scalers[f"{feature}_minmax"]
-                    val = val * scaler.scale_[0] + scaler.min_[0]
-                
-                normalized.append(val)
-            return np.array(normalized)
+    def _read_burst(self):
+        """가속도/온도/자이로 14바이트를 한 번의 트랜잭션으로 읽기"""
+        block = self.bus.read_i2c_block_data(DEV_ADDR, ACCEL_XOUT_H, BURST_LENGTH)
+        ax, ay, az, _, gx, gy, gz = struct.unpack('>7h', bytes(block))
+        return [ax / SENSITIVE_ACCEL, ay / SENSITIVE_ACCEL, az / SENSITIVE_ACCEL,
+                gx / SENSITIVE_GYRO, gy / SENSITIVE_GYRO, gz / SENSITIVE_GYRO]
+
+    def get_data(self):
+        if self.read_mode == 'fifo':
+            # FIFO 샘플은 배치 단위로 이미 정규화됨
+            data, self.last_timestamp = self._read_fifo_sample()
+            return data
         
+        raw_data = self._read_burst() if self.read_mode == 'burst' else self._read_words()
+        self.last_timestamp = time.time()
+        if self.scaler:
+            return self.scaler.transform(raw_data)
         return np.array(raw_data)
 
+_MODULE_LOADED = time.perf_counter()
+
+def _system_uptime():
+    """🆕 부팅 후 경과 시간 (초, /proc 미지원 시 None)"""
+    try:
+        with open('/proc/uptime') as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError):
+        return None
+
+def _process_age():
+    """🆕 프로세스 시작 후 경과 시간 (초, 인터프리터 시작/import 포함) - /proc 미지원 시 모듈 로드 시점 기준"""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        return _system_uptime() - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, TypeError):
+        return time.perf_counter() - _MODULE_LOADED
+
+class StreamingFallModel:
+    """
+    상태 유지형 낙상 모델 (numpy LSTM, TFLite/Flex 연산 불필요)
+    - LSTM(32) → LN → LSTM(16) → LN → Dense(8, relu) → LN → Dense(1, sigmoid)
+    - 윈도우 전체 재계산 대신 엇갈린 K개 LSTM 상태를 새 샘플마다 1스텝씩 갱신
+      (상태 i는 i × SEQ_LENGTH/K 샘플 위상으로 SEQ_LENGTH 샘플마다 0으로 초기화)
+    - 출력은 문맥이 가장 긴 상태로 계산: K = SEQ_LENGTH / STRIDE이면 stride 경계마다
+      정확히 150샘플 문맥 → 윈도우 추론과 동일, K개 상태는 한 번의 행렬 연산으로 갱신
+    """
+    WEIGHT_NAMES = (
+        'lstm_kernel', 'lstm_recurrent_kernel', 'lstm_bias', 'ln_gamma', 'ln_beta',
+        'lstm_1_kernel', 'lstm_1_recurrent_kernel', 'lstm_1_bias', 'ln_1_gamma', 'ln_1_beta',
+        'dense_kernel', 'dense_bias', 'ln_2_gamma', 'ln_2_beta', 'dense_1_kernel', 'dense_1_bias',
+    )
+
+    def __init__(self, weights, num_states=STREAMING_FALL_STATES, seq_length=SEQ_LENGTH,
+                 epsilon=1e-3, history=1000):
+        if seq_length % num_states:
+            raise ValueError(f"num_states ({num_states}) must divide seq_length ({seq_length})")
+        w = {name: np.asarray(weights[name], dtype=np.float32) for name in self.WEIGHT_NAMES}
+        self.num_states = num_states
+        self.seq_length = seq_length
+        self.period = seq_length // num_states
+        self.epsilon = epsilon
+        self.units1 = w['lstm_recurrent_kernel'].shape[0]
+        self.units2 = w['lstm_1_recurrent_kernel'].shape[0]
+        
+        # 게이트 순서 (i, f, c, o) → (i, f, o, c): 시그모이드 3개를 한 번에 계산
+        def gates(a, u):
+            return np.concatenate([a[..., :2 * u], a[..., 3 * u:], a[..., 2 * u:3 * u]], axis=-1)
+        
+        # LayerNorm의 gamma/beta를 다음 선형층에 접어 넣음 (LN → 표준화만 남음)
+        def fold(gamma, beta, kernel, bias):
+            return gamma[:, None] * kernel, beta @ kernel + bias
+        
+        self.kernel1 = gates(w['lstm_kernel'], self.units1)
+        self.bias1 = gates(w['lstm_bias'], self.units1)
+        self.recurrent1 = gates(w['lstm_recurrent_kernel'], self.units1)
+        self.kernel2, self.bias2 = fold(w['ln_gamma'], w['ln_beta'],
+                                        gates(w['lstm_1_kernel'], self.units2),
+                                        gates(w['lstm_1_bias'], self.units2))
+        self.recurrent2 = gates(w['lstm_1_recurrent_kernel'], self.units2)
+        self.dense_kernel, self.dense_bias = fold(w['ln_1_gamma'], w['ln_1_beta'],
+                                                  w['dense_kernel'], w['dense_bias'])
+        self.out_kernel, self.out_bias = fold(w['ln_2_gamma'], w['ln_2_beta'],
+                                              w['dense_1_kernel'], w['dense_1_bias'])
+        
+        # 통계 (InferenceRuntime.get_stats와 같은 형식)
+        self.startup_ms = None
+        self.rss_delta_mb = None
+        self.invoke_times = deque(maxlen=history)
+        self.feed_times = deque(maxlen=history)
+        self.reset()
+
+    @classmethod
+    def load(cls, path=STREAMING_MODEL_PATH, **kwargs):
+        start = time.perf_counter()
+        rss_before = _current_rss_mb()
+        with np.load(path) as data:
+            model = cls({name: data[name] for name in data.files}, **kwargs)
+        model.startup_ms = (time.perf_counter() - start) * 1000
+        model.rss_delta_mb = _current_rss_mb() - rss_before
+        print(f"🧠 Streaming fall model: {model.num_states} states, startup {model.startup_ms:.0f}ms")
+        return model
+
+    def reset(self):
+        """모든 상태 초기화 (샘플 누락 등으로 연속성이 끊긴 경우)"""
+        k = self.num_states
+        self.h1 = np.zeros((k, self.units1), dtype=np.float32)
+        self.c1 = np.zeros_like(self.h1)
+        self.h2 = np.zeros((k, self.units2), dtype=np.float32)
+        self.c2 = np.zeros_like(self.h2)
+        self.steps = 0
+
+    def is_ready(self, pending=0):
+        """pending개 샘플을 더 반영하면 출력 상태가 SEQ_LENGTH 문맥을 채우는지"""
+        return self.steps + pending >= self.seq_length
+
+    @staticmethod
+    def _sigmoid(x):
+        return 0.5 * np.tanh(0.5 * x) + 0.5
+
+    def _standardize(self, x):
+        centered = x - x.mean(axis=-1, keepdims=True)
+        return centered / np.sqrt((centered * centered).mean(axis=-1, keepdims=True) + self.epsilon)
+
+    def _lstm(self, z, c, units):
+        """Keras LSTM 셀 1스텝 (z = 입력 투영 + 순환 투영, 게이트 순서 i, f, o, c)"""
+        s = self._sigmoid(z[..., :3 * units])
+        c = s[..., units:2 * units] * c + s[..., :units] * np.tanh(z[..., 3 * units:])
+        return s[..., 2 * units:] * np.tanh(c), c
+
+    def _step(self, x_proj, h1, c1, h2, c2):
+        h1, c1 = self._lstm(x_proj + h1 @ self.recurrent1, c1, self.units1)
+        z2 = self._standardize(h1) @ self.kernel2 + self.bias2 + h2 @ self.recurrent2
+        h2, c2 = self._lstm(z2, c2, self.units2)
+        return h1, c1, h2, c2
+
+    def _head(self, h2):
+        y = np.maximum(self._standardize(h2) @ self.dense_kernel + self.dense_bias, 0.0)
+        return float(self._sigmoid(self._standardize(y) @ self.out_kernel + self.out_bias)[0])
+
+    def push(self, samples):
+        """새 샘플 (n, 6)을 모든 상태에 순서대로 반영"""
+        # 입력 투영은 새 샘플 전체를 한 번에 계산
+        x_proj = np.asarray(samples, dtype=np.float32) @ self.kernel1 + self.bias1
+        for z in x_proj:
+            if self.steps % self.period == 0:
+                # 이번 위상의 상태가 SEQ_LENGTH 문맥을 채움 → 0부터 다시 시작
+                i = (self.steps // self.period) % self.num_states
+                for state in (self.h1, self.c1, self.h2, self.c2):
+                    state[i] = 0.0
+            self.h1, self.c1, self.h2, self.c2 = self._step(z, self.h1, self.c1, self.h2, self.c2)
+            self.steps += 1
+
+    def output(self):
+        """가장 긴 문맥을 가진 상태(다음에 초기화될 상태)의 낙상 확률"""
+        return self._head(self.h2[-(-self.steps // self.period) % self.num_states])
+
+    def feed(self, samples):
+        """
+        🆕 게이트가 건너뛴 stride: 새 샘플만 상태에 반영 (출력 헤드 생략)
+        - 상태가 끊기지 않아 다음 실행 stride도 정상 상태 비용(stride 샘플만큼의 스텝)으로 처리
+        """
+        start = time.perf_counter()
+        self.push(samples)
+        self.feed_times.append(time.perf_counter() - start)
+
+    def update(self, samples, window=None):
+        """
+        새 샘플 반영 후 낙상 확률 반환 (윈도우 모드의 invoke에 해당)
+        - 🔧 MODIFIED: window가 주어지면 (초기화 후 상태가 아직 SEQ_LENGTH 문맥을 채우기 전)
+          출력은 최근 윈도우 1회 단일 상태 추론으로 계산, 새 샘플은 그대로 상태에 반영
+        """
+        start = time.perf_counter()
+        self.push(samples)
+        probability = self.output() if window is None else self.predict_window(window)
+        self.invoke_times.append(time.perf_counter() - start)
+        return probability
+
+    def predict_window(self, window):
+        """윈도우 단위 추론 (검증용, 스트리밍 상태는 변경하지 않음)"""
+        x_proj = np.asarray(window, dtype=np.float32) @ self.kernel1 + self.bias1
+        h1 = np.zeros(self.units1, dtype=np.float32)
+        c1 = np.zeros_like(h1)
+        h2 = np.zeros(self.units2, dtype=np.float32)
+        c2 = np.zeros_like(h2)
+        for z in x_proj:
+            h1, c1, h2, c2 = self._step(z, h1, c1, h2, c2)
+        return self._head(h2)
+
+    def get_stats(self):
+        """InferenceRuntime.get_stats와 같은 키 (invoke = stride당 update)"""
+        stats = {
+            'backend': 'numpy-streaming',
+            'num_states': self.num_states,
+            'startup_ms': self.startup_ms,
+            'rss_delta_mb': self.rss_delta_mb,
+            'invokes': len(self.invoke_times),
+        }
+        if self.invoke_times:
+            invoke_ms = np.asarray(self.invoke_times) * 1000
+            stats.update({
+                'invoke_ms_mean': float(np.mean(invoke_ms)),
+                'invoke_ms_p99': float(np.percentile(invoke_ms, 99)),
+            })
+        if self.feed_times:
+            feed_ms = np.asarray(self.feed_times) * 1000
+            stats.update({
+                'feeds': len(self.feed_times),
+                'feed_ms_mean': float(np.mean(feed_ms)),
+                'feed_ms_p99': float(np.percentile(feed_ms, 99)),
+            })
+        return stats
+
+class MotionGate:
+    """
+    낙상 모델 실행 전 저비용 움직임 게이트 (캐스케이드 1단계)
+    - stride마다 새 샘플만 벡터 검사: 가속도 크기 급증(spike), 자유낙하(free_fall), 저크(jerk),
+      자세 변화(tilt: 새 샘플 평균 가속도 방향과 이전 검사 방향 사이 각도)
+    - 정규화된 버퍼 값을 융합 스케일러의 역변환으로 g 단위로 되돌려 비교
+    - 발동 후 이벤트가 윈도우를 벗어날 때까지(hold 샘플) 모델 실행 유지
+    - 발동이 없어도 하트비트 간격마다 모델 실행 (안전장치)
+    - shadow 모드: 모델은 항상 실행하고, 게이트가 건너뛰었을 양성 판정을 집계 (재현율 평가)
+    """
+    STAGES = ('spike', 'free_fall', 'jerk', 'tilt')
+    MODES = ('gate', 'shadow')
+
+    def __init__(self, scaler=None, stages=FALL_GATE_STAGES, mode=FALL_GATE_MODE,
+                 heartbeat=FALL_GATE_HEARTBEAT, hold=SEQ_LENGTH):
+        unknown = set(stages) - set(self.STAGES)
+        if unknown:
+            raise ValueError(f"Unknown gate stages: {sorted(unknown)}")
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown gate mode: {mode}")
+        if scaler is None:
+            scaler = FusedScaler.load()
+        # 정규화 역변환 (스케일러가 없으면 버퍼 값이 이미 g 단위)
+        self._acc_scale = scaler.a[:3] if scaler else np.ones(3)
+        self._acc_offset = scaler.b[:3] if scaler else np.zeros(3)
+        self.stages = tuple(stages)
+        self.mode = mode
+        self.heartbeat = heartbeat
+        self.hold = hold
+        self._checked_count = None
+        self._armed_until = 0
+        self._last_run_time = None
+        self._last_direction = None
+        self._cos_tilt = math.cos(math.radians(GATE_TILT_DEG))
+        self.last_decision = None  # 마지막 check() 결과
+        
+        # 통계
+        self.checks = 0
+        self.runs = 0
+        self.skipped = 0
+        self.heartbeats = 0
+        self.fired = {stage: 0 for stage in self.stages}
+        self.shadow_positives = 0
+        self.shadow_misses = 0
+
+    def _fired_stages(self, window):
+        """window: 이전 샘플 1개 + 새 샘플 (정규화 값)"""
+        acc = (window[:, :3] - self._acc_offset) / self._acc_scale
+        magnitude = np.sqrt(np.einsum('ij,ij->i', acc, acc))
+        fired = []
+        if 'spike' in self.stages and magnitude[1:].max() > GATE_SPIKE_G:
+            fired.append('spike')
+        if 'free_fall' in self.stages and magnitude[1:].min() < GATE_FREE_FALL_G:
+            fired.append('free_fall')
+        if 'jerk' in self.stages and len(magnitude) > 1 and \
+                np.abs(np.diff(magnitude)).max() * SAMPLING_RATE > GATE_JERK_G_PER_S:
+            fired.append('jerk')
+        if 'tilt' in self.stages:
+            direction = acc[1:].sum(axis=0)
+            norm = np.linalg.norm(direction)
+            if norm > 0:
+                direction = direction / norm
+                if self._last_direction is not None and direction @ self._last_direction < self._cos_tilt:
+                    fired.append('tilt')
+                self._last_direction = direction
+        return fired
+
+    def check(self, buffer, end):
+        """end까지의 새 샘플 검사 → 모델 실행 여부 (shadow 모드에서는 '실행했을지' 여부)"""
+        start = end - STRIDE if self._checked_count is None else self._checked_count
+        n_new = min(end - start, buffer.capacity - 1, end - 1)
+        self._checked_count = end
+        self.checks += 1
+        
+        if n_new > 0:
+            fired = self._fired_stages(buffer.window(n_new + 1, end))
+            for stage in fired:
+                self.fired[stage] += 1
+            if fired:
+                self._armed_until = end + self.hold
+        
+        _, now = buffer.sample_at(end - 1)
+        run = end <= self._armed_until
+        if not run and (self._last_run_time is None or now - self._last_run_time >= self.heartbeat):
+            run = True
+            self.heartbeats += 1
+        if run:
+            self.runs += 1
+            self._last_run_time = now
+        else:
+            self.skipped += 1
+        self.last_decision = run
+        return run
+
+    def record_shadow(self, would_run, prediction):
+        """shadow 모드: 모델 판정과 게이트 결정 비교"""
+        if prediction == 1:
+            self.shadow_positives += 1
+            if not would_run:
+                self.shadow_misses += 1
+
+    def get_stats(self):
+        """건너뛴 추론 비율, 단계별 발동 횟수, shadow 재현율"""
+        stats = {
+            'mode': self.mode,
+            'checks': self.checks,
+            'runs': self.runs,
+            'skipped': self.skipped,
+            'skip_fraction': self.skipped / self.checks if self.checks else 0.0,
+            'heartbeats': self.heartbeats,
+            'fired': dict(self.fired),
+        }
+        if self.mode == 'shadow':
+            stats['shadow_positives'] = self.shadow_positives
+            stats['shadow_misses'] = self.shadow_misses
+            stats['gate_recall'] = (1 - self.shadow_misses / self.shadow_positives
+                                    if self.shadow_positives else 1.0)
+        return stats
+
 class OptimizedFallDetector:
-    """Optimized fall detector"""
-    def __init__(self):
-        self.buffer = deque(maxlen=SEQ_LENGTH)
-        self.counter = 0
-        self.interpreter = tf.lite.Interpreter(model_path=MODEL_PATH)
-        self.interpreter.allocate_tensors()
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
+    """Optimized fall detector - reads windows from the shared SampleRingBuffer"""
+    def __init__(self, sample_buffer=None, gate_mode=FALL_GATE_MODE, clock=time.time,
+                 inference_mode=FALL_INFERENCE_MODE):
+        self._clock = clock
+        if sample_buffer is None:
+            sample_buffer = SampleRingBuffer(SEQ_LENGTH)
+        self.sample_buffer = sample_buffer
+        self.mode = inference_mode
+        if self.mode == 'streaming':
+            self.runtime = StreamingFallModel.load()
+            self._fed_count = 0  # 스트리밍 모델에 반영된 샘플 수 (첫 추론 시 최근 윈도우부터 반영)
+        else:
+            self.runtime = InferenceRuntime(MODEL_PATH)  # 첫 predict()에서 로드
+        self.torn_reads = 0  # 입력 복사 중 생산자에게 덮어써진 윈도우 수
+        # 🆕 움직임 게이트 (정지 상태에서 모델 실행 생략)
+        self.gate = MotionGate(mode=gate_mode) if gate_mode != 'off' else None
+
+    def warm_up(self):
+        """🆕 첫 추론 전에 런타임 import/모델 로드 (시작 시 버퍼를 채우는 동안 실행)"""
+        if self.mode != 'streaming':
+            try:
+                self.runtime.load()
+            except ImportError as e:
+                print(f"⚠️ Fall inference runtime unavailable: {e}")
+        return self
 
     def add_data(self, data):
-        self.buffer.append(data)
-        self.counter += 1
+        """Append a sample (only when the detector owns its buffer)"""
+        self.sample_buffer.append(data, self._clock())
 
     def should_predict(self):
-        return len(self.buffer) == SEQ_LENGTH and self.counter % STRIDE == 0
+        return len(self.sample_buffer) >= SEQ_LENGTH and self.sample_buffer.count % STRIDE == 0
 
-    def predict(self):
-        if len(self.buffer) < SEQ_LENGTH:
+    def predict(self, end=None):
+        """end: window end as a cumulative sample number (default: latest sample)"""
+        buffer = self.sample_buffer
+        end = buffer.count if end is None else end
+        if min(end, buffer.capacity) < SEQ_LENGTH:
             return None
 
+        if self.gate is None:
+            return self._infer(end)
+        would_run = self.gate.check(buffer, end)
+        if self.gate.mode == 'gate':
+            if would_run:
+                return self._infer(end)
+            if self.mode == 'streaming':
+                # 건너뛴 stride도 상태에는 반영 (끊기면 재시작마다 윈도우 전체 재계산)
+                self._stream_feed(end)
+            return None
+        result = self._infer(end)
+        if result:
+            self.gate.record_shadow(would_run, result['prediction'])
+        return result
+
+    def _infer(self, end):
+        buffer = self.sample_buffer
         try:
-            data = np.expand_dims(np.array(list(self.buffer)), axis=0).astype(np.float32)
-            self.interpreter.set_tensor(self.input_details[0]['index'], data)
-            self.interpreter.invoke()
-            output = self.interpreter.get_tensor(self.output_details[0]['index'])
+            if self.mode == 'streaming':
+                fall_prob = self._stream_probability(end)
+                if fall_prob is None:
+                    return None
+                prediction = 1 if fall_prob >= FALL_DETECTION_THRESHOLD else 0
+                return {'prediction': prediction, 'probability': fall_prob}
+            
+            # float32 contiguous view → set_tensor performs the only copy
+            window = buffer.window(SEQ_LENGTH, end)
+            self.runtime.set_input(window[np.newaxis])
+            if not buffer.is_intact(end, SEQ_LENGTH):
+                self.torn_reads += 1
+                return None
+            output = self.runtime.invoke()
             
             fall_prob = float(output.flatten()[0])
             prediction = 1 if fall_prob >= FALL_DETECTION_THRESHOLD else 0
@@ -467,13 +2016,434 @@ class OptimizedFallDetector:
         except Exception:
             return None
 
-def create_imu_package(data, user_id, analysis_info=None):
-    """Create IMU data package - includes state information"""
+    def _stream_probability(self, end):
+        """Feed samples up to end into the streaming model (None until a full window is available)"""
+        buffer = self.sample_buffer
+        new_samples = self._stream_pending(end)
+        # Cold start (first run, torn read or a lag beyond SEQ_LENGTH): until the restarted states hold
+        # SEQ_LENGTH samples the output comes from one single-state windowed pass (~8 ms on the Pi-class
+        # benchmark, the same as windowed mode). Gated strides keep feeding the states, so this only
+        # happens for the first SEQ_LENGTH samples after a restart; afterwards a stride costs ~0.5 ms.
+        window = None if self.runtime.is_ready(len(new_samples)) else buffer.window(SEQ_LENGTH, end)
+        fall_prob = self.runtime.update(new_samples, window)
+        self._fed_count = end
+        if not buffer.is_intact(end, SEQ_LENGTH if window is not None else len(new_samples)):
+            self.torn_reads += 1
+            self.runtime.reset()
+            return None
+        return fall_prob
+
+    def _stream_feed(self, end):
+        """Gate skipped this stride: advance the streaming states without computing an output"""
+        new_samples = self._stream_pending(end)
+        self.runtime.feed(new_samples)
+        self._fed_count = end
+        if not self.sample_buffer.is_intact(end, len(new_samples)):
+            self.torn_reads += 1
+            self.runtime.reset()
+
+    def _stream_pending(self, end):
+        """Samples not yet fed to the streaming model (restart the states if the gap reaches SEQ_LENGTH)"""
+        if end - self._fed_count >= SEQ_LENGTH:
+            self.runtime.reset()
+            self._fed_count = end
+        return self.sample_buffer.window(end - self._fed_count, end)
+
+class RuntimeMetrics:
+    """
+    🆕 단계별 실행 시간 롤링 히스토그램 (센서 읽기, ROC 분석, 낙상 추론, 패키징, 큐 적재, 메인 루프)
+    - record()는 로그 간격 버킷 카운터 1개 증가 (할당 없음)
+    - 🔧 MODIFIED: 수집/추론/메인 스레드가 같은 조각 리스트에 기록하고 tick()이 조각을 회전하므로
+      기록/회전/집계는 모두 락 1개로 직렬화 (경합 없는 락 획득은 record 비용의 일부, 보정 비용에 포함)
+    - METRICS_WINDOW를 METRICS_SLICES 조각으로 나눠 tick()마다 가장 오래된 조각 폐기
+    - 카운터(루프 초과 등)와 외부 통계 소스(add_source: 큐 깊이, 재연결 등)를 snapshot()에 합침
+    - 계측 비용: 시작 시 record 1회(시각 측정 2회 포함) 비용을 측정해 계측된 작업 시간 대비 비율로 보고
+    """
+    # 버킷 상한 (초): 10µs부터 √2배씩 ~1.3초, 마지막 버킷은 그 이상
+    EDGES = tuple(10e-6 * 2 ** (k / 2) for k in range(35))
+    # 다른 단계를 포함하지 않는 최상위 단계 (계측 비용 비율의 분모)
+    TOP_LEVEL_STAGES = ('sensor_read', 'fall_inference', 'loop')
+
+    def __init__(self, window=METRICS_WINDOW, slices=METRICS_SLICES, clock=time.perf_counter):
+        self.slice_seconds = window / slices
+        self.slices = slices
+        self._clock = clock
+        self._started = clock()
+        self._slice_started = self._started
+        self._histograms = {}   # 단계 → 조각별 버킷 카운트 리스트
+        self._totals = {}       # 단계 → [누적 횟수, 누적 시간, 최대]
+        self.counters = {}
+        self._sources = {}
+        self._lock = threading.Lock()
+        self.records = 0
+        self.record_cost = self._calibrate()
+
+    def _calibrate(self, iterations=2000):
+        """record 1회 + perf_counter 2회 비용 (초)"""
+        scratch = RuntimeMetrics.__new__(RuntimeMetrics)
+        scratch._histograms, scratch._totals, scratch.records, scratch.slices = {}, {}, 0, 1
+        scratch._lock = threading.Lock()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            scratch.record('calibration', time.perf_counter() - t0)
+        return (time.perf_counter() - start) / iterations
+
+    def record(self, stage, seconds):
+        bucket = bisect.bisect_left(self.EDGES, seconds)
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = [[0] * (len(self.EDGES) + 1) for _ in range(self.slices)]
+                self._totals[stage] = [0, 0.0, 0.0]
+            histogram[0][bucket] += 1
+            totals = self._totals[stage]
+            totals[0] += 1
+            totals[1] += seconds
+            if seconds > totals[2]:
+                totals[2] = seconds
+            self.records += 1
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def _counters(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def add_source(self, name, get_stats):
+        """snapshot()에 포함할 외부 통계 (get_stats 호출 결과)"""
+        self._sources[name] = get_stats
+
+    def tick(self):
+        """조각 시간이 지나면 가장 오래된 조각을 비워 맨 앞으로 (메인 루프에서 주기적으로 호출)"""
+        now = self._clock()
+        if now - self._slice_started < self.slice_seconds:
+            return
+        self._slice_started = now
+        with self._lock:
+            for histogram in self._histograms.values():
+                oldest = histogram.pop()
+                oldest[:] = [0] * len(oldest)
+                histogram.insert(0, oldest)
+
+    def _percentiles(self, counts, longest):
+        """버킷 상한 기준 백분위수 (관측 최대값을 넘지 않음)"""
+        total = sum(counts)
+        result = {}
+        cumulative = np.cumsum(counts)
+        for q in (50, 90, 99):
+            index = int(np.searchsorted(cumulative, total * q / 100.0))
+            edge = self.EDGES[min(index, len(self.EDGES) - 1)]
+            result[f'p{q}_ms'] = min(edge, longest) * 1000
+        return total, result
+
+    def stage_stats(self):
+        """단계별 롤링 구간 횟수/백분위수(버킷 상한)와 누적 평균/최대"""
+        with self._lock:
+            # 락 안에서는 합산/복사만 (백분위수 계산은 락 밖)
+            merged = {stage: ([sum(column) for column in zip(*histogram)], tuple(self._totals[stage]))
+                      for stage, histogram in self._histograms.items()}
+        stages = {}
+        for stage, (counts, (total_count, total_time, longest)) in merged.items():
+            window_count, percentiles = self._percentiles(counts, longest)
+            stages[stage] = {
+                'count': window_count,
+                **percentiles,
+                'mean_ms': total_time / total_count * 1000 if total_count else 0.0,
+                'max_ms': longest * 1000,
+                'histogram_ms': [[round(edge * 1000, 3), c] for edge, c in zip(self.EDGES + (math.inf,), counts) if c],
+            }
+        return stages
+
+    def overhead(self):
+        """계측 비용 = record 횟수 × 보정 비용, 계측된 최상위 단계 작업 시간 대비 비율"""
+        with self._lock:
+            work = sum(self._totals[stage][1] for stage in self.TOP_LEVEL_STAGES if stage in self._totals)
+            records = self.records
+        cost = records * self.record_cost
+        return {
+            'records': records,
+            'record_cost_us': self.record_cost * 1e6,
+            'overhead_pct': 100.0 * cost / work if work else 0.0,
+        }
+
+    def snapshot(self):
+        """통계 엔드포인트 응답 전체"""
+        snapshot = {
+            'uptime_s': self._clock() - self._started,
+            'window_s': self.slice_seconds * self.slices,
+            'stages': self.stage_stats(),
+            'counters': self._counters(),
+            'overhead': self.overhead(),
+        }
+        for name, get_stats in list(self._sources.items()):
+            try:
+                snapshot[name] = get_stats()
+            except Exception as e:
+                snapshot[name] = {'error': str(e)}
+        return snapshot
+
+    def summary(self):
+        """하트비트용 요약: 단계별 [p50, p99, max] ms, 카운터, 계측 비용"""
+        return {
+            'stages': {stage: [round(stats['p50_ms'], 3), round(stats['p99_ms'], 3), round(stats['max_ms'], 3)]
+                       for stage, stats in self.stage_stats().items()},
+            'counters': self._counters(),
+            'overhead_pct': round(self.overhead()['overhead_pct'], 3),
+        }
+
+class StatsServer(threading.Thread):
+    """🆕 로컬 통계 HTTP 엔드포인트 (GET /stats → RuntimeMetrics.snapshot() JSON, 127.0.0.1 전용)"""
+
+    def __init__(self, metrics, host=STATS_HTTP_HOST, port=STATS_HTTP_PORT):
+        super().__init__(name='stats-server', daemon=True)
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # 🆕 지연 import
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/stats'):
+                    self.send_error(404)
+                    return
+                body = json.dumps(metrics.snapshot(), default=str).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # 요청마다 출력하지 않음
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+
+    def run(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+
+class StartupProfile:
+    """
+    🆕 시작 시간 측정 (리부트/재시작 후 감지 공백 확인)
+    - run(): 구성 요소별 초기화 시간 (병렬 초기화 시 각 스레드에서 기록)
+    - mark(): 프로세스 시작 기준 첫 도달 시각 (main 진입, 구성 요소 준비, 보행 분석 시작, 첫 감지)
+    - 첫 감지 = 실시간 샘플이 포함된 윈도우의 첫 낙상 추론 완료 (복원된 스냅샷만으로 한 추론은 제외)
+    """
+
+    def __init__(self, mode=STARTUP_MODE):
+        self.mode = mode
+        self.phases = {}   # 구성 요소 → 초기화 시간 (ms)
+        self.marks = {}    # 단계 → 프로세스 시작 후 경과 시간 (초)
+        self.restored_samples = 0
+        self.system_uptime_s = None  # 첫 감지 시점의 부팅 후 경과 시간
+        self.reported = False
+
+    def run(self, name, factory):
+        started = time.perf_counter()
+        try:
+            return factory()
+        finally:
+            self.phases[name] = (time.perf_counter() - started) * 1000
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = _process_age()
+            if name == 'first_detection':
+                self.system_uptime_s = _system_uptime()
+
+    def time_to_first_detection(self):
+        return self.marks.get('first_detection')
+
+    def get_stats(self):
+        return {
+            'mode': self.mode,
+            'phases_ms': {name: round(ms, 1) for name, ms in self.phases.items()},
+            'marks_s': {name: round(age, 3) for name, age in self.marks.items()},
+            'restored_samples': self.restored_samples,
+            'time_to_first_detection_s': self.time_to_first_detection(),
+            'system_uptime_at_detection_s': self.system_uptime_s,
+        }
+
+def start_components(factories, profile, parallel=True):
+    """
+    🆕 구성 요소 생성 함수 실행 → {이름: Future}
+    - parallel: 구성 요소마다 스레드 1개로 동시 실행 (I2C 대기, 파일 읽기, 모델 로드가 겹침)
+    - 아니면 호출 스레드에서 순서대로 실행 (기존 시작 순서)
+    """
+    futures = {}
+    executor = ThreadPoolExecutor(max_workers=len(factories), thread_name_prefix='startup') if parallel else None
+    for name, factory in factories.items():
+        if executor is not None:
+            futures[name] = executor.submit(profile.run, name, factory)
+            continue
+        future = futures[name] = Future()
+        try:
+            future.set_result(profile.run(name, factory))
+        except Exception as e:
+            future.set_exception(e)
+    if executor is not None:
+        executor.shutdown(wait=False)
+    return futures
+
+def _set_realtime_priority(priority=ACQUISITION_RT_PRIORITY):
+    """현재 스레드를 SCHED_FIFO로 승격 (root 권한 필요, 실패 시 기본 우선순위 유지)"""
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        return True
+    except (AttributeError, OSError):
+        return False
+
+class AcquisitionThread(threading.Thread):
+    """
+    전용 센서 수집 스레드 (단일 생산자)
+    - 데드라인 스케줄러(또는 FIFO 센서)로 100Hz 수집 → 공유 SampleRingBuffer에 기록
+    - 소비자는 subscribe()로 받은 이벤트로 깨어나 자신의 일정으로 버퍼를 읽음 (버퍼 접근에 락 없음)
+    - TFLite 추론/패키징이 느려져도 센서 읽기는 지연되지 않음
+    """
+
+    def __init__(self, sensor, sample_buffer, scheduler=None, metrics=None):
+        super().__init__(name='imu-acquisition', daemon=True)
+        self.sensor = sensor
+        self.sample_buffer = sample_buffer
+        self.scheduler = scheduler
+        self.metrics = metrics  # 🆕 센서 읽기 시간 계측
+        self._subscribers = []
+        self._stop_event = threading.Event()
+        
+        # 통계
+        self.read_errors = 0
+        self.realtime = False
+
+    def subscribe(self):
+        """새 샘플 알림 이벤트 등록 (소비자별 1개, start() 전에 호출)"""
+        event = threading.Event()
+        self._subscribers.append(event)
+        return event
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        self.realtime = _set_realtime_priority()
+        while not self._stop_event.is_set():
+            try:
+                if self.scheduler:
+                    missed = self.scheduler.wait()
+                    if missed and self.scheduler.policy == 'mark':
+                        print(f"⏱️ Sampling gap: {missed} samples missed")
+                started = time.perf_counter()
+                data = self.sensor.get_data()
+                if self.metrics is not None:
+                    self.metrics.record('sensor_read', time.perf_counter() - started)
+                self.sample_buffer.append(data, self.sensor.last_timestamp)
+                for event in self._subscribers:
+                    event.set()
+            except Exception as e:
+                self.read_errors += 1
+                print(f"Sensor read error: {e}")
+                time.sleep(0.1)
+
+    def get_stats(self):
+        """수집 통계 (누락 샘플 = 스케줄러 누락 주기)"""
+        stats = {
+            'samples': self.sample_buffer.count,
+            'read_errors': self.read_errors,
+            'realtime': self.realtime,
+        }
+        if self.scheduler:
+            stats['timing'] = self.scheduler.get_stats()
+        return stats
+
+class FallInferenceWorker(threading.Thread):
+    """
+    낙상 추론 소비자 스레드
+    - STRIDE 경계에 맞춘 최신 윈도우로 추론 (추론이 느리면 밀린 stride는 건너뛰고 집계)
+    - 결과는 deque로 메인 루프에 락 없이 전달
+    - 큐 지연: 추론 완료 시점에 추론 윈도우보다 앞서 수집된 샘플 수/시간
+    """
+
+    def __init__(self, fall_detector, wakeup, history=1000, metrics=None, startup=None):
+        super().__init__(name='fall-inference', daemon=True)
+        self.fall_detector = fall_detector
+        self.wakeup = wakeup
+        self.metrics = metrics  # 🆕 추론 시간 계측
+        self.startup = startup  # 🆕 첫 감지 시각 기록
+        self.results = deque(maxlen=100)  # (윈도우 끝 샘플 번호, 결과)
+        self._stop_event = threading.Event()
+        self._last_end = 0
+        
+        # 통계
+        self.inferences = 0
+        self.skipped_strides = 0
+        self.lag_samples = deque(maxlen=history)
+        self.lag_seconds = deque(maxlen=history)
+
+    def stop(self):
+        self._stop_event.set()
+        self.wakeup.set()
+
+    def run(self):
+        buffer = self.fall_detector.sample_buffer
+        while not self._stop_event.is_set():
+            self.wakeup.wait(1.0)
+            self.wakeup.clear()
+            
+            count = buffer.count
+            end = count - count % STRIDE
+            if end < SEQ_LENGTH or end <= self._last_end:
+                continue
+            if self._last_end:
+                self.skipped_strides += (end - self._last_end) // STRIDE - 1
+            self._last_end = end
+            
+            started = time.perf_counter()
+            result = self.fall_detector.predict(end)
+            if self.metrics is not None:
+                self.metrics.record('fall_inference', time.perf_counter() - started)
+            self.inferences += 1
+            if self.startup is not None and end > self.startup.restored_samples:
+                self.startup.mark('first_detection')
+            _, window_time = buffer.sample_at(end - 1)
+            self.lag_samples.append(buffer.count - end)
+            self.lag_seconds.append(time.time() - window_time)
+            if result:
+                self.results.append((end, result))
+
+    def pop_result(self):
+        """마지막 호출 이후 결과 중 가장 높은 낙상 확률의 결과 (없으면 None)"""
+        best = None
+        while self.results:
+            _, result = self.results.popleft()
+            if best is None or result['probability'] > best['probability']:
+                best = result
+        return best
+
+    def get_stats(self):
+        """추론 횟수, 건너뛴 stride, 큐 지연 통계"""
+        stats = {
+            'inferences': self.inferences,
+            'skipped_strides': self.skipped_strides,
+            'torn_reads': self.fall_detector.torn_reads,
+        }
+        if self.lag_samples:
+            stats.update({
+                'lag_samples_max': int(max(self.lag_samples)),
+                'lag_ms_mean': float(np.mean(self.lag_seconds)) * 1000,
+                'lag_ms_p99': float(np.percentile(self.lag_seconds, 99)) * 1000,
+            })
+        return stats
+
+def create_imu_package(data, user_id, analysis_info=None, timestamp=None, deadband=IMU_UPLOAD_MODE == 'deadband'):
+    """Create IMU data package - includes state information (timestamp: 샘플 시각 epoch 초, 없으면 현재 시각)
+    deadband: 데드밴드 압축 샘플 표시 → 서버가 샘플 사이를 선형 보간해 복원"""
     package = {
         'type': 'imu_data',
         'data': {
             'user_id': user_id,
-            'timestamp': datetime.now(KST).isoformat(),
+            'timestamp': (datetime.fromtimestamp(timestamp, KST) if timestamp is not None
+                          else datetime.now(KST)).isoformat(),
             'acc_x': float(data[0]),
             'acc_y': float(data[1]),
             'acc_z': float(data[2]),
@@ -490,8 +2460,73 @@ def create_imu_package(data, user_id, analysis_info=None):
             'confidence': analysis_info.get('confidence', 0.0),
             'timestamp': datetime.now(KST).isoformat()
         }
+    if deadband:
+        package['encoding'] = 'deadband'
     return package
 
+def frame_state_info(analysis_info):
+    """🆕 보행 분석 정보 → 프레임 상태 정보 (없으면 None)"""
+    if not analysis_info:
+        return None
+    return {
+        'state': analysis_info.get('walking', False) and 'Walking' or 'Daily',
+        'confidence': analysis_info.get('confidence', 0.0),
+    }
+
+def encode_imu_frame(samples, timestamps, state_info=None, encoding=FRAME_SAMPLE_ENCODING,
+                     deadband=IMU_UPLOAD_MODE == 'deadband'):
+    """
+    🆕 IMU 바이너리 배치 프레임 생성 (서버 decode_imu_frame과 짝)
+    - 고정 헤더 + 샘플별 시각 오프셋(ms, uint16) + float32 또는 int16 6축 샘플
+    - 샘플당 JSON 약 300바이트 → float32 26바이트 / int16 14바이트
+    - flags bit2: 데드밴드 압축 샘플 (서버가 선형 보간 복원)
+    """
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1, 6)
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    base_time = float(timestamps[0])
+    offsets = np.round((timestamps - base_time) * 1000.0)
+    if offsets.max() > 0xFFFF:
+        raise ValueError("frame spans more than 65 seconds")
+
+    flags, scale = 0, 1.0
+    if encoding == 'int16':
+        flags |= 0x01
+        scale = FRAME_INT16_RANGE / 32767.0
+        payload = np.clip(np.round(samples / np.float32(scale)), -32767, 32767).astype('<i2')
+    else:
+        payload = samples.astype('<f4')
+    state, confidence = 0, 0.0
+    if state_info:
+        flags |= 0x02
+        state = FRAME_STATE_CODES.get(state_info['state'], 0)
+        confidence = float(state_info['confidence'])
+    if deadband:
+        flags |= 0x04
+
+    header = FRAME_HEADER.pack(b'IMUB', 1, flags, len(samples), base_time, scale, state, confidence)
+    return header + offsets.astype('<u2').tobytes() + payload.tobytes()
+
+def imu_frame_to_packages(frame, user_id):
+    """🆕 바이너리 프레임 → 샘플별 JSON IMU 패키지 (바이너리 미협상 서버로 스풀 재전송 시)"""
+    _, _, flags, count, base_time, scale, state, confidence = FRAME_HEADER.unpack_from(frame)
+    offsets = np.frombuffer(frame, '<u2', count, FRAME_HEADER.size)
+    dtype = '<i2' if flags & 0x01 else '<f4'
+    samples = np.frombuffer(frame, dtype, 6 * count, FRAME_HEADER.size + 2 * count).reshape(count, 6)
+    if flags & 0x01:
+        samples = samples * scale
+    packages = []
+    for offset, data in zip(offsets, samples):
+        package = create_imu_package(data, user_id, timestamp=base_time + offset / 1000.0,
+                                     deadband=bool(flags & 0x04))
+        if flags & 0x02:
+            package['state_info'] = {
+                'state': next(name for name, code in FRAME_STATE_CODES.items() if code == state),
+                'confidence': confidence,
+                'timestamp': package['data']['timestamp'],
+            }
+        packages.append(package)
+    return packages
+
 def create_fall_package(user_id, probability, sensor_data, analysis_info=None):
     """Create fall data package - includes state information"""
     package = {
@@ -517,8 +2552,26 @@ def create_fall_package(user_id, probability, sensor_data, analysis_info=None):
         }
     return package
 
+async def negotiate_frame_format(websocket):
+    """🆕 connection_health_check 응답에서 서버가 선택한 IMU 전송 형식 확인 (응답 없음/구버전 서버 → JSON)"""
+    if FRAME_FORMAT != 'binary':
+        return 'json'
+    deadline = time.monotonic() + FRAME_NEGOTIATION_TIMEOUT
+    try:
+        while True:
+            message = await asyncio.wait_for(websocket.recv(), max(deadline - time.monotonic(), 0))
+            try:
+                reply = json.loads(message)
+            except (TypeError, ValueError):
+                continue
+            if isinstance(reply, dict) and reply.get('type') == 'health_check_response':
+                return IMU_FRAME_FORMAT if reply.get('frame_format') == IMU_FRAME_FORMAT else 'json'
+    except asyncio.TimeoutError:
+        return 'json'
+
 async def websocket_handler(data_sender):
     """WebSocket connection handler - Enhanced reconnection logic"""
+    import websockets  # 🆕 지연 import: 웹소켓 스레드에서 로드 (감지 시작 경로에서 제외)
     url = f"ws://{WEBSOCKET_SERVER_IP}:{WEBSOCKET_SERVER_PORT}/ws/{USER_ID}"
     
     while True:
@@ -538,6 +2591,7 @@ async def websocket_handler(data_sender):
                 data_sender.connected = True
                 data_sender.connection_stable = True
                 data_sender.reconnect_attempts = 0
+                data_sender.connections += 1
                 print("✅ WebSocket connected")
                 
                 # 연결 성공 메시지 전송
@@ -546,8 +2600,12 @@ async def websocket_handler(data_sender):
                         "type": "connection_health_check",
                         "user_id": USER_ID,
                         "timestamp": datetime.now(KST).isoformat(),
-                        "status": "connected"
+                        "status": "connected",
+                        # 🆕 지원하는 IMU 전송 형식 (서버가 응답에서 선택)
+                        "frame_formats": [IMU_FRAME_FORMAT] if FRAME_FORMAT == 'binary' else []
                     }))
+                    data_sender.frame_format = await negotiate_frame_format(websocket)
+                    print(f"📦 IMU frame format: {data_sender.frame_format}")
                 except Exception as e:
                     print(f"Connection confirmation message failed: {e}")
                 
@@ -557,11 +2615,25 @@ async def websocket_handler(data_sender):
                         try:
                             await asyncio.sleep(25)  # 25초마다 체크
                             if data_sender.websocket:
-                                await data_sender.websocket.send(json.dumps({
+                                heartbeat = {
                                     "type": "heartbeat",
                                     "user_id": USER_ID,
                                     "timestamp": datetime.now(KST).isoformat()
-                                }))
+                                }
+                                # 🆕 데드밴드 압축 통계 (서버가 복원 결과와 함께 보고)
+                                if data_sender.compressor is not None:
+                                    heartbeat["imu_compression"] = data_sender.compressor.get_stats()
+                                # 🆕 단계별 실행 시간/큐/재연결 요약
+                                if data_sender.metrics is not None:
+                                    sender = data_sender.get_stats()
+                                    heartbeat["runtime_stats"] = {
+                                        **data_sender.metrics.summary(),
+                                        'queues': {'fall': sender['fall_queue'], 'imu': sender['imu_queue']},
+                                        'reconnects': max(sender['connections'] - 1, 0),
+                                    }
+                                    if data_sender.startup is not None:
+                                        heartbeat["runtime_stats"]['startup'] = data_sender.startup.get_stats()
+                                await data_sender.websocket.send(json.dumps(heartbeat))
                         except Exception as e:
                             print(f"💓 Connection health check failed: {e}")
                             break
@@ -590,8 +2662,9 @@ async def websocket_handler(data_sender):
             print(f"❌ WebSocket connection error: {e}")
         finally:
             data_sender.websocket = None
-            data_sender.connected = False
+            data_sender.spool_pending()  # 🔧 MODIFIED: 연결 해제 + 미전송 데이터 디스크 보관을 한 단계로
             data_sender.connection_stable = False
+            data_sender.frame_format = 'json'
             data_sender.last_disconnect_time = time.time()
             data_sender.reconnect_attempts += 1
         
@@ -612,12 +2685,46 @@ def main():
     print(f"🎯 KFall Dataset: F1 Score 0.641, 32 subjects, 21,696 windows")
     
     # 초기화
+    startup = StartupProfile(STARTUP_MODE)
+    startup.mark('main_started')  # 인터프리터 시작 + 모듈 import
     try:
-        sensor = OptimizedSensor()
-        fall_detector = OptimizedFallDetector()
-        walking_detector = OptimizedROCWalkingDetector()
+        # 보행/낙상 감지기가 공유하는 단일 샘플 이력 (소비자 지연 허용 구간 포함)
+        sample_buffer = SampleRingBuffer(SEQ_LENGTH + SAMPLE_BUFFER_HEADROOM)
+        # 🆕 느린 구성 요소(센서 초기화/스케일러, 낙상 모델, 스풀 복구)를 동시에 초기화
+        components = start_components({
+            'sensor': OptimizedSensor,
+            'fall_detector': lambda: OptimizedFallDetector(sample_buffer).warm_up(),
+            # 🆕 연결 끊김 동안 디스크 보관 후 재전송
+            'uplink': lambda: OptimizedDataSender(spool=OutboundSpool() if SPOOL_ENABLED else None),
+        }, startup, parallel=STARTUP_MODE == 'parallel')
+        walking_detector = OptimizedROCWalkingDetector(sample_buffer)
         state_manager = OptimizedStateManager()
-        data_sender = OptimizedDataSender()
+        # 🆕 보행 IMU 적응형 데드밴드 업로드
+        compressor = DeadbandCompressor() if IMU_UPLOAD_MODE == 'deadband' else None
+        # 🆕 단계별 실행 시간 계측
+        metrics = RuntimeMetrics() if METRICS_ENABLED else None
+        # 🆕 직전 실행의 버퍼 스냅샷 복원 (감지기 생성 후, 수집 시작 전)
+        if BUFFER_SNAPSHOT_PATH:
+            startup.restored_samples = sample_buffer.restore_snapshot(BUFFER_SNAPSHOT_PATH, BUFFER_SNAPSHOT_MAX_AGE)
+            if startup.restored_samples:
+                print(f"♻️ Restored {startup.restored_samples} samples from {BUFFER_SNAPSHOT_PATH}")
+        
+        # 🆕 센서가 준비되면 다른 구성 요소를 기다리지 않고 수집 시작 (버퍼 채우기와 모델 로드가 겹침)
+        # 수집 스레드(생산자) + 낙상 추론 스레드(소비자), 메인 스레드는 보행 분석/상태/전송 담당
+        sensor = components['sensor'].result()
+        # 절대 데드라인 스케줄러 (FIFO 모드는 하드웨어가 샘플 간격을 유지)
+        scheduler = DeadlineScheduler(rate=SAMPLING_RATE) if sensor.read_mode != 'fifo' else None
+        acquisition = AcquisitionThread(sensor, sample_buffer, scheduler, metrics=metrics)
+        fall_wakeup = acquisition.subscribe()
+        new_samples_event = acquisition.subscribe()
+        acquisition.start()
+        
+        data_sender = components['uplink'].result()
+        data_sender.compressor = compressor
+        data_sender.metrics = metrics
+        data_sender.startup = startup
+        fall_detector = components['fall_detector'].result()
+        startup.mark('components_ready')
     except Exception as e:
         print(f"Initialization failed: {e}")
         return
@@ -625,6 +2732,13 @@ def main():
     # 종료 핸들러
     def signal_handler(sig, frame):
         print("Exiting...")
+        if data_sender.spool is not None:
+            data_sender.spool.flush()  # 🆕 메모리에 모인 스풀 항목 기록 후 종료
+        if BUFFER_SNAPSHOT_PATH:
+            try:
+                sample_buffer.save_snapshot(BUFFER_SNAPSHOT_PATH, SEQ_LENGTH)  # 🆕 재시작 시 복원
+            except OSError:
+                pass
         sys.exit(0)
     
     signal.signal(signal.SIGINT, signal_handler)
@@ -638,33 +2752,76 @@ def main():
     websocket_thread = threading.Thread(target=start_websocket, daemon=True)
     websocket_thread.start()
     
+    fall_worker = FallInferenceWorker(fall_detector, fall_wakeup, metrics=metrics, startup=startup)
+    fall_worker.start()
+    
+    # 🆕 로컬 통계 엔드포인트 (큐 깊이, 재연결, 타이밍 통계 포함)
+    if metrics is not None:
+        metrics.add_source('acquisition', acquisition.get_stats)
+        metrics.add_source('fall_inference_worker', fall_worker.get_stats)
+        metrics.add_source('uplink', data_sender.get_stats)
+        if data_sender.spool is not None:
+            metrics.add_source('spool', data_sender.spool.get_stats)
+        if compressor is not None:
+            metrics.add_source('imu_compression', compressor.get_stats)
+        metrics.add_source('startup', startup.get_stats)
+        if STATS_HTTP_PORT:
+            try:
+                StatsServer(metrics).start()
+                print(f"📈 Stats endpoint: http://{STATS_HTTP_HOST}:{STATS_HTTP_PORT}/stats")
+            except OSError as e:
+                print(f"⚠️ Stats endpoint unavailable: {e}")
+    
     # 초기 버퍼 채우기
-    for _ in range(SEQ_LENGTH):
-        data = sensor.get_data()
-        fall_detector.add_data(data)
-        time.sleep(1.0 / SAMPLING_RATE)
+    while sample_buffer.count < SEQ_LENGTH:
+        new_samples_event.wait(1.0)
+        new_samples_event.clear()
+        walking_detector.update()
     
-    print("🎯 ROC-based real-time detection started")
+    startup.mark('walking_ready')
+    print(f"🎯 ROC-based real-time detection started ({startup.marks['walking_ready']:.2f}s after process start)")
     
     # 메인 루프
     last_print = time.time()
     last_analysis_print = time.time()
     last_connection_check = time.time()  # 🔧 MODIFIED: 연결 상태 확인 타이머 추가
     imu_send_counter = 0
+    consumed_count = sample_buffer.count
+    # 🆕 단계별 시간 기록 (계측 비활성 시 아무것도 하지 않음)
+    record = metrics.record if metrics is not None else (lambda stage, seconds: None)
+    clock = time.perf_counter
+    # 🆕 재시작 시 복원할 버퍼 스냅샷 (tmpfs)
+    snapshot_path = BUFFER_SNAPSHOT_PATH
+    last_snapshot = time.time()
     
     while True:
         try:
-            data = sensor.get_data()
+            new_samples_event.wait(1.0)
+            new_samples_event.clear()
+            count = sample_buffer.count
+            new_samples = count - consumed_count
+            if new_samples <= 0:
+                continue
+            loop_started = clock()
+            consumed_count = count
+            data, sample_time = sample_buffer.latest()
+            data = data.copy()
             current_time = time.time()
             
-            # ROC 기반 보행 감지
-            is_walking, walk_confidence = walking_detector.add_data(data[0], data[1], data[2])
+            # ROC 기반 보행 감지 (밀린 샘플까지 순서대로 처리)
+            is_walking, walk_confidence = walking_detector.update()
+            record('roc_analysis', clock() - loop_started)
             
-            # 낙상 감지
-            fall_detector.add_data(data)
-            fall_result = None
-            if fall_detector.should_predict():
-                fall_result = fall_detector.predict()
+            # 낙상 감지 (추론 스레드 결과 수신)
+            fall_result = fall_worker.pop_result()
+            
+            # 🆕 시작 후 첫 감지까지 걸린 시간 (1회 출력)
+            if not startup.reported and startup.time_to_first_detection() is not None:
+                startup.reported = True
+                phases = ", ".join(f"{name} {ms:.0f}ms" for name, ms in startup.phases.items())
+                print(f"⚡ Time to first detection: {startup.time_to_first_detection():.2f}s after process start "
+                      f"(imports {startup.marks['main_started']:.2f}s, {startup.mode} init: {phases}, "
+                      f"restored {startup.restored_samples} samples)")
             
             fall_detected = fall_result and fall_result['prediction'] == 1
             
@@ -680,15 +2837,24 @@ def main():
                 last_connection_check = current_time
             
             # 분석 정보 생성
+            started = clock()
             analysis_info = walking_detector.get_analysis_summary()
+            record('package', clock() - started)
             
             # 🔧 MODIFIED: 낙상 감지 시에만 알림 전송 (상태 변화 시)
             if fall_detected and state_changed and current_state == UserState.FALL:
                 print(f"🚨 FALL DETECTED! Probability: {fall_result['probability']:.2%} (Threshold: {FALL_DETECTION_THRESHOLD})")
-                if data_sender.is_connection_healthy():
+                if data_sender.is_connection_healthy() or data_sender.spool is not None:
+                    started = clock()
                     fall_package = create_fall_package(USER_ID, fall_result['probability'], data, analysis_info)
+                    packaged = clock()
                     data_sender.add_fall_data(fall_package)
-                    print("📤 Fall alert sent")
+                    record('package', packaged - started)
+                    record('enqueue', clock() - packaged)
+                    if data_sender.is_connection_healthy():
+                        print("📤 Fall alert sent")
+                    else:
+                        print("💾 Fall alert spooled (offline) - will be sent after reconnection")
                 else:
                     print("⚠️ Fall data pending due to unstable connection")
             
@@ -697,13 +2863,36 @@ def main():
                 print(f"🟡 Fall probability: {fall_result['probability']:.2%} (below threshold {FALL_DETECTION_THRESHOLD})")
             
             # IMU 데이터 전송 (보행 중일 때만)
-            elif current_state == UserState.WALKING:
-                imu_send_counter += 1
-                if imu_send_counter >= (SAMPLING_RATE // SEND_RATE):
-                    if data_sender.is_connection_healthy():
-                        imu_package = create_imu_package(data, USER_ID, analysis_info)
-                        data_sender.add_imu_data(imu_package)
-                    imu_send_counter = 0
+            # 🔧 MODIFIED: 낙상 알림/디버그 출력 분기와 독립 → 보행 중 새 샘플은 모두 압축기를 거침 (스트림 공백 없음)
+            if current_state == UserState.WALKING:
+                upload = data_sender.is_connection_healthy() or data_sender.spool is not None
+                if compressor is not None:
+                    # 🆕 새 샘플을 모두 압축기에 통과, 서버 복원 오차가 허용 범위를 넘는 샘플만 전송
+                    started = clock()
+                    points = []
+                    for seq in range(max(count - new_samples, count - len(sample_buffer)), count):
+                        sample, timestamp = sample_buffer.sample_at(seq)
+                        points.extend(compressor.update(timestamp, sample))
+                    record('package', clock() - started)
+                    if upload and points:
+                        started = clock()
+                        for point_time, point in points:
+                            data_sender.add_imu_data(point, point_time, analysis_info)
+                        record('enqueue', clock() - started)
+                else:
+                    imu_send_counter += new_samples
+                    if imu_send_counter >= (SAMPLING_RATE // SEND_RATE):
+                        if upload:
+                            started = clock()
+                            data_sender.add_imu_data(data, sample_time, analysis_info)
+                            record('enqueue', clock() - started)
+                        imu_send_counter = 0
+            
+            # 🆕 보행 종료: 압축기에 보류 중인 마지막 샘플 전송
+            if compressor is not None and current_state != UserState.WALKING:
+                for point_time, point in compressor.flush():
+                    if data_sender.is_connection_healthy() or data_sender.spool is not None:
+                        data_sender.add_imu_data(point, point_time, analysis_info)
             
             # 기본 상태 출력 (10초마다)
             if current_time - last_print >= 10.0:
@@ -711,6 +2900,51 @@ def main():
                 # 🔧 MODIFIED: 보행 감지 상세 정보 추가
                 walking_status = f"Walking: {is_walking} (conf: {walk_confidence:.3f}, cons: {walking_detector.consecutive_walking}/{walking_detector.consecutive_idle})"
                 print(f"📊 State: {current_state.value}, {walking_status}, Connection: {connection_status}")
+                sender = data_sender.get_stats()
+                print(f"📦 Uplink ({data_sender.frame_format}): {sender['messages_sent']} messages, "
+                      f"{sender['bytes_sent'] / 1024:.1f}KB | queue fall {sender['fall_queue']}, "
+                      f"imu {sender['imu_queue']} | latency fall p99 {sender.get('fall_latency_ms_p99', 0):.1f}ms, "
+                      f"imu p99 {sender.get('imu_latency_ms_p99', 0):.1f}ms | dropped imu {sender['dropped_imu']}, "
+                      f"falls {sender['dropped_falls']}, failures {sender['send_failures']}")
+                if compressor is not None:
+                    compression = compressor.get_stats()
+                    print(f"🗜️ Deadband: {compression['samples']} samples → {compression['points']} points "
+                          f"({compression['compression_ratio']:.1f}x), error max {compression['max_error']:.3f} "
+                          f"/ rms {compression['rms_error']:.4f} (bound {compression['error_bound']})")
+                if data_sender.spool is not None:
+                    spool = data_sender.spool.get_stats()
+                    print(f"💾 Spool: backlog {spool['backlog_kb']:.1f}KB in {spool['segments']} segments, "
+                          f"written {spool['records_written']}, replayed {sender['spool_replayed']}, "
+                          f"evicted {spool['evicted_kb']:.1f}KB, corrupt {spool['corrupt_segments']}")
+                if scheduler:
+                    timing = scheduler.get_stats()
+                    print(f"⏱️ Rate: {timing.get('effective_rate_hz', 0):.1f}Hz, "
+                          f"Jitter p99: {timing.get('jitter_p99_ms', 0):.2f}ms, "
+                          f"Overruns: {timing['overruns']}, Missed: {timing['missed_slots']}")
+                inference = fall_worker.get_stats()
+                print(f"🧵 Pipeline: walking lag max {walking_detector.max_lag}, "
+                      f"dropped {walking_detector.dropped_samples} | "
+                      f"fall lag p99 {inference.get('lag_ms_p99', 0):.1f}ms, "
+                      f"skipped strides {inference['skipped_strides']}, torn {inference['torn_reads']} | "
+                      f"read errors {acquisition.read_errors}, RT: {acquisition.realtime}")
+                walking_detector.max_lag = 0
+                if fall_detector.gate:
+                    gate = fall_detector.gate.get_stats()
+                    print(f"🚪 Fall gate ({gate['mode']}): skipped {gate['skip_fraction']:.1%} of "
+                          f"{gate['checks']} strides, fired {gate['fired']}, heartbeats {gate['heartbeats']}"
+                          + (f", recall {gate['gate_recall']:.1%}" if 'gate_recall' in gate else ""))
+                runtime = fall_detector.runtime.get_stats()
+                if runtime['invokes']:
+                    print(f"🧠 Runtime: {runtime['backend']}, invoke mean {runtime['invoke_ms_mean']:.2f}ms, "
+                          f"p99 {runtime['invoke_ms_p99']:.2f}ms, startup {runtime['startup_ms']:.0f}ms, "
+                          f"RSS +{runtime['rss_delta_mb']:.1f}MB")
+                if metrics is not None:
+                    metrics.tick()
+                    stages = metrics.stage_stats()
+                    print("⏲️ Stage p99 (ms): " + ", ".join(
+                        f"{stage} {stats['p99_ms']:.2f}" for stage, stats in stages.items())
+                        + f" | loop overruns {metrics.counters.get('loop_overruns', 0)}"
+                        + f" | instrumentation {metrics.overhead()['overhead_pct']:.3f}%")
                 last_print = current_time
             
             # ROC 분석 상세 출력 (30초마다, 보행 중일 때)
@@ -725,7 +2959,22 @@ def main():
                       f"Peaks: {analysis.get('peaks_count', 0)}")
                 last_analysis_print = current_time
             
-            time.sleep(1.0 / SAMPLING_RATE)
+            # 🆕 버퍼 스냅샷 (tmpfs 기록 실패 시 비활성)
+            if snapshot_path and current_time - last_snapshot >= BUFFER_SNAPSHOT_INTERVAL:
+                started = clock()
+                try:
+                    sample_buffer.save_snapshot(snapshot_path, SEQ_LENGTH)
+                except OSError as e:
+                    print(f"⚠️ Buffer snapshot disabled: {e}")
+                    snapshot_path = None
+                record('snapshot', clock() - started)
+                last_snapshot = current_time
+            
+            # 🆕 루프 전체 시간, 새 샘플 주기 합보다 길면 초과로 집계
+            elapsed = clock() - loop_started
+            record('loop', elapsed)
+            if metrics is not None and elapsed > new_samples / SAMPLING_RATE:
+                metrics.count('loop_overruns')
             
         except Exception as e:
             print(f"Error: {e}")
@@ -41,15 +41,21 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
         while True:
             try:
                 # 타임아웃 설정으로 무한 대기 방지
-                data = await websocket.receive_text()
+                # 🆕 텍스트(JSON) + 바이너리(협상된 IMU 배치 프레임) 모두 수신
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                data = message["text"] if message.get("text") is not None else message.get("bytes")
+                if data is None:
+                    continue
                 
                 # 핑/퐁 메시지 처리
-                if data.strip() == "ping":
+                if isinstance(data, str) and data.strip() == "ping":
                     await websocket.send_text("pong")
                     continue
                 
                 # 종료 메시지 처리
-                if data.strip() == "disconnect":
+                if isinstance(data, str) and data.strip() == "disconnect":
                     logger.info(f"사용자 {user_id}가 정상적으로 연결 종료 요청")
                     await websocket.send_json({
                         "type": "disconnect_ack",
@@ -548,13 +554,29 @@ async def get_walking_system_info():
             system_info["websocket_connections"] = len(websocket_manager.active_connections)
             system_info["connected_users"] = list(websocket_manager.active_connections.keys())
         
-        # 버퍼 정보 (워킹 모드인 경우)
-        if hasattr(websocket_manager, 'imu_batch_buffers'):
+        # 🔧 MODIFIED: 사용자별 IMU 저장 대기 행 수 (write-behind imu 채널, 워킹 모드 매니저는 배치 버퍼)
+        if hasattr(websocket_manager, 'get_imu_pending_by_user'):
+            system_info["imu_buffers"] = websocket_manager.get_imu_pending_by_user()
+        elif hasattr(websocket_manager, 'imu_batch_buffers'):
             system_info["imu_buffers"] = {
                 user_id: len(buffer) 
                 for user_id, buffer in websocket_manager.imu_batch_buffers.items()
             }
         
+        # 🆕 DB 쓰기 대기열 정보 (대기 행 수, 폐기/실패, 플러시 지연)
+        if hasattr(websocket_manager, 'persistence'):
+            system_info["persistence"] = websocket_manager.get_persistence_stats()
+        
+        # 🆕 사용자 존재 캐시 적중률
+        if hasattr(websocket_manager, 'user_cache'):
+            system_info["user_cache"] = websocket_manager.get_user_cache_stats()
+        
+        # 🆕 CSV 백업 기록기 정보 (버퍼 행 수, 열린 파일, fsync)
+        if hasattr(websocket_manager, 'csv_backup'):
+            system_info["csv_backup"] = websocket_manager.csv_backup.get_stats()
+        if getattr(websocket_manager, 'columnar_backup', None) is not None:
+            system_info["columnar_backup"] = websocket_manager.columnar_backup.get_stats()
+        
         # 응급상황 타이머 정보
         if hasattr(websocket_manager, 'emergency_timers'):
             system_info["emergency_timers"] = len(websocket_manager.emergency_timers)
@@ -568,6 +590,23 @@ async def get_walking_system_info():
         logger.error(f"워킹 시스템 정보 조회 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# 🆕 사용자 존재 캐시 무효화 - DB에서 사용자를 삭제/생성한 뒤 호출 (다음 메시지에서 다시 조회/생성)
+@router.delete("/api/walking/user-cache/{user_id}")
+async def invalidate_user_cache(user_id: str):
+    """사용자 1명의 존재 캐시 항목 제거"""
+    if not hasattr(websocket_manager, 'invalidate_user_cache'):
+        return {"status": "error", "message": "사용자 존재 캐시가 없는 WebSocket 매니저입니다."}
+    websocket_manager.invalidate_user_cache(user_id)
+    return {"status": "success", "data": websocket_manager.get_user_cache_stats()}
+
+@router.delete("/api/walking/user-cache")
+async def clear_user_cache():
+    """사용자 존재 캐시 전체 제거"""
+    if not hasattr(websocket_manager, 'invalidate_user_cache'):
+        return {"status": "error", "message": "사용자 존재 캐시가 없는 WebSocket 매니저입니다."}
+    websocket_manager.invalidate_user_cache()
+    return {"status": "success", "data": websocket_manager.get_user_cache_stats()}
+
 @router.get("/api/walking/csv-backup-status")
 async def get_csv_backup_status():
     """워킹 모드: CSV 백업 파일 상태 조회"""
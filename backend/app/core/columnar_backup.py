@@ -0,0 +1,351 @@
+"""
+컬럼형 압축 백업 (NumPy .npz 세그먼트) - CSV 백업의 분석/재생용 보조 형식
+- 배치: {root}/{user_id}/{KST 날짜}/{종류}-{첫 시각 us}-{마지막 시각 us}.npz
+  → 파일 이름만으로 사용자/날짜/시간 범위를 골라 읽음 (다른 사용자 파일은 열지 않음)
+- 열: 타임스탬프(epoch us, 차분 부호화) + 센서 값 float32, 낙상 sensor_data JSON은 6개 열로 펼침
+  (acceleration/gyroscope 외 키가 있으면 sensor_extra 열에 JSON으로 보존)
+- 압축: 열마다 바이트 셔플 후 np.savez_compressed (zlib) → 같은 자리 바이트끼리 모여 압축률 향상
+- ColumnarBackupWriter: 실시간 기록용 (행 버퍼 → segment_rows 또는 segment_seconds마다 세그먼트 봉인, 백그라운드 스레드)
+- read_range(): 한 사용자의 시간 범위 로드, convert_csv_file(): 기존 imu_*/fall_* CSV 변환 (tools/convert_backup.py)
+"""
+
+import csv
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+KST = datetime.timezone(datetime.timedelta(hours=9))
+FORMAT_VERSION = 1
+VALUE_DTYPE = np.float32             # 센서 값 (16비트 ADC 값에는 float32 정밀도로 충분)
+SENSOR_COLUMNS = ('acc_x', 'acc_y', 'acc_z', 'gyr_x', 'gyr_y', 'gyr_z')
+KIND_COLUMNS = {
+    'imu': SENSOR_COLUMNS,
+    'fall': ('fall_detected', 'confidence_score') + SENSOR_COLUMNS,
+}
+SEGMENT_ROWS = 36000                 # 세그먼트 최대 행 수 (10Hz 1시간)
+SEGMENT_SECONDS = 600.0              # 실시간 기록 시 세그먼트 최대 보관 시간 (초, 프로세스 중단 시 손실 상한)
+
+TimeLike = Union[str, float, int, datetime.datetime]
+
+# ===== 시간 변환 =====
+
+def to_epoch_us(value: TimeLike) -> int:
+    """ISO 문자열 / datetime / epoch 초 → epoch 마이크로초 (시간대 없으면 KST로 간주)"""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(round(float(value) * 1_000_000))
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=KST)
+    delta = value - datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+def kst_day_of(ts_us: int) -> str:
+    return time.strftime('%Y%m%d', time.gmtime(ts_us // 1_000_000 + 9 * 3600))
+
+def _safe_name(user_id: str) -> str:
+    return str(user_id).replace(os.sep, '_').replace('/', '_') or '_'
+
+# ===== 세그먼트 부호화 =====
+
+def _shuffle(values: np.ndarray) -> np.ndarray:
+    """바이트 셔플: (n,) itemsize바이트 → (itemsize, n) uint8"""
+    return np.ascontiguousarray(values).view(np.uint8).reshape(-1, values.dtype.itemsize).T.copy()
+
+def _unshuffle(data: np.ndarray, dtype) -> np.ndarray:
+    return np.ascontiguousarray(data.T).view(dtype).reshape(-1)
+
+def _encode(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    ts = columns['ts_us'].astype(np.int64)
+    arrays = {'version': np.array(FORMAT_VERSION), 'ts': _shuffle(np.diff(ts, prepend=np.int64(0)))}
+    for name, values in columns.items():
+        if name == 'ts_us':
+            continue
+        if values.dtype.kind in 'fiub':
+            arrays[name] = _shuffle(values)
+            arrays[name + '.dtype'] = np.array(values.dtype.str)
+        else:
+            arrays[name] = values
+    return arrays
+
+def _decode(arrays) -> Dict[str, np.ndarray]:
+    columns = {'ts_us': np.cumsum(_unshuffle(arrays['ts'], np.int64))}
+    for name in arrays.files:
+        if name in ('version', 'ts') or name.endswith('.dtype'):
+            continue
+        if name + '.dtype' in arrays.files:
+            columns[name] = _unshuffle(arrays[name], np.dtype(str(arrays[name + '.dtype'])))
+        else:
+            columns[name] = arrays[name]
+    return columns
+
+def _column_dtype(name: str):
+    return {'ts_us': np.int64, 'fall_detected': np.bool_}.get(name, VALUE_DTYPE)
+
+def _rows_to_columns(kind: str, rows: List[list]) -> Dict[str, np.ndarray]:
+    """[ts_us, 값...] 행 목록 → 열 배열 (시간순 정렬)"""
+    rows = sorted(rows, key=lambda row: row[0])
+    names = KIND_COLUMNS[kind]
+    columns = {'ts_us': np.array([row[0] for row in rows], dtype=np.int64)}
+    for i, name in enumerate(names, start=1):
+        columns[name] = np.array([row[i] for row in rows], dtype=_column_dtype(name))
+    extras = [row[len(names) + 1] if len(row) > len(names) + 1 else '' for row in rows]
+    if any(extras):
+        columns['sensor_extra'] = np.array(extras, dtype=str)
+    return columns
+
+def write_segment(root: str, kind: str, user_id: str, rows: List[list], overwrite: bool = False) -> Optional[str]:
+    """한 사용자/날짜의 행을 세그먼트 파일로 저장 (같은 범위 파일이 있으면 건너뜀), 저장 경로 반환"""
+    if not rows:
+        return None
+    columns = _rows_to_columns(kind, rows)
+    first, last = int(columns['ts_us'][0]), int(columns['ts_us'][-1])
+    folder = os.path.join(root, _safe_name(user_id), kst_day_of(first))
+    path = os.path.join(folder, f"{kind}-{first}-{last}.npz")
+    if os.path.exists(path) and not overwrite:
+        return None
+    os.makedirs(folder, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **_encode(columns))
+    os.replace(tmp_path, path)
+    return path
+
+# ===== 행 변환 (CSV / 실시간 메시지 공용) =====
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+def imu_row(data: Dict[str, Any]) -> list:
+    return [to_epoch_us(data['timestamp'])] + [_float(data.get(name)) for name in SENSOR_COLUMNS]
+
+def fall_row(data: Dict[str, Any]) -> list:
+    sensor = data.get('sensor_data') or {}
+    if isinstance(sensor, str):
+        try:
+            sensor = json.loads(sensor)
+        except ValueError:
+            sensor = {'raw': sensor}
+    if not isinstance(sensor, dict):
+        sensor = {'raw': sensor}
+    acc = sensor.get('acceleration') or {}
+    gyr = sensor.get('gyroscope') or {}
+    extra = {k: v for k, v in sensor.items() if k not in ('acceleration', 'gyroscope')}
+    detected = data.get('fall_detected', True)
+    if isinstance(detected, str):
+        detected = detected.strip().lower() in ('true', '1', 'yes')
+    return ([to_epoch_us(data['timestamp']), bool(detected), _float(data.get('confidence_score'))]
+            + [_float(acc.get(axis)) for axis in 'xyz'] + [_float(gyr.get(axis)) for axis in 'xyz']
+            + ([json.dumps(extra, ensure_ascii=False)] if extra else []))
+
+ROW_BUILDERS = {'imu': imu_row, 'fall': fall_row}
+
+# ===== 읽기 =====
+
+def _segment_range(name: str) -> Optional[Tuple[str, int, int]]:
+    if not name.endswith('.npz'):
+        return None
+    try:
+        kind, first, last = name[:-4].rsplit('-', 2)
+        return kind, int(first), int(last)
+    except ValueError:
+        return None
+
+def list_segments(root: str, user_id: str, kind: str = 'imu', start: Optional[TimeLike] = None,
+                  end: Optional[TimeLike] = None) -> List[str]:
+    """시간 범위와 겹치는 세그먼트 경로 (해당 사용자 폴더의 해당 날짜 폴더만 확인)"""
+    start_us = to_epoch_us(start) if start is not None else None
+    end_us = to_epoch_us(end) if end is not None else None
+    user_dir = os.path.join(root, _safe_name(user_id))
+    if not os.path.isdir(user_dir):
+        return []
+    first_day = kst_day_of(start_us) if start_us is not None else None
+    last_day = kst_day_of(end_us) if end_us is not None else None
+    paths = []
+    for day in sorted(os.listdir(user_dir)):
+        if (first_day and day < first_day) or (last_day and day > last_day):
+            continue
+        for name in sorted(os.listdir(os.path.join(user_dir, day))):
+            parsed = _segment_range(name)
+            if parsed is None or parsed[0] != kind:
+                continue
+            if (start_us is not None and parsed[2] < start_us) or (end_us is not None and parsed[1] > end_us):
+                continue
+            paths.append(os.path.join(user_dir, day, name))
+    return paths
+
+def read_range(root: str, user_id: str, kind: str = 'imu', start: Optional[TimeLike] = None,
+               end: Optional[TimeLike] = None) -> Dict[str, np.ndarray]:
+    """
+    한 사용자의 [start, end] 구간 행을 열 배열로 로드 (시간순)
+    - 반환: {'timestamp': epoch 초 float64, 'ts_us': int64, 'acc_x': ..., ...} (행이 없으면 길이 0 배열)
+    """
+    start_us = to_epoch_us(start) if start is not None else None
+    end_us = to_epoch_us(end) if end is not None else None
+    parts: List[Dict[str, np.ndarray]] = []
+    for path in list_segments(root, user_id, kind, start, end):
+        with np.load(path) as arrays:
+            columns = _decode(arrays)
+        ts = columns['ts_us']
+        lo = np.searchsorted(ts, start_us, 'left') if start_us is not None else 0
+        hi = np.searchsorted(ts, end_us, 'right') if end_us is not None else len(ts)
+        if hi > lo:
+            parts.append({name: values[lo:hi] for name, values in columns.items()})
+
+    names = ['ts_us'] + list(KIND_COLUMNS[kind])
+    if any('sensor_extra' in part for part in parts):
+        names.append('sensor_extra')
+    result = {}
+    for name in names:
+        chunks = [part[name] if name in part else np.full(len(part['ts_us']), '') for part in parts]
+        result[name] = np.concatenate(chunks) if chunks else np.array([], dtype=_column_dtype(name))
+    if parts:
+        order = np.argsort(result['ts_us'], kind='stable')
+        result = {name: values[order] for name, values in result.items()}
+    result['timestamp'] = result['ts_us'] / 1_000_000
+    return result
+
+# ===== CSV 변환 =====
+
+def csv_kind(filename: str) -> Optional[str]:
+    """imu_*.csv / fall_*.csv (fall_data_*.csv 포함) → 종류, 그 외 None"""
+    name = os.path.basename(filename)
+    if not name.endswith('.csv'):
+        return None
+    for kind in ('imu', 'fall'):
+        if name.startswith(kind + '_'):
+            return kind
+    return None
+
+def convert_csv_file(path: str, root: str, overwrite: bool = False, segment_rows: int = SEGMENT_ROWS) -> Dict[str, int]:
+    """CSV 백업 1개를 사용자/날짜별 세그먼트로 변환 → {'kind', 'rows', 'skipped', 'segments', 'users': {사용자: 행 수}}"""
+    kind = csv_kind(path)
+    if kind is None:
+        raise ValueError(f"Not an imu_/fall_ backup CSV: {path}")
+    build = ROW_BUILDERS[kind]
+    partitions: Dict[Tuple[str, str], List[list]] = {}
+    stats = {'kind': kind, 'rows': 0, 'skipped': 0, 'segments': 0, 'users': {}}
+    with open(path, newline='', encoding='utf-8') as f:
+        for record in csv.DictReader(f):
+            try:
+                row = build(record)
+            except (KeyError, ValueError, TypeError):
+                stats['skipped'] += 1
+                continue
+            user_id = record.get('user_id') or 'unknown'
+            partitions.setdefault((user_id, kst_day_of(row[0])), []).append(row)
+            stats['rows'] += 1
+            stats['users'][user_id] = stats['users'].get(user_id, 0) + 1
+    for (user_id, _), rows in partitions.items():
+        rows.sort(key=lambda row: row[0])
+        for i in range(0, len(rows), segment_rows):
+            if write_segment(root, kind, user_id, rows[i:i + segment_rows], overwrite=overwrite):
+                stats['segments'] += 1
+    return stats
+
+# ===== 실시간 기록 =====
+
+class ColumnarBackupWriter:
+    """실시간 컬럼형 백업 (write()는 버퍼에만 추가, 봉인/압축은 백그라운드 스레드)"""
+
+    def __init__(self, root: str, segment_rows: int = SEGMENT_ROWS, segment_seconds: float = SEGMENT_SECONDS,
+                 check_interval: float = 1.0):
+        self.root = root
+        self.segment_rows = segment_rows
+        self.segment_seconds = segment_seconds
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._partitions: Dict[Tuple[str, str, str], List[Any]] = {}   # (종류, 사용자, 날짜) → [시작 시각, 행 목록]
+        self._closing = False
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # 통계
+        self.rows_buffered = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.segments = 0
+        self.bytes_written = 0
+
+    def write(self, kind: str, data: Dict[str, Any]):
+        try:
+            row = ROW_BUILDERS[kind](data)
+        except (KeyError, ValueError, TypeError) as e:
+            self.rows_failed += 1
+            logger.debug(f"컬럼형 백업 행 변환 실패 [{kind}]: {e}")
+            return
+        key = (kind, data.get('user_id') or 'unknown', kst_day_of(row[0]))
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is None:
+                partition = self._partitions[key] = [time.monotonic(), []]
+            partition[1].append(row)
+            full = len(partition[1]) >= self.segment_rows
+        self.rows_buffered += 1
+        if self._thread is None:
+            self._start()
+        if full:
+            self._wakeup.set()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='columnar-backup', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._closing:
+            self._wakeup.wait(self.check_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"컬럼형 백업 스레드 오류: {e}")
+
+    def flush(self, force: bool = False):
+        """가득 찼거나 오래된 (force면 모든) 파티션을 세그먼트로 봉인"""
+        now = time.monotonic()
+        with self._lock:
+            sealed = [(key, partition[1]) for key, partition in self._partitions.items()
+                      if force or len(partition[1]) >= self.segment_rows or now - partition[0] >= self.segment_seconds]
+            for key, _ in sealed:
+                del self._partitions[key]
+        for (kind, user_id, _), rows in sealed:
+            try:
+                path = write_segment(self.root, kind, user_id, rows, overwrite=True)
+                self.rows_written += len(rows)
+                self.segments += 1
+                self.bytes_written += os.path.getsize(path)
+            except Exception as e:
+                self.rows_failed += len(rows)
+                logger.error(f"컬럼형 백업 세그먼트 저장 실패 [{kind}/{user_id}] ({len(rows)}행): {e}")
+
+    def close(self):
+        self._closing = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self.flush(force=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'pending': sum(len(partition[1]) for partition in list(self._partitions.values())),
+            'partitions': len(self._partitions),
+            'buffered': self.rows_buffered,
+            'written': self.rows_written,
+            'failed': self.rows_failed,
+            'segments': self.segments,
+            'bytes_written': self.bytes_written,
+        }
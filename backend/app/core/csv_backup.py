@@ -0,0 +1,222 @@
+"""
+CSV 백업 기록기 - 메시지마다 파일을 열고 닫던 _save_to_csv 대체
+- write()는 행을 메모리 버퍼에 넣고 바로 반환 (파일 I/O 없음, 이벤트 루프를 막지 않음)
+- 백그라운드 스레드가 flush_interval마다 (또는 flush_rows 이상 쌓이면 즉시) 파일에 기록
+- 사용자/종류/날짜별 파일 핸들을 열어 둔 채 재사용, 헤더는 새 파일에만
+- 선택적 fsync (fsync_interval마다, 0이면 OS에 맡김) → 전원 차단 시 손실 구간 상한
+- KST 자정에 새 날짜 파일로 전환 (이전 날짜 핸들은 남은 행 기록 후 닫음),
+  idle_timeout 동안 쓰지 않은 핸들과 max_open_files 초과분(가장 오래 안 쓴 것)은 닫음
+- 기록 실패(디스크 오류 등) 행은 로그와 통계에 남기고 버림
+"""
+
+import csv
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KST_OFFSET = 9 * 3600
+FLUSH_INTERVAL = 1.0        # 초
+FLUSH_ROWS = 10000          # 이만큼 쌓이면 주기를 기다리지 않고 기록
+FSYNC_INTERVAL = 5.0        # 초 (0: fsync 안 함)
+IDLE_TIMEOUT = 300.0        # 초, 이 시간 동안 쓰지 않은 파일 닫기
+MAX_OPEN_FILES = 512
+STATS_HISTORY = 1000
+
+def kst_day(now: Optional[float] = None) -> str:
+    """KST 기준 날짜 (파일 이름용 YYYYMMDD)"""
+    return time.strftime('%Y%m%d', time.gmtime((time.time() if now is None else now) + KST_OFFSET))
+
+class _OpenFile:
+    __slots__ = ('handle', 'writer', 'day', 'last_used', 'dirty')
+
+    def __init__(self, handle, day: str):
+        self.handle = handle
+        self.writer = csv.writer(handle)
+        self.day = day
+        self.last_used = time.monotonic()
+        self.dirty = False
+
+class CsvBackupWriter:
+    """버퍼링 CSV 백업 기록기 (첫 write()에서 백그라운드 스레드 시작)"""
+
+    def __init__(self, folder: str, flush_interval: float = FLUSH_INTERVAL, flush_rows: int = FLUSH_ROWS,
+                 fsync_interval: float = FSYNC_INTERVAL, idle_timeout: float = IDLE_TIMEOUT,
+                 max_open_files: int = MAX_OPEN_FILES):
+        self.folder = folder
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.fsync_interval = fsync_interval
+        self.idle_timeout = idle_timeout
+        self.max_open_files = max_open_files
+
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], Tuple[List[str], List[list]]] = {}
+        self._pending_rows = 0
+        self._wakeup = threading.Event()
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self._files: 'OrderedDict[str, _OpenFile]' = OrderedDict()   # 파일 경로 → 핸들 (가장 오래 안 쓴 순)
+        self._day = kst_day()
+        self._next_midnight = self._midnight_after(time.time())
+        self._last_fsync = time.monotonic()
+
+        # 통계
+        self.rows_buffered = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.max_pending = 0
+        self.flushes = 0
+        self.fsyncs = 0
+        self.opened = 0
+        self.rotations = 0
+        self.flush_times = deque(maxlen=STATS_HISTORY)
+
+    @staticmethod
+    def _midnight_after(now: float) -> float:
+        return (int((now + KST_OFFSET) // 86400) + 1) * 86400 - KST_OFFSET
+
+    def write(self, file_prefix: str, fieldnames: List[str], data: Dict[str, Any]):
+        """행 1개를 버퍼에 추가 (파일: {folder}/{file_prefix}_{KST 날짜}.csv)"""
+        now = time.time()
+        if now >= self._next_midnight:
+            self._day = kst_day(now)
+            self._next_midnight = self._midnight_after(now)
+        row = [data.get(k, '') for k in fieldnames]
+        key = (file_prefix, self._day)
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = (fieldnames, [])
+            entry[1].append(row)
+            self._pending_rows += 1
+            pending = self._pending_rows
+        self.rows_buffered += 1
+        if pending > self.max_pending:
+            self.max_pending = pending
+        if self._thread is None:
+            self._start()
+        if pending >= self.flush_rows:
+            self._wakeup.set()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            os.makedirs(self.folder, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name='csv-backup', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._closing:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"CSV 백업 기록 스레드 오류: {e}")
+
+    def _open(self, path: str, fieldnames: List[str], day: str) -> _OpenFile:
+        opened = self._files.get(path)
+        if opened is not None:
+            self._files.move_to_end(path)
+            return opened
+        while len(self._files) >= self.max_open_files:
+            _, oldest = self._files.popitem(last=False)
+            self._close_file(oldest)
+        handle = open(path, 'a', newline='', encoding='utf-8')
+        opened = _OpenFile(handle, day)
+        if handle.tell() == 0:
+            opened.writer.writerow(fieldnames)
+        self._files[path] = opened
+        self.opened += 1
+        return opened
+
+    def _close_file(self, opened: _OpenFile, fsync: bool = False):
+        try:
+            opened.handle.flush()
+            if fsync and opened.dirty:
+                os.fsync(opened.handle.fileno())
+            opened.handle.close()
+        except Exception as e:
+            logger.error(f"CSV 백업 파일 닫기 실패: {e}")
+
+    def flush(self, fsync: bool = False):
+        """버퍼의 행을 모두 파일에 기록 (백그라운드 스레드 또는 종료 시 호출)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_rows = 0
+        started = time.monotonic()
+        for (file_prefix, day), (fieldnames, rows) in pending.items():
+            path = os.path.join(self.folder, f"{file_prefix}_{day}.csv")
+            try:
+                opened = self._open(path, fieldnames, day)
+                opened.writer.writerows(rows)
+                opened.handle.flush()
+                opened.last_used = started
+                opened.dirty = True
+                self.rows_written += len(rows)
+            except Exception as e:
+                self.rows_failed += len(rows)
+                logger.error(f"CSV 백업 기록 실패 [{path}] ({len(rows)}행): {e}")
+                stale = self._files.pop(path, None)
+                if stale is not None:
+                    self._close_file(stale)
+
+        now = time.monotonic()
+        if pending:
+            self.flushes += 1
+            self.flush_times.append(now - started)
+        if fsync or (self.fsync_interval and now - self._last_fsync >= self.fsync_interval):
+            self._fsync()
+            self._last_fsync = now
+
+        # 날짜가 바뀐 파일과 오래 쓰지 않은 파일 닫기
+        today = self._day
+        for path, opened in list(self._files.items()):
+            if opened.day != today or now - opened.last_used >= self.idle_timeout:
+                del self._files[path]
+                self._close_file(opened, fsync=bool(self.fsync_interval))
+                if opened.day != today:
+                    self.rotations += 1
+
+    def _fsync(self):
+        for opened in self._files.values():
+            if opened.dirty:
+                try:
+                    os.fsync(opened.handle.fileno())
+                    opened.dirty = False
+                    self.fsyncs += 1
+                except Exception as e:
+                    logger.error(f"CSV 백업 fsync 실패: {e}")
+
+    def close(self):
+        """남은 행 기록 + fsync 후 모든 파일 닫기"""
+        self._closing = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self.flush(fsync=True)
+        for opened in self._files.values():
+            self._close_file(opened)
+        self._files.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        flush_times = sorted(self.flush_times)
+        return {
+            'pending': self._pending_rows,
+            'max_pending': self.max_pending,
+            'buffered': self.rows_buffered,
+            'written': self.rows_written,
+            'failed': self.rows_failed,
+            'open_files': len(self._files),
+            'opened': self.opened,
+            'rotations': self.rotations,
+            'flushes': self.flushes,
+            'fsyncs': self.fsyncs,
+            'flush_p99_ms': flush_times[int((len(flush_times) - 1) * 0.99)] * 1000 if flush_times else 0.0,
+        }
@@ -0,0 +1,87 @@
+"""
+데드밴드 압축 IMU 스트림 복원 (라즈베리파이 DeadbandCompressor와 짝)
+- 라즈베리파이는 선형 보간 복원 오차가 허용 범위(DEADBAND_ERROR)를 넘을 때만 샘플 전송
+  (JSON: 패키지 'encoding': 'deadband', 바이너리 프레임: flags bit2)
+- 서버는 연속한 두 샘플 사이를 RECONSTRUCT_RATE 격자로 선형 보간해 기존 고정 주기 업로드와 같은 행 생성
+- MAX_INTERPOLATION_GAP보다 긴 공백(보행 종료, 연결 끊김)은 보간하지 않고 새 구간 시작
+- 압축률 = 복원 행 수 / 수신 샘플 수, 복원 오차는 라즈베리파이가 하트비트로 보고한 실제 오차 사용
+"""
+
+import datetime
+import math
+from typing import Any, Dict, List, Optional
+
+DEADBAND_ENCODING = 'deadband'
+FRAME_FLAG_DEADBAND = 0x04
+RECONSTRUCT_RATE = 10.0        # 복원 격자 (Hz, 고정 업로드 SEND_RATE와 동일)
+MAX_INTERPOLATION_GAP = 2.0    # 초 (라즈베리파이 DEADBAND_MAX_INTERVAL보다 길게)
+IMU_FIELDS = ('acc_x', 'acc_y', 'acc_z', 'gyr_x', 'gyr_y', 'gyr_z')
+
+def is_deadband_frame(payload: bytes) -> bool:
+    """바이너리 프레임 flags의 데드밴드 비트 확인 (헤더 5번째 바이트)"""
+    return len(payload) > 5 and bool(payload[5] & FRAME_FLAG_DEADBAND)
+
+class DeadbandReconstructor:
+    """사용자별 데드밴드 샘플 → 고정 격자 행 복원 및 압축 통계"""
+
+    def __init__(self, user_id: str, rate: float = RECONSTRUCT_RATE, max_gap: float = MAX_INTERPOLATION_GAP):
+        self.user_id = user_id
+        self.step = 1.0 / rate
+        self.max_gap = max_gap
+        self._last: Optional[Dict[str, Any]] = None
+        self._last_time: Optional[float] = None
+        self.points_received = 0
+        self.rows_reconstructed = 0
+        self.gaps = 0
+        self.reported: Dict[str, Any] = {}  # 라즈베리파이 하트비트의 imu_compression
+
+    def add(self, row: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """수신 샘플 1개 → 직전 샘플 이후 ~ 이 샘플까지의 격자 행 (시간순)"""
+        timestamp = datetime.datetime.fromisoformat(row['timestamp'])
+        t = timestamp.timestamp()
+        self.points_received += 1
+
+        if self._last_time is None or t - self._last_time > self.max_gap or t <= self._last_time:
+            # 새 구간: 격자를 이 샘플 시각에 맞춰 시작
+            if self._last_time is not None:
+                self.gaps += 1
+            rows = [dict(row)]
+        else:
+            rows = []
+            grid = (math.floor(self._last_time / self.step) + 1) * self.step
+            span = t - self._last_time
+            while grid <= t + 1e-9:
+                ratio = (grid - self._last_time) / span
+                reconstructed = {
+                    'user_id': row.get('user_id', self.user_id),
+                    'timestamp': datetime.datetime.fromtimestamp(grid, timestamp.tzinfo).isoformat(),
+                }
+                for field in IMU_FIELDS:
+                    start = float(self._last[field])
+                    reconstructed[field] = start + ratio * (float(row[field]) - start)
+                rows.append(reconstructed)
+                grid += self.step
+
+        self._last = row
+        self._last_time = t
+        self.rows_reconstructed += len(rows)
+        return rows
+
+    def reset(self):
+        self._last = None
+        self._last_time = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {
+            'points_received': self.points_received,
+            'rows_reconstructed': self.rows_reconstructed,
+            'compression_ratio': self.rows_reconstructed / self.points_received if self.points_received else 0.0,
+            'gaps': self.gaps,
+        }
+        if self.reported:
+            # 라즈베리파이 원본(100Hz) 대비 압축률과 실제 복원 오차
+            stats['source_compression_ratio'] = self.reported.get('compression_ratio')
+            stats['max_error'] = self.reported.get('max_error')
+            stats['rms_error'] = self.reported.get('rms_error')
+            stats['error_bound'] = self.reported.get('error_bound')
+        return stats
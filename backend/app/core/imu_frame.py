@@ -0,0 +1,71 @@
+"""
+IMU 바이너리 배치 프레임 디코더 (라즈베리파이 encode_imu_frame과 짝)
+- 접속 시 connection_health_check의 frame_formats로 협상, 협상된 연결만 바이너리 메시지 전송
+- 고정 헤더 + 샘플별 시각 오프셋(ms) + float32 또는 int16 양자화 6축 샘플
+- JSON 경로(create_imu_package)의 'data'와 같은 행(dict) 생성 → 기존 IMU 처리 그대로 사용
+
+프레임 구조 (little-endian):
+    magic 'IMUB' | version u8 | flags u8 | count u16 | base_time f64 (epoch 초) | scale f32
+    | state u8 | confidence f32 | offsets u16 × count (base_time 기준 ms) | samples (f32 | i16) × 6 × count
+    flags: bit0 = int16 샘플 (값 = 정수 × scale), bit1 = 상태 정보 포함,
+           bit2 = 데드밴드 압축 샘플 (app/core/deadband.py에서 선형 보간 복원)
+"""
+
+import datetime
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+IMU_FRAME_FORMAT = 'imu_frame_v1'
+FRAME_MAGIC = b'IMUB'
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct('<4sBBHdfBf')
+FLAG_INT16 = 0x01
+FLAG_STATE = 0x02
+# 라즈베리파이 create_imu_package의 state_info['state'] 값과 같은 순서
+STATE_CODES = ('Daily', 'Walking', 'Fall')
+IMU_FIELDS = ('acc_x', 'acc_y', 'acc_z', 'gyr_x', 'gyr_y', 'gyr_z')
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+def is_imu_frame(payload: bytes) -> bool:
+    return payload[:len(FRAME_MAGIC)] == FRAME_MAGIC
+
+def decode_imu_frame(payload: bytes, user_id: str) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """바이너리 프레임 → (IMU 행 목록, state_info 또는 None). 형식 오류 시 ValueError"""
+    if len(payload) < FRAME_HEADER.size:
+        raise ValueError(f"frame too short ({len(payload)} bytes)")
+    magic, version, flags, count, base_time, scale, state, confidence = FRAME_HEADER.unpack_from(payload)
+    if magic != FRAME_MAGIC:
+        raise ValueError("not an IMU frame")
+    if version != FRAME_VERSION:
+        raise ValueError(f"unsupported frame version {version}")
+
+    sample_type = 'h' if flags & FLAG_INT16 else 'f'
+    offsets_size = 2 * count
+    samples_size = struct.calcsize(f'<{6 * count}{sample_type}')
+    if len(payload) != FRAME_HEADER.size + offsets_size + samples_size:
+        raise ValueError(f"frame size mismatch ({len(payload)} bytes for {count} samples)")
+
+    offsets = struct.unpack_from(f'<{count}H', payload, FRAME_HEADER.size)
+    values = struct.unpack_from(f'<{6 * count}{sample_type}', payload, FRAME_HEADER.size + offsets_size)
+    if flags & FLAG_INT16:
+        values = [v * scale for v in values]
+
+    rows = []
+    for i, offset in enumerate(offsets):
+        row = {
+            'user_id': user_id,
+            'timestamp': datetime.datetime.fromtimestamp(base_time + offset / 1000.0, KST).isoformat(),
+        }
+        row.update(zip(IMU_FIELDS, values[6 * i:6 * i + 6]))
+        rows.append(row)
+
+    state_info = None
+    if flags & FLAG_STATE:
+        if state >= len(STATE_CODES):
+            raise ValueError(f"unknown state code {state}")
+        state_info = {
+            'state': STATE_CODES[state],
+            'confidence': confidence,
+            'timestamp': rows[-1]['timestamp'] if rows else datetime.datetime.now(KST).isoformat(),
+        }
+    return rows, state_info
@@ -0,0 +1,123 @@
+"""
+사용자 존재 확인 캐시 - IMU/낙상 메시지마다 하던 get_user_by_id 조회 제거
+- 확인된 사용자(조회 또는 자동 생성 성공)는 ttl 동안 DB 조회 없이 통과
+- 생성 실패 등 확인하지 못한 사용자도 negative_ttl 동안 기억 (메시지마다 생성 재시도 방지)
+- 단일 비행(single-flight): 같은 사용자의 조회/생성은 동시에 1회만, 나머지 메시지는 그 결과를 기다림
+  → 새 디바이스가 연결 직후 메시지를 몰아 보내도 생성 호출은 1번
+- invalidate()로 명시적 무효화 (진행 중인 조회 결과도 캐시에 남기지 않음)
+- 항목 수 상한(max_entries), 넘치면 가장 오래 안 쓴 사용자부터 제거
+- 통계: 적중/부정 적중/합류/조회 수와 적중률
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TTL = 600.0              # 확인된 사용자 유지 시간 (초)
+NEGATIVE_TTL = 30.0      # 확인 실패 사용자 유지 시간 (초), 지나면 다시 조회/생성
+MAX_ENTRIES = 10000
+
+class UserExistenceCache:
+    """loader(user_id) → bool (True: 존재 또는 생성 성공) 결과를 TTL 캐시 + 단일 비행으로 공유"""
+
+    def __init__(self, loader: Callable[[str], Awaitable[bool]], ttl: float = TTL,
+                 negative_ttl: float = NEGATIVE_TTL, max_entries: int = MAX_ENTRIES):
+        self.loader = loader
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[bool, float]]' = OrderedDict()   # 사용자 → (존재 여부, 만료 시각)
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        # 통계
+        self.hits = 0
+        self.negative_hits = 0
+        self.coalesced = 0
+        self.loads = 0
+        self.load_errors = 0
+        self.expired = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    async def ensure(self, user_id: str) -> bool:
+        """사용자 존재 보장 (캐시 적중이면 DB 호출 없음), 존재 확인 여부 반환"""
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            exists, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(user_id)
+                if exists:
+                    self.hits += 1
+                else:
+                    self.negative_hits += 1
+                return exists
+            del self._entries[user_id]
+            self.expired += 1
+
+        task = self._inflight.get(user_id)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = self._inflight[user_id] = asyncio.ensure_future(self._load(user_id))
+        # 기다리던 핸들러가 취소되어도 조회 자체는 끝까지 진행 (다른 메시지가 결과를 공유)
+        return await asyncio.shield(task)
+
+    async def _load(self, user_id: str) -> bool:
+        self.loads += 1
+        task = asyncio.current_task()
+        try:
+            try:
+                exists = bool(await self.loader(user_id))
+            except Exception as e:
+                self.load_errors += 1
+                logger.error(f"사용자 확인 실패 [{user_id}]: {e}")
+                exists = False
+            # 조회 중에 무효화되었으면 결과를 캐시에 남기지 않음
+            if self._inflight.get(user_id) is task:
+                self._store(user_id, exists)
+            return exists
+        finally:
+            if self._inflight.get(user_id) is task:
+                del self._inflight[user_id]
+
+    def _store(self, user_id: str, exists: bool):
+        self._entries[user_id] = (exists, time.monotonic() + (self.ttl if exists else self.negative_ttl))
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: Optional[str] = None, missing_only: bool = False):
+        """캐시 항목 제거 (user_id=None: 전체, missing_only: 확인 실패 항목만)"""
+        user_ids = list(set(self._entries) | set(self._inflight)) if user_id is None else [user_id]
+        for uid in user_ids:
+            entry = self._entries.get(uid)
+            if entry is not None and (not missing_only or not entry[0]):
+                del self._entries[uid]
+                self.invalidations += 1
+            if not missing_only:
+                self._inflight.pop(uid, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.coalesced + self.loads
+        known = sum(1 for exists, _ in self._entries.values() if exists)
+        return {
+            'entries': len(self._entries),
+            'known': known,
+            'missing': len(self._entries) - known,
+            'inflight': len(self._inflight),
+            'lookups': lookups,
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'coalesced': self.coalesced,
+            'loads': self.loads,
+            'load_errors': self.load_errors,
+            'expired': self.expired,
+            'invalidations': self.invalidations,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.negative_hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -9,14 +9,19 @@
 """
 
 from fastapi import WebSocket
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 import json
 import logging
 import os
-import csv
 import datetime
 import asyncio
 from database.supabase_client import supabase_client
+from app.core.imu_frame import IMU_FRAME_FORMAT, decode_imu_frame
+from app.core.deadband import DEADBAND_ENCODING, DeadbandReconstructor, is_deadband_frame
+from app.core.write_behind import WriteBehindQueue
+from app.core.csv_backup import CsvBackupWriter
+from app.core.columnar_backup import ColumnarBackupWriter
+from app.core.user_cache import UserExistenceCache
 from dataclasses import dataclass
 from enum import Enum
 import time
@@ -28,8 +33,32 @@ DATA_FOLDER = 'data_backup'
 
 # IMU 배치 처리 설정
 IMU_SAMPLING_RATE = 10
-IMU_BATCH_SIZE = 5
-IMU_BUFFER_MAX = 50
+
+# 🆕 DB 쓰기 지연(write-behind) 설정 - 핸들러는 적재만, 저장은 백그라운드 태스크가 일괄 처리
+IMU_BATCH_SIZE = 2000         # IMU 일괄 저장 최대 행 수 (전체 사용자 합산, save_imu_batch 1회)
+IMU_BATCH_MIN = 50            # 🆕 적응형 배치 크기 하한 (저장 시간에 맞춰 IMU_BATCH_MIN ~ IMU_BATCH_SIZE)
+IMU_TARGET_WRITE_TIME = 0.5   # 🆕 일괄 저장 1회 목표 시간 (초), 넘으면 배치 크기 절반
+IMU_FLUSH_DELAY = 1.0         # IMU 행이 저장 전에 대기하는 최대 시간 (초)
+IMU_PENDING_MAX = 60000       # IMU 메모리 상한 (행), 넘치면 가장 오래된 행 폐기 (CSV 백업에는 남음)
+FALL_FLUSH_DELAY = 0.05       # 낙상은 거의 즉시 저장, 넘치면 핸들러가 대기 (폐기보다 우선)
+EVENT_FLUSH_DELAY = 0.5       # 상태 변경/보행 세션/응급상황
+EVENT_PENDING_MAX = 10000
+
+# 🆕 CSV 백업 기록기 설정 - 메모리 버퍼 + 백그라운드 스레드 기록, 파일 핸들 재사용
+CSV_FLUSH_INTERVAL = 1.0      # 버퍼 → 파일 기록 주기 (초)
+CSV_FSYNC_INTERVAL = 5.0      # fsync 주기 (초, 0: 안 함) - 전원 차단 시 손실 상한
+CSV_IDLE_TIMEOUT = 300.0      # 이 시간 동안 쓰지 않은 파일 핸들 닫기 (초)
+IMU_CSV_FIELDS = ['timestamp', 'user_id', 'acc_x', 'acc_y', 'acc_z', 'gyr_x', 'gyr_y', 'gyr_z']
+FALL_CSV_FIELDS = ['timestamp', 'user_id', 'fall_detected', 'confidence_score', 'sensor_data']
+
+# 🆕 컬럼형 압축 백업 (선택) - CSV와 함께 사용자/날짜별 .npz 세그먼트로도 기록 (분석/재생용)
+COLUMNAR_BACKUP = os.getenv('COLUMNAR_BACKUP', 'false').lower() == 'true'
+COLUMNAR_FOLDER = 'data_backup_columnar'
+
+# 🆕 사용자 존재 확인 캐시 - 메시지마다 get_user_by_id를 부르지 않음
+USER_CACHE_TTL = 600.0            # 확인된 사용자 캐시 유지 (초)
+USER_CACHE_NEGATIVE_TTL = 30.0    # 생성 실패 사용자 재시도 간격 (초)
+USER_CACHE_MAX = 10000
 
 class UserState(Enum):
     """사용자 상태 정의"""
@@ -93,7 +122,33 @@ class WebSocketManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.data_buffers: Dict[str, List[Dict[str, Any]]] = {}
-        self.imu_batch_buffers: Dict[str, List[Dict[str, Any]]] = {}
+        # 🆕 DB 쓰기 지연 파이프라인 (Supabase 동기 호출을 이벤트 루프 밖 스레드 풀에서 일괄 실행)
+        self.persistence = WriteBehindQueue()
+        # 🔧 MODIFIED: IMU는 사용자별 순서를 지키며 전체 사용자 행을 합쳐 저장 (배치 크기 적응, 부분 실패 분할 재시도)
+        self.persistence.add_channel('imu', supabase_client.save_imu_batch, coalesce_by='user_id',
+                                     max_batch=IMU_BATCH_SIZE, min_batch=IMU_BATCH_MIN,
+                                     target_write_time=IMU_TARGET_WRITE_TIME,
+                                     max_delay=IMU_FLUSH_DELAY, max_pending=IMU_PENDING_MAX)
+        # 🔧 MODIFIED: 낙상도 분할 재시도 채널 - 나쁜 행 하나 때문에 같은 배치의 다른 낙상이 폐기되지 않음
+        self.persistence.add_channel('fall', supabase_client.save_fall_batch, coalesce_by='user_id',
+                                     max_batch=50, min_batch=50, max_delay=FALL_FLUSH_DELAY,
+                                     max_pending=EVENT_PENDING_MAX, overflow='block',
+                                     on_written=self._on_fall_saved)
+        self.persistence.add_channel('user_state', supabase_client.save_user_state_batch, max_batch=200,
+                                     max_delay=EVENT_FLUSH_DELAY, max_pending=EVENT_PENDING_MAX)
+        self.persistence.add_channel('walking_session',
+                                     lambda record: supabase_client.update_walking_session(record['id'], record['update']),
+                                     bulk=False, max_batch=50, max_delay=EVENT_FLUSH_DELAY, max_pending=EVENT_PENDING_MAX)
+        self.persistence.add_channel('emergency', supabase_client.save_emergency_event, bulk=False, max_batch=50,
+                                     max_delay=FALL_FLUSH_DELAY, max_pending=EVENT_PENDING_MAX, overflow='block')
+        # 🆕 사용자 존재 확인 캐시 (TTL + 실패 캐시, 같은 사용자 조회/생성은 동시에 1회)
+        self.user_cache = UserExistenceCache(
+            lambda user_id: self.persistence.call(self._ensure_user_exists_sync, user_id),
+            ttl=USER_CACHE_TTL, negative_ttl=USER_CACHE_NEGATIVE_TTL, max_entries=USER_CACHE_MAX)
+        # 🆕 데드밴드 압축 IMU 복원기 (사용자별, 압축 통계 유지)
+        self.deadband_reconstructors: Dict[str, DeadbandReconstructor] = {}
+        # 🆕 라즈베리파이 하트비트의 런타임 계측 요약 (단계별 실행 시간, 큐 깊이, 재연결)
+        self.device_runtime_stats: Dict[str, Dict[str, Any]] = {}
         
         # 🆕 워킹 모드 전용 기능들
         self.is_walking_mode = os.getenv('WALKING_MODE', 'false').lower() == 'true'
@@ -106,6 +161,10 @@ class WebSocketManager:
             logger.info("🏠 일반 모드로 WebSocket Manager 초기화됨")
         
         self._create_data_folders()
+        # 🆕 CSV 백업 (KST 날짜별 파일, 백그라운드 스레드가 주기적으로 기록)
+        self.csv_backup = CsvBackupWriter(DATA_FOLDER, flush_interval=CSV_FLUSH_INTERVAL,
+                                          fsync_interval=CSV_FSYNC_INTERVAL, idle_timeout=CSV_IDLE_TIMEOUT)
+        self.columnar_backup = ColumnarBackupWriter(COLUMNAR_FOLDER) if COLUMNAR_BACKUP else None
     
     def _create_data_folders(self):
         """데이터 백업용 폴더 생성"""
@@ -116,12 +175,11 @@ class WebSocketManager:
         """WebSocket 연결"""
         await websocket.accept()
         self.active_connections[user_id] = websocket
+        self.persistence.start()
         
         # 기존 초기화
         if user_id not in self.data_buffers:
             self.data_buffers[user_id] = []
-        if user_id not in self.imu_batch_buffers:
-            self.imu_batch_buffers[user_id] = []
         
         # 워킹 모드 전용 초기화
         if self.is_walking_mode:
@@ -161,16 +219,11 @@ class WebSocketManager:
                 # 🛠️ MODIFIED [2025-01-27]: 버퍼 정리 추가 - 메모리 누수 방지
                 if user_id in self.data_buffers:
                     del self.data_buffers[user_id]
-                if user_id in self.imu_batch_buffers:
-                    # 남은 배치 데이터 저장 시도
-                    if self.imu_batch_buffers[user_id]:
-                        try:
-                            for data in self.imu_batch_buffers[user_id]:
-                                supabase_client.save_imu_data(data)
-                            logger.info(f"연결 해제 시 남은 IMU 배치 저장 완료 [{user_id}]")
-                        except Exception as e:
-                            logger.error(f"연결 해제 시 IMU 배치 저장 실패 [{user_id}]: {e}")
-                    del self.imu_batch_buffers[user_id]
+                # 🔧 MODIFIED: 남은 IMU 행은 write-behind 대기열에서 저장됨 (연결 해제 시 동기 저장 제거)
+                if user_id in self.deadband_reconstructors:
+                    self.deadband_reconstructors[user_id].reset()
+                # 🆕 생성에 실패했던 사용자는 재연결 시 바로 다시 시도 (확인된 사용자 캐시는 유지)
+                self.user_cache.invalidate(user_id, missing_only=True)
                 
                 # 워킹 모드 전용 정리
                 if self.is_walking_mode:
@@ -194,9 +247,13 @@ class WebSocketManager:
             except Exception as e:
                 logger.warning(f"연결 해제 중 오류: {e}")
     
-    async def handle_received_data(self, data: str, user_id: str):
-        """수신된 데이터 통합 처리 - 연결 상태 확인 포함"""
+    async def handle_received_data(self, data: Union[str, bytes], user_id: str):
+        """수신된 데이터 통합 처리 - 연결 상태 확인 포함 (bytes: 협상된 IMU 바이너리 프레임)"""
         try:
+            if isinstance(data, bytes):
+                await self._process_imu_frame(data, user_id)
+                return
+            
             parsed_data = json.loads(data)
             data_type = parsed_data.get('type', 'unknown')
             
@@ -208,7 +265,10 @@ class WebSocketManager:
                 await self._handle_heartbeat(user_id, parsed_data)
                 return
             elif data_type == 'imu_data':
-                await self._process_imu_data(parsed_data['data'], user_id, parsed_data.get('state_info'))
+                if parsed_data.get('encoding') == DEADBAND_ENCODING:
+                    await self._process_deadband_imu([parsed_data['data']], user_id, parsed_data.get('state_info'))
+                else:
+                    await self._process_imu_data(parsed_data['data'], user_id, parsed_data.get('state_info'))
             elif data_type == 'fall_detection':
                 await self._process_fall_data(parsed_data['data'], user_id, parsed_data.get('state_info'))
             else:
@@ -220,6 +280,39 @@ class WebSocketManager:
         except Exception as e:
             logger.error(f"데이터 처리 실패 [{user_id}]: {e}")
     
+    async def _process_imu_frame(self, payload: bytes, user_id: str):
+        """🆕 IMU 바이너리 배치 프레임 처리 - JSON 경로와 같은 행으로 풀어 처리, 응답은 프레임당 1회"""
+        try:
+            rows, state_info = decode_imu_frame(payload, user_id)
+        except ValueError as e:
+            logger.error(f"IMU 프레임 디코딩 실패 [{user_id}]: {e}")
+            return
+        if not rows:
+            return
+        if is_deadband_frame(payload):
+            await self._process_deadband_imu(rows, user_id, state_info)
+            return
+        for row in rows:
+            await self._process_imu_data(row, user_id, state_info, acknowledge=False)
+        
+        response_data = self._imu_ack(rows[-1], user_id)
+        response_data['batch_size'] = len(rows)
+        await self._safe_send(response_data, user_id)
+    
+    async def _process_deadband_imu(self, points: List[Dict[str, Any]], user_id: str, state_info: dict = None):
+        """🆕 데드밴드 압축 샘플 → 고정 격자 행으로 선형 보간 복원 후 기존 IMU 처리 (응답은 메시지당 1회)"""
+        reconstructor = self.deadband_reconstructors.get(user_id)
+        if reconstructor is None:
+            reconstructor = self.deadband_reconstructors[user_id] = DeadbandReconstructor(user_id)
+        rows = [row for point in points for row in reconstructor.add(point)]
+        for row in rows:
+            await self._process_imu_data(row, user_id, state_info, acknowledge=False)
+        
+        response_data = self._imu_ack(points[-1], user_id)
+        response_data['batch_size'] = len(rows)
+        response_data['points'] = len(points)
+        await self._safe_send(response_data, user_id)
+    
     async def _handle_health_check(self, user_id: str, health_data: dict):
         """연결 상태 확인 메시지 처리"""
         logger.info(f"💓 연결 상태 확인 수신 [{user_id}]")
@@ -234,12 +327,32 @@ class WebSocketManager:
             'user_id': user_id
         }
         
+        # 🆕 전송 형식 협상: 클라이언트가 지원하는 형식 중 서버가 디코딩할 수 있는 것 선택
+        client_formats = health_data.get('frame_formats') or []
+        response['frame_format'] = IMU_FRAME_FORMAT if IMU_FRAME_FORMAT in client_formats else 'json'
+        
         await self._safe_send(response, user_id)
     
     async def _handle_heartbeat(self, user_id: str, heartbeat_data: dict):
         """하트비트 메시지 처리"""
         logger.debug(f"💓 하트비트 수신 [{user_id}]")
         
+        # 🆕 라즈베리파이 런타임 계측 요약 보관
+        if heartbeat_data.get('runtime_stats'):
+            self.device_runtime_stats[user_id] = heartbeat_data['runtime_stats']
+            logger.debug(f"⏲️ 런타임 통계 [{user_id}]: {heartbeat_data['runtime_stats']}")
+        
+        # 🆕 라즈베리파이가 보고한 데드밴드 압축 통계 (원본 대비 압축률, 실제 복원 오차)
+        if heartbeat_data.get('imu_compression'):
+            reconstructor = self.deadband_reconstructors.get(user_id)
+            if reconstructor is None:
+                reconstructor = self.deadband_reconstructors[user_id] = DeadbandReconstructor(user_id)
+            reconstructor.reported = heartbeat_data['imu_compression']
+            stats = reconstructor.get_stats()
+            logger.info(f"🗜️ IMU 데드밴드 [{user_id}]: 수신 {stats['points_received']}개 → 복원 {stats['rows_reconstructed']}행 "
+                        f"({stats['compression_ratio']:.1f}배), 원본 대비 {stats['source_compression_ratio'] or 0:.1f}배, "
+                        f"복원 오차 최대 {stats['max_error'] or 0:.3f} / RMS {stats['rms_error'] or 0:.4f}")
+        
         # 간단한 응답 전송 (선택적)
         response = {
             'type': 'heartbeat_ack',
@@ -251,8 +364,9 @@ class WebSocketManager:
         
         await self._safe_send(response, user_id)
     
-    async def _process_imu_data(self, imu_data: dict, user_id: str, state_info: dict = None):
-        """IMU 데이터 처리 - 워킹 모드에서 보행 세션 관리 포함"""
+    async def _process_imu_data(self, imu_data: dict, user_id: str, state_info: dict = None,
+                                acknowledge: bool = True):
+        """IMU 데이터 처리 - 워킹 모드에서 보행 세션 관리 포함 (acknowledge=False: 배치 프레임이 응답 담당)"""
         # 사용자 확인
         await self._ensure_user_exists(user_id)
         
@@ -270,31 +384,18 @@ class WebSocketManager:
                 datetime.timezone(datetime.timedelta(hours=9))
             ).isoformat()
         
-        # 배치 버퍼에 추가
-        if user_id not in self.imu_batch_buffers:
-            self.imu_batch_buffers[user_id] = []
-        
-        self.imu_batch_buffers[user_id].append(imu_data)
-        
-        # 배치 크기에 도달하면 DB 저장
-        if len(self.imu_batch_buffers[user_id]) >= IMU_BATCH_SIZE:
-            try:
-                for data in self.imu_batch_buffers[user_id]:
-                    supabase_client.save_imu_data(data)
-                logger.debug(f"IMU 배치 저장 완료 [{user_id}]: {len(self.imu_batch_buffers[user_id])}개")
-            except Exception as e:
-                logger.error(f"IMU 배치 DB 저장 실패 [{user_id}]: {e}")
-            finally:
-                self.imu_batch_buffers[user_id] = []
-        
-        # 버퍼 크기 제한
-        if len(self.imu_batch_buffers[user_id]) > IMU_BUFFER_MAX:
-            self.imu_batch_buffers[user_id] = self.imu_batch_buffers[user_id][-IMU_BUFFER_MAX:]
+        # 🔧 MODIFIED: DB 쓰기 대기열에 적재 (전체 사용자 행을 모아 save_imu_batch로 일괄 저장)
+        await self.persistence.put('imu', imu_data)
         
         # CSV 백업
-        await self._save_to_csv(imu_data, f"imu_{user_id}", user_id)
+        self._save_to_csv(imu_data, f"imu_{user_id}", user_id)
         
         # 응답 전송
+        if acknowledge:
+            await self._safe_send(self._imu_ack(imu_data, user_id), user_id)
+    
+    def _imu_ack(self, imu_data: dict, user_id: str) -> dict:
+        """IMU 수신 응답 메시지 생성"""
         response_data = {
             'type': 'imu_data_received',
             'data': imu_data,
@@ -325,7 +426,7 @@ class WebSocketManager:
                 'mode': 'normal'
             }
         
-        await self._safe_send(response_data, user_id)
+        return response_data
     
     async def _process_fall_data(self, fall_data: dict, user_id: str, state_info: dict = None):
         """낙상 데이터 처리 - 워킹 모드에서 응급상황 타이머 시작"""
@@ -345,37 +446,38 @@ class WebSocketManager:
                 datetime.timezone(datetime.timedelta(hours=9))
             ).isoformat()
         
+        fall_data.setdefault('user_id', user_id)
         fall_data.setdefault('fall_detected', True)
         fall_data.setdefault('confidence_score', 0.8)
         
         # CSV 백업 (최우선)
-        await self._save_to_csv(fall_data, f"fall_{user_id}", user_id)
+        self._save_to_csv(fall_data, f"fall_{user_id}", user_id)
         
-        # 데이터베이스 저장
-        try:
-            if not supabase_client.is_mock:
-                result = supabase_client.save_fall_data(fall_data)
-                
-                # 결과 로깅 (IMU 데이터와 동일한 방식)
-                if result.get("mock"):
-                    logger.warning(f"Supabase Mock 모드 - CSV만 저장됨 [{user_id}]")
-                else:
-                    logger.info(f"낙상 데이터 DB 저장 완료 [{user_id}]")
-                
-                # 🆕 워킹 모드에서 응급상황 타이머 시작 (15초)
-                if self.is_walking_mode:
-                    self.emergency_timers[user_id] = time.time()
-                
-            else:
-                logger.warning(f"Supabase Mock 모드 - CSV만 저장됨 [{user_id}]")
-        except Exception as e:
-            logger.error(f"낙상 DB 저장 실패 [{user_id}]: {e}")
+        # 데이터베이스 저장 (🔧 MODIFIED: 쓰기 대기열에 적재 → DB 지연과 무관하게 바로 알림)
+        # 워킹 모드 응급상황 타이머는 기존처럼 DB 저장이 확인된 뒤 시작 (_on_fall_saved)
+        if not supabase_client.is_mock:
+            await self.persistence.put('fall', fall_data)
+            logger.info(f"낙상 데이터 DB 저장 대기열 적재 [{user_id}]")
+        else:
+            logger.warning(f"Supabase Mock 모드 - CSV만 저장됨 [{user_id}]")
         
         # 낙상 알림 브로드캐스트
         await self._broadcast_fall_alert(fall_data, user_id)
         
         logger.warning(f"✅ 낙상 처리 완료 [{user_id}]" + 
-                      (" - 응급상황 모니터링 시작" if self.is_walking_mode else ""))
+                      (" - DB 저장 확인 후 응급상황 모니터링 시작" if self.is_walking_mode else ""))
+    
+    def _on_fall_saved(self, fall_data: dict):
+        """🆕 낙상 DB 저장 확인 시 응급상황 타이머 시작 (15초, 워킹 모드) - 쓰기 대기열 저장 태스크에서 호출"""
+        if not self.is_walking_mode:
+            return
+        user_id = fall_data.get('user_id')
+        tracker = self.user_state_trackers.get(user_id)
+        if tracker is not None and tracker.current_state == UserState.DAILY:
+            # 저장되기 전에 이미 일상으로 복귀 (타이머 해제 후 다시 시작하지 않음)
+            return
+        self.emergency_timers[user_id] = time.time()
+        logger.info(f"낙상 데이터 DB 저장 확인 - 응급상황 타이머 시작 [{user_id}]")
     
     # 🆕 워킹 모드 전용 메서드들
     async def _handle_state_change(self, user_id: str, state_info: dict):
@@ -398,18 +500,15 @@ class WebSocketManager:
             del self.emergency_timers[user_id]
             logger.info(f"응급상황 타이머 해제 [{user_id}]")
         
-        # 상태 변경 로깅
-        try:
-            if not supabase_client.is_mock and hasattr(supabase_client, 'save_user_state'):
-                state_data = {
-                    'user_id': user_id,
-                    'state': tracker.current_state.value,
-                    'start_time': datetime.datetime.fromtimestamp(tracker.state_start_time),
-                    'metadata': state_info
-                }
-                supabase_client.save_user_state(state_data)
-        except Exception as e:
-            logger.error(f"상태 변경 DB 저장 실패 [{user_id}]: {e}")
+        # 상태 변경 로깅 (🔧 MODIFIED: 쓰기 대기열)
+        if not supabase_client.is_mock and hasattr(supabase_client, 'save_user_state'):
+            state_data = {
+                'user_id': user_id,
+                'state': tracker.current_state.value,
+                'start_time': datetime.datetime.fromtimestamp(tracker.state_start_time),
+                'metadata': state_info
+            }
+            await self.persistence.put('user_state', state_data)
     
     async def _start_walking_session(self, user_id: str):
         """보행 세션 시작 (워킹 모드 전용)"""
@@ -424,7 +523,8 @@ class WebSocketManager:
                     'avg_confidence': 0.0,
                     'imu_data_count': 0
                 }
-                session_id = supabase_client.save_walking_session(session_data)
+                # 🔧 MODIFIED: 세션 ID가 필요하므로 대기하되 DB 호출은 저장 스레드에서 실행
+                session_id = await self.persistence.call(supabase_client.save_walking_session, session_data)
                 self.user_state_trackers[user_id].walking_session_id = session_id
                 logger.info(f"보행 세션 시작 [{user_id}] ID: {session_id}")
         except Exception as e:
@@ -448,7 +548,7 @@ class WebSocketManager:
                     'end_time': current_time,
                     'duration_seconds': duration
                 }
-                supabase_client.update_walking_session(tracker.walking_session_id, update_data)
+                self.persistence.put_nowait('walking_session', {'id': tracker.walking_session_id, 'update': update_data})
                 logger.info(f"보행 세션 종료 [{user_id}] 지속시간: {duration}초")
                 
             tracker.walking_session_id = None
@@ -482,13 +582,9 @@ class WebSocketManager:
                                     'start_time': datetime.datetime.fromtimestamp(fall_time),
                                     'duration_seconds': int(duration)
                                 }
-                                result = supabase_client.save_emergency_event(emergency_data)
-                                
-                                # 결과 로깅
-                                if result.get("mock"):
-                                    logger.warning(f"🚨 응급상황 Mock 모드로 저장됨 [{user_id}]")
-                                else:
-                                    logger.warning(f"🚨 응급상황 판정! [{user_id}] 실제 DB 저장 완료")
+                                # 🔧 MODIFIED: 쓰기 대기열 (저장 결과는 save_emergency_event가 기록)
+                                await self.persistence.put('emergency', emergency_data)
+                                logger.warning(f"🚨 응급상황 판정! [{user_id}] DB 저장 대기열 적재")
                         except Exception as e:
                             logger.error(f"응급상황 DB 저장 실패 [{user_id}]: {e}")
                         
@@ -591,38 +687,34 @@ class WebSocketManager:
         
         logger.info(f"알림 브로드캐스트: {alert['type']} - {sent_count}명에게 전송")
     
-    async def _save_to_csv(self, data: dict, file_prefix: str, user_id: str):
-        """CSV 백업 저장"""
+    def _save_to_csv(self, data: dict, file_prefix: str, user_id: str):
+        """CSV 백업 저장 (🔧 MODIFIED: 버퍼에 넣고 바로 반환, 파일 기록은 CsvBackupWriter 스레드)"""
         try:
-            today = datetime.datetime.now().strftime("%Y%m%d")
-            filename = os.path.join(DATA_FOLDER, f"{file_prefix}_{today}.csv")
-            
-            # 헤더 정의
             if 'acc_x' in data:  # IMU 데이터
-                fieldnames = ['timestamp', 'user_id', 'acc_x', 'acc_y', 'acc_z', 'gyr_x', 'gyr_y', 'gyr_z']
+                kind, fieldnames = 'imu', IMU_CSV_FIELDS
             else:  # 낙상 데이터
-                fieldnames = ['timestamp', 'user_id', 'fall_detected', 'confidence_score', 'sensor_data']
+                kind, fieldnames = 'fall', FALL_CSV_FIELDS
                 if 'sensor_data' in data and not isinstance(data['sensor_data'], str):
                     data['sensor_data'] = json.dumps(data['sensor_data'], ensure_ascii=False)
-            
-            file_exists = os.path.exists(filename)
-            with open(filename, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                if not file_exists:
-                    writer.writeheader()
-                
-                csv_data = {k: data.get(k, '') for k in fieldnames}
-                writer.writerow(csv_data)
-                
+            self.csv_backup.write(file_prefix, fieldnames, data)
+            if self.columnar_backup is not None:
+                self.columnar_backup.write(kind, data)
         except Exception as e:
             logger.error(f"CSV 저장 실패 [{user_id}]: {e}")
     
-    async def _ensure_user_exists(self, user_id: str):
-        """사용자 존재 확인 및 생성"""
+    async def _ensure_user_exists(self, user_id: str) -> bool:
+        """사용자 존재 확인 및 생성 (🔧 MODIFIED: 캐시 적중이면 DB 호출 없음, 미스만 저장 스레드에서 조회/생성)"""
+        return await self.user_cache.ensure(user_id)
+    
+    def invalidate_user_cache(self, user_id: Optional[str] = None):
+        """🆕 사용자 존재 캐시 무효화 (user_id=None: 전체) - 사용자 삭제/외부 생성 후 호출"""
+        self.user_cache.invalidate(user_id)
+    
+    def _ensure_user_exists_sync(self, user_id: str) -> bool:
         try:
             existing_user = supabase_client.get_user_by_id(user_id)
             if existing_user:
-                return
+                return True
             
             # 사용자 자동 생성
             user_data = {
@@ -631,7 +723,10 @@ class WebSocketManager:
                 'email': f"{user_id}@{'device.local' if user_id.startswith('raspberry_pi_') else 'example.com'}"
             }
             
-            supabase_client.create_user(user_data)
+            result = supabase_client.create_user(user_data)
+            if isinstance(result, dict) and result.get('error'):
+                logger.error(f"사용자 생성 실패 [{user_id}]: {result['error']}")
+                return False
             
             # 디바이스인 경우 기본 건강 정보 생성
             if user_id.startswith('raspberry_pi_'):
@@ -646,9 +741,11 @@ class WebSocketManager:
                     'medications': []
                 }
                 supabase_client.create_user_health_info(health_data)
+            return True
                 
         except Exception as e:
             logger.error(f"사용자 생성 실패 [{user_id}]: {e}")
+            return False
     
     async def _safe_send(self, data: dict, user_id: str):
         """안전한 메시지 전송"""
@@ -662,6 +759,23 @@ class WebSocketManager:
         except Exception:
             self.disconnect(user_id)
     
+    def get_persistence_stats(self) -> dict:
+        """🆕 DB 쓰기 대기열 채널별 통계 (대기 행 수, 폐기/실패, 플러시 지연)"""
+        return self.persistence.get_stats()
+    
+    def get_imu_pending_by_user(self) -> Dict[str, int]:
+        """🆕 사용자별 DB 저장 대기 IMU 행 수 (write-behind imu 채널)"""
+        return self.persistence.channels['imu'].pending_by_key()
+    
+    def get_user_cache_stats(self) -> dict:
+        """🆕 사용자 존재 캐시 적중률 (적중/실패 캐시 적중/동시 조회 합류/DB 조회 수)"""
+        return self.user_cache.get_stats()
+    
+    def get_compression_stats(self, user_id: str) -> Optional[dict]:
+        """🆕 데드밴드 업로드 압축률/복원 오차 (데드밴드 데이터를 받은 적 없으면 None)"""
+        reconstructor = self.deadband_reconstructors.get(user_id)
+        return reconstructor.get_stats() if reconstructor else None
+    
     # 🆕 외부 API 메서드들 (워킹 모드 전용)
     async def get_user_status(self, user_id: str) -> dict:
         """사용자 상태 조회 API (워킹 모드 전용)"""
@@ -678,6 +792,11 @@ class WebSocketManager:
             'fall_detected_time': tracker.fall_detected_time,
             'walking_session_id': tracker.walking_session_id
         }
+        compression = self.get_compression_stats(user_id)
+        if compression:
+            status['imu_compression'] = compression
+        if user_id in self.device_runtime_stats:
+            status['device_runtime'] = self.device_runtime_stats[user_id]
         
         # 응급상황 체크
         if user_id in self.emergency_timers:
@@ -0,0 +1,481 @@
+"""
+DB 쓰기 지연(write-behind) 파이프라인 - WebSocket 핸들러에서 동기 Supabase 호출 제거
+- 핸들러는 put()으로 레코드를 채널 대기열에 넣고 바로 반환 (이벤트 루프를 막지 않음)
+- 채널마다 백그라운드 태스크 1개가 최대 배치 크기 또는 최대 대기 시간 기준으로 모아서
+  전용 스레드 풀에서 저장 (bulk: 배치 1회 호출, 아니면 레코드별 호출) → 채널 안에서 순서 유지
+- 메모리 상한: 채널별 max_pending, 넘치면 정책에 따라 'drop_oldest' (가장 오래된 레코드 폐기)
+  또는 'block' (block_timeout까지 핸들러 대기 → 해당 연결의 수신 속도 제한, 이후 가장 오래된 레코드 폐기)
+- 실패(예외 또는 결과의 'error')한 레코드는 지수 백오프로 max_retries회 재시도 후 폐기 (CSV 백업에는 남음)
+- coalesce_by 채널(CoalescingChannel): 여러 사용자의 행을 한 번에 저장, 배치 크기는 저장 시간에 맞춰 조정,
+  사용자별 순서 유지, 일괄 저장 실패 시 분할 재시도로 나쁜 행만 골라냄
+- on_written: 저장이 확인된 레코드마다 이벤트 루프에서 호출 (예: 낙상 저장 후 응급상황 타이머)
+- 통계: 적재/저장/실패/폐기 수, 배치 크기, 플러시 지연(적재 → 저장 완료)과 저장 호출 시간 백분위수
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+WRITE_WORKERS = 4            # DB 호출 스레드 수 (채널 수 이상이면 채널끼리 서로 기다리지 않음)
+BLOCK_TIMEOUT = 1.0          # 'block' 정책의 최대 대기 (초)
+RETRY_BASE_DELAY = 0.5       # 재시도 대기 (초, 시도마다 2배)
+RETRY_MAX_DELAY = 30.0
+STATS_HISTORY = 5000         # 지연 백분위수 계산에 쓰는 최근 기록 수
+
+def _percentiles_ms(values) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {
+        'p50_ms': ordered[int(last * 0.50)] * 1000,
+        'p99_ms': ordered[int(last * 0.99)] * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+def _is_failure(result: Any) -> bool:
+    """SupabaseClient는 실패 시 fallback 데이터와 함께 'error'를 돌려줌"""
+    return isinstance(result, dict) and bool(result.get('error'))
+
+def _retry_delay(attempts: int) -> float:
+    return min(RETRY_BASE_DELAY * 2 ** attempts, RETRY_MAX_DELAY)
+
+class WriteChannel:
+    """테이블 하나의 쓰기 대기열과 통계 (FIFO, 저장 태스크 1개가 순서대로 처리)"""
+
+    def __init__(self, name: str, writer: Callable, bulk: bool = True, max_batch: int = 500,
+                 max_delay: float = 1.0, max_pending: int = 10000, overflow: str = 'drop_oldest',
+                 max_retries: int = 3, on_written: Optional[Callable[[Dict[str, Any]], None]] = None):
+        if overflow not in ('drop_oldest', 'block'):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.name = name
+        self.writer = writer
+        self.bulk = bulk
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.max_retries = max_retries
+        self.on_written = on_written
+        self.pending: deque = deque()   # [적재 시각, 시도 횟수, 레코드]
+        self.backoff_until = 0.0
+        self.wakeup: Optional[asyncio.Event] = None
+        self.space: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+
+        # 통계
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retries = 0
+        self.blocked = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.flush_latency = deque(maxlen=STATS_HISTORY)  # 초
+        self.write_times = deque(maxlen=STATS_HISTORY)
+        self.batch_sizes = deque(maxlen=STATS_HISTORY)
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def flush_size(self) -> int:
+        """이만큼 쌓이면 max_delay를 기다리지 않고 저장"""
+        return self.max_batch
+
+    def _push(self, item: list):
+        self.pending.append(item)
+
+    def _evict(self) -> bool:
+        if not self.pending:
+            return False
+        self.pending.popleft()
+        return True
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        """레코드 적재 (가득 차면 가장 오래된 레코드 폐기), 저장 태스크를 깨워야 하면 True"""
+        if len(self) >= self.max_pending and self._evict():
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"[{self.name}] 쓰기 대기열 가득 참 ({self.max_pending}개) - "
+                               f"오래된 레코드 폐기 (누적 {self.dropped}개)")
+        self._push([time.monotonic(), 0, record])
+        self.enqueued += 1
+        depth = len(self)
+        self.max_depth = max(self.max_depth, depth)
+        return depth == 1 or depth >= self.flush_size()
+
+    def next_due(self, now: float, closing: bool = False) -> Optional[float]:
+        """다음 배치를 저장할 시각 (대기 중인 레코드가 없으면 None)"""
+        if not self.pending:
+            return None
+        if self.backoff_until > now:
+            return self.backoff_until
+        if closing or len(self.pending) >= self.flush_size():
+            return now
+        return self.pending[0][0] + self.max_delay
+
+    def take(self, now: float) -> List[list]:
+        return [self.pending.popleft() for _ in range(min(self.max_batch, len(self.pending)))]
+
+    def write(self, records: List[Dict[str, Any]]) -> List[int]:
+        """스레드 풀에서 실행: 저장 후 실패한 레코드의 인덱스 목록"""
+        if self.bulk:
+            try:
+                return [] if not _is_failure(self.writer(records)) else list(range(len(records)))
+            except Exception as e:
+                logger.error(f"[{self.name}] 일괄 저장 실패 ({len(records)}개): {e}")
+                return list(range(len(records)))
+        failed = []
+        for i, record in enumerate(records):
+            try:
+                if _is_failure(self.writer(record)):
+                    failed.append(i)
+            except Exception as e:
+                logger.error(f"[{self.name}] 저장 실패: {e}")
+                failed.append(i)
+        return failed
+
+    def _record_batch(self, batch: List[list], failed: List[int], write_time: float, finished: float):
+        self.batches += 1
+        self.batch_sizes.append(len(batch))
+        self.write_times.append(write_time)
+        failed_set = set(failed)
+        for i, item in enumerate(batch):
+            if i not in failed_set:
+                self.written += 1
+                self.flush_latency.append(finished - item[0])
+                if self.on_written is not None:
+                    try:
+                        self.on_written(item[2])
+                    except Exception as e:
+                        logger.error(f"[{self.name}] 저장 완료 콜백 오류: {e}")
+
+    def complete(self, batch: List[list], failed: List[int], write_time: float):
+        """저장 결과 반영: 실패한 레코드는 채널 순서를 지키도록 대기열 앞에 되돌린 뒤 백오프"""
+        finished = time.monotonic()
+        self._record_batch(batch, failed, write_time, finished)
+        if not failed:
+            return
+        failed_items = [batch[i] for i in failed]
+        retry = [item for item in failed_items if item[1] < self.max_retries]
+        self.failed += len(failed_items) - len(retry)
+        if len(retry) < len(failed_items):
+            logger.error(f"[{self.name}] {len(failed_items) - len(retry)}개 레코드 저장 포기 "
+                         f"({self.max_retries}회 재시도 실패, CSV 백업에만 남음)")
+        if retry:
+            attempts = max(item[1] for item in retry)
+            for item in reversed(retry):
+                item[1] += 1
+                self.pending.appendleft(item)
+            self.retries += len(retry)
+            self.backoff_until = finished + _retry_delay(attempts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {
+            'pending': len(self),
+            'max_depth': self.max_depth,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'retries': self.retries,
+            'blocked': self.blocked,
+            'batches': self.batches,
+            'batch_size_mean': sum(self.batch_sizes) / len(self.batch_sizes) if self.batch_sizes else 0.0,
+        }
+        stats['flush_latency'] = _percentiles_ms(self.flush_latency)
+        stats['write_time'] = _percentiles_ms(self.write_times)
+        return stats
+
+class CoalescingChannel(WriteChannel):
+    """
+    여러 사용자의 행을 한 번의 일괄 저장으로 합치는 채널 (IMU용)
+    - 사용자별 대기열: 한 사용자의 행은 적재 순서대로만 저장 (배치는 오래 기다린 사용자부터 채움)
+    - 배치 크기 적응: 저장 시간이 target_write_time을 넘으면 절반, 꽉 찬 배치가 목표의 3/4 안에 끝나면 1.25배
+      (min_batch ~ max_batch), 부하가 낮을 때는 max_delay가 지연 상한
+    - 부분 실패: 실패한 배치를 반으로 나눠 다시 저장 → 나쁜 행이 든 쪽만 계속 쪼개져
+      한 행만 남으면 백오프로 max_retries회 재시도 후 그 행만 폐기
+      (여러 사용자면 사용자 기준으로 나눔, 한 사용자면 오래된 절반부터 순서대로)
+    - 연속 실패(DB 장애)는 채널 전체 백오프로 호출 수 제한
+    - 재시도 중인 사용자의 새 행은 보류 (순서 유지), 다른 사용자는 계속 저장
+    """
+
+    def __init__(self, name: str, writer: Callable, key: str = 'user_id', min_batch: int = 50,
+                 target_write_time: float = 0.5, **options):
+        super().__init__(name, writer, bulk=True, **options)
+        self.key = key
+        self.min_batch = min(min_batch, self.max_batch)
+        self.target_write_time = target_write_time
+        self.batch_target = self.min_batch
+        self.queues: 'OrderedDict[Any, deque]' = OrderedDict()   # 사용자 → [적재 시각, 시도 횟수, 레코드]
+        self.queued = 0
+        self.retry: deque = deque()      # [재시도 가능 시각, 행 목록]
+        self._inflight_fresh = False
+        self._last_retry = False
+
+        # 통계
+        self.splits = 0
+        self.consecutive_failures = 0
+
+    def __len__(self) -> int:
+        return self.queued + sum(len(entry[1]) for entry in self.retry)
+
+    def flush_size(self) -> int:
+        return self.batch_target
+
+    def pending_by_key(self) -> Dict[Any, int]:
+        """키(사용자)별 대기 행 수 (재시도 중인 행 포함)"""
+        pending = {user: len(queue) for user, queue in self.queues.items()}
+        for _, items in self.retry:
+            for item in items:
+                user = item[2].get(self.key)
+                pending[user] = pending.get(user, 0) + 1
+        return pending
+
+    def _push(self, item: list):
+        user = item[2].get(self.key)
+        queue = self.queues.get(user)
+        if queue is None:
+            queue = self.queues[user] = deque()
+        queue.append(item)
+        self.queued += 1
+
+    def _evict(self) -> bool:
+        # 가장 오래 기다린 사용자의 가장 오래된 행 (재시도 중인 행은 폐기하지 않음)
+        for user, queue in self.queues.items():
+            queue.popleft()
+            self.queued -= 1
+            if not queue:
+                del self.queues[user]
+            return True
+        return False
+
+    def _held_users(self) -> set:
+        return {item[2].get(self.key) for entry in self.retry for item in entry[1]}
+
+    def _eligible_retry(self):
+        """앞선 재시도 구간과 사용자가 겹치지 않는 구간만 진행 가능 (사용자별 순서 유지)"""
+        ahead = set()
+        for entry in self.retry:
+            users = {item[2].get(self.key) for item in entry[1]}
+            if not users & ahead:
+                yield entry
+            ahead |= users
+
+    def _fresh_due(self, now: float, held, closing: bool = False) -> Optional[float]:
+        """재시도로 보류되지 않은 사용자의 새 행을 저장할 시각"""
+        for user, queue in self.queues.items():
+            if user in held:
+                continue
+            if closing or self.queued >= self.batch_target:
+                return now
+            return queue[0][0] + self.max_delay
+        return None
+
+    def next_due(self, now: float, closing: bool = False) -> Optional[float]:
+        held = self._held_users() if self.retry else ()
+        dues = [self._fresh_due(now, held, closing)]
+        dues.extend(entry[0] for entry in self._eligible_retry())
+        dues = [due for due in dues if due is not None]
+        return max(min(dues), self.backoff_until) if dues else None
+
+    def take(self, now: float) -> List[list]:
+        if now < self.backoff_until:
+            return []
+        held = self._held_users() if self.retry else ()
+        # 재시도와 새 행이 모두 기다리면 번갈아 저장 (분할 재시도 중에도 다른 사용자는 계속 저장)
+        ready = next((entry for entry in self._eligible_retry() if entry[0] <= now), None)
+        if ready is not None:
+            fresh = self._fresh_due(now, held)
+            if not (self._last_retry and fresh is not None and fresh <= now):
+                self._last_retry = True
+                self._inflight_fresh = False
+                self.retry.remove(ready)
+                return ready[1]
+        self._last_retry = False
+
+        batch: List[list] = []
+        for user in list(self.queues):
+            if len(batch) >= self.batch_target:
+                break
+            if user in held:
+                continue
+            queue = self.queues[user]
+            count = min(len(queue), self.batch_target - len(batch))
+            batch.extend(queue.popleft() for _ in range(count))
+            self.queued -= count
+            if not queue:
+                del self.queues[user]
+        self._inflight_fresh = True
+        return batch
+
+    def _split(self, items: List[list], now: float) -> List[list]:
+        """실패한 구간을 둘로 나눔 (한 사용자의 행은 한쪽에만 → 사용자별 순서 유지)"""
+        self.splits += 1
+        users = list(OrderedDict.fromkeys(item[2].get(self.key) for item in items))
+        if len(users) > 1:
+            left = set(users[:len(users) // 2])
+            first = [item for item in items if item[2].get(self.key) in left]
+            second = [item for item in items if item[2].get(self.key) not in left]
+        else:
+            # 한 사용자: 오래된 절반이 저장되어야 뒤쪽 절반 진행
+            middle = len(items) // 2
+            first, second = items[:middle], items[middle:]
+        return [[now, first], [now, second]]
+
+    def complete(self, batch: List[list], failed: List[int], write_time: float):
+        finished = time.monotonic()
+        self._record_batch(batch, failed, write_time, finished)
+        fresh = self._inflight_fresh
+        if fresh:
+            # 새 배치의 저장 시간으로 다음 배치 크기 조정
+            if write_time > self.target_write_time:
+                self.batch_target = max(self.min_batch, self.batch_target // 2)
+            elif not failed and len(batch) >= self.batch_target and write_time < self.target_write_time * 0.75:
+                self.batch_target = min(self.max_batch, int(self.batch_target * 1.25) + 1)
+        if not failed:
+            self.consecutive_failures = 0
+            return
+
+        # 연속 실패는 DB 장애로 보고 채널 전체 백오프 (한 번 실패는 바로 분할 재시도)
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= 2:
+            self.backoff_until = finished + _retry_delay(self.consecutive_failures - 2)
+
+        retry = [batch[i] for i in failed]
+        self.retries += len(retry)
+        if len(retry) > 1:
+            # 여러 행이면 어느 행 탓인지 모르므로 시도 횟수는 그대로 두고 분할
+            entries = self._split(retry, finished)
+        else:
+            item = retry[0]
+            item[1] += 1
+            if item[1] > self.max_retries:
+                self.failed += 1
+                logger.error(f"[{self.name}] 행 저장 포기 ({self.max_retries}회 재시도 실패, CSV 백업에만 남음): "
+                             f"{self.key}={item[2].get(self.key)}, timestamp={item[2].get('timestamp')}")
+                return
+            entries = [[finished + _retry_delay(item[1] - 1), retry]]
+        # 진행 중인 분할은 앞에서 이어서 처리, 새 배치의 실패는 기존 재시도 뒤에 줄 세움
+        if fresh:
+            self.retry.extend(entries)
+        else:
+            self.retry.extendleft(reversed(entries))
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({
+            'batch_target': self.batch_target,
+            'users_pending': len(self.queues),
+            'retrying': sum(len(entry[1]) for entry in self.retry),
+            'splits': self.splits,
+            'consecutive_failures': self.consecutive_failures,
+        })
+        return stats
+
+class WriteBehindQueue:
+    """채널별 write-behind 대기열 + 백그라운드 저장 태스크 (첫 put 또는 start()에서 실행 중인 루프에 시작)"""
+
+    def __init__(self, workers: int = WRITE_WORKERS):
+        self.channels: Dict[str, WriteChannel] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db-write')
+        self._closing = False
+
+    def add_channel(self, name: str, writer: Callable, coalesce_by: Optional[str] = None, **options) -> WriteChannel:
+        """coalesce_by: 이 키(예: 'user_id')별 순서를 지키며 여러 사용자의 행을 합쳐 저장 (CoalescingChannel)"""
+        if coalesce_by is not None:
+            channel = CoalescingChannel(name, writer, key=coalesce_by, **options)
+        else:
+            channel = WriteChannel(name, writer, **options)
+        self.channels[name] = channel
+        return channel
+
+    def start(self):
+        """실행 중인 이벤트 루프에 채널별 저장 태스크 시작 (이미 실행 중이면 무시)"""
+        for channel in self.channels.values():
+            if channel.task is None or channel.task.done():
+                channel.wakeup = asyncio.Event()
+                channel.space = asyncio.Event()
+                channel.space.set()
+                channel.task = asyncio.create_task(self._run(channel))
+
+    def _append(self, channel: WriteChannel, record: Dict[str, Any]):
+        if channel.append(record):
+            channel.wakeup.set()
+        if len(channel) >= channel.max_pending:
+            channel.space.clear()
+
+    def put_nowait(self, name: str, record: Dict[str, Any]):
+        """레코드 적재 (대기 없음, 가득 차면 가장 오래된 레코드 폐기)"""
+        self.start()
+        self._append(self.channels[name], record)
+
+    async def put(self, name: str, record: Dict[str, Any]):
+        """레코드 적재 ('block' 정책 채널은 가득 차면 BLOCK_TIMEOUT까지 대기)"""
+        self.start()
+        channel = self.channels[name]
+        if channel.overflow == 'block' and len(channel) >= channel.max_pending:
+            channel.blocked += 1
+            try:
+                await asyncio.wait_for(channel.space.wait(), BLOCK_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+        self._append(channel, record)
+
+    async def call(self, function: Callable, *args):
+        """
+        결과가 필요한 단건 DB 호출 (예: 사용자 확인, 보행 세션 ID 발급)
+        - 이벤트 루프 기본 스레드 풀에서 실행 → 조회가 몰려도 채널 저장 스레드가 밀리지 않음
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    async def _run(self, channel: WriteChannel):
+        loop = asyncio.get_running_loop()
+        while True:
+            # 배치가 차거나(flush_size) 가장 오래된 레코드가 max_delay를 넘기거나 재시도 시각이 될 때까지 대기
+            now = time.monotonic()
+            due = channel.next_due(now, self._closing)
+            if due is None and self._closing:
+                return
+            if due is None or due > now:
+                channel.wakeup.clear()
+                try:
+                    await asyncio.wait_for(channel.wakeup.wait(), None if due is None else due - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            batch = channel.take(now)
+            if len(channel) < channel.max_pending:
+                channel.space.set()
+            if not batch:
+                continue
+            started = time.monotonic()
+            try:
+                failed = await loop.run_in_executor(self._executor, channel.write, [item[2] for item in batch])
+            except Exception as e:
+                logger.error(f"[{channel.name}] 저장 태스크 오류: {e}")
+                failed = list(range(len(batch)))
+            channel.complete(batch, failed, time.monotonic() - started)
+
+    async def close(self, timeout: float = 10.0):
+        """남은 레코드를 대기 시간 없이 모두 저장 후 태스크 종료"""
+        self._closing = True
+        tasks = [channel.task for channel in self.channels.values() if channel.task is not None]
+        for channel in self.channels.values():
+            if channel.wakeup is not None:
+                channel.wakeup.set()
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: channel.get_stats() for name, channel in self.channels.items()}
@@ -58,6 +58,17 @@ async def root():
 async def health_check():
     """서버 상태 확인"""
     return {"status": "healthy"}
+
+@app.on_event("shutdown")
+async def flush_pending_writes():
+    """🆕 종료 전 DB 쓰기 대기열에 남은 레코드 저장 + CSV 백업 버퍼 기록"""
+    from app.api.routes import websocket_manager
+    if hasattr(websocket_manager, 'persistence'):
+        await websocket_manager.persistence.close()
+    if hasattr(websocket_manager, 'csv_backup'):
+        websocket_manager.csv_backup.close()
+    if getattr(websocket_manager, 'columnar_backup', None) is not None:
+        websocket_manager.columnar_backup.close()
     
 if __name__ == "__main__":
     import uvicorn
@@ -667,7 +667,53 @@ class SupabaseClient:
             lambda: self.client.table("imu_data").insert(imu_data_list).execute(),
             fallback_data=imu_data_list
         )
-    
+
+    def save_fall_batch(self, fall_data_list: List[Dict[str, Any]]) -> Union[DatabaseResult, MockResult]:
+        """🆕 낙상 데이터 배치 저장 (write-behind 채널용)"""
+        if not fall_data_list:
+            return {"data": [], "status": "success", "mock": self.is_mock}
+
+        # save_fall_data와 같은 낙상별 상세 로그 (🔧 MODIFIED: 배치 저장에서도 유지)
+        logger.warning(f"🚨 낙상 데이터 배치 저장 시도 ({len(fall_data_list)}개):")
+        for data in fall_data_list:
+            logger.warning(f"🚨 - 사용자 ID: {data.get('user_id', 'UNKNOWN')}, "
+                           f"타임스탬프: {data.get('timestamp', 'UNKNOWN')}, "
+                           f"신뢰도: {data.get('confidence_score', 'UNKNOWN')}")
+            logger.warning(f"🚨 - 전체 데이터: {json.dumps(data, ensure_ascii=False, default=str)}")
+        
+        result = self._execute_with_fallback(
+            f"낙상 데이터 배치 저장 ({len(fall_data_list)}개)",
+            lambda: self.client.table("fall_data").insert(fall_data_list).execute(),
+            fallback_data=fall_data_list,
+            log_data=True
+        )
+        
+        logger.warning(f"🚨 낙상 데이터 배치 저장 결과: {result}")
+        
+        if result.get("error"):
+            logger.warning(f"❌ 낙상 데이터 {len(fall_data_list)}개 저장 실패 - 쓰기 대기열에서 분할 재시도")
+        elif result.get("mock"):
+            logger.warning(f"⚠️ 낙상 데이터 {len(fall_data_list)}개가 Mock 모드로 저장됨!")
+        else:
+            logger.warning(f"✅ 낙상 데이터 {len(fall_data_list)}개가 실제 DB에 저장됨!")
+        
+        return result
+
+    def save_user_state_batch(self, state_data_list: List[Dict[str, Any]]) -> Union[DatabaseResult, MockResult]:
+        """🆕 사용자 상태 배치 저장 (write-behind 채널용, save_user_state와 같은 기본값)"""
+        if not state_data_list:
+            return {"data": [], "status": "success", "mock": self.is_mock}
+
+        for state_data in state_data_list:
+            state_data.setdefault('confidence_score', 0.0)
+            state_data.setdefault('last_activity', datetime.now(KST).isoformat())
+
+        return self._execute_with_fallback(
+            f"사용자 상태 배치 저장 ({len(state_data_list)}개)",
+            lambda: self.client.table("user_states").insert(state_data_list).execute(),
+            fallback_data=state_data_list
+        )
+
     # 🆕 기존 메서드들 (호환성 유지)
     def save_embedding_data(self, data: Dict[str, Any]) -> Union[DatabaseResult, MockResult]:
         """임베딩 데이터 저장"""
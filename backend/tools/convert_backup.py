@@ -0,0 +1,97 @@
+"""
+CSV 백업 → 컬럼형 압축 백업 변환기 (app/core/columnar_backup.py 형식)
+- data_backup의 imu_*.csv / fall_*.csv (fall_data_*.csv 포함)를 사용자/KST 날짜별 .npz 세그먼트로 변환
+- 같은 시간 범위 세그먼트가 이미 있으면 건너뜀 (다시 실행해도 중복 없음, --overwrite로 다시 쓰기)
+- 원본 CSV는 그대로 둠, --verify로 변환 후 다시 읽어 사용자별 행 수 확인
+- --read: 한 사용자의 시간 범위 조회 (read_range 사용 예)
+
+사용법:
+    python tools/convert_backup.py --src data_backup --dst data_backup_columnar --verify
+    python tools/convert_backup.py --dst data_backup_columnar --read raspberry_pi_01 --kind imu \
+        --start 2025-05-29T09:00:00+09:00 --end 2025-05-29T10:00:00+09:00
+"""
+import argparse
+import datetime
+import glob
+import os
+import sys
+import time
+
+# 백엔드를 Python 경로에 추가
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from app.core.columnar_backup import KIND_COLUMNS, KST, convert_csv_file, csv_kind, read_range
+
+def convert(src: str, dst: str, overwrite: bool = False, verify: bool = False) -> bool:
+    csv_files = [path for path in sorted(glob.glob(os.path.join(src, '*.csv'))) if csv_kind(path)]
+    if not csv_files:
+        print(f"❌ 변환할 imu_*/fall_* CSV 없음: {src}")
+        return False
+    print(f"🔄 {len(csv_files)}개 CSV 변환: {src} → {dst}")
+    expected = {}   # (종류, 사용자) → 행 수
+    rows = segments = 0
+    started = time.perf_counter()
+    for path in csv_files:
+        stats = convert_csv_file(path, dst, overwrite=overwrite)
+        rows += stats['rows']
+        segments += stats['segments']
+        for user_id, count in stats['users'].items():
+            expected[(stats['kind'], user_id)] = expected.get((stats['kind'], user_id), 0) + count
+        note = f", 변환 불가 {stats['skipped']}행" if stats['skipped'] else ''
+        print(f"   {os.path.basename(path)}: {stats['rows']}행 → 새 세그먼트 {stats['segments']}개{note}")
+    elapsed = time.perf_counter() - started
+
+    csv_size = sum(os.path.getsize(path) for path in csv_files)
+    segment_files = glob.glob(os.path.join(dst, '*', '*', '*.npz'))
+    npz_size = sum(os.path.getsize(path) for path in segment_files)
+    print(f"✅ {rows}행, 새 세그먼트 {segments}개 ({elapsed:.1f}초)")
+    if npz_size:
+        print(f"📦 CSV {csv_size / 1024:.1f}KB → 컬럼형 {npz_size / 1024:.1f}KB "
+              f"(세그먼트 {len(segment_files)}개, {csv_size / npz_size:.1f}배 작음)")
+
+    if not verify:
+        return True
+    ok = True
+    for (kind, user_id), count in sorted(expected.items()):
+        loaded = len(read_range(dst, user_id, kind)['ts_us'])
+        if loaded != count:
+            ok = False
+            print(f"⚠️ 행 수 불일치 [{kind}/{user_id}]: CSV {count}행, 컬럼형 {loaded}행")
+    print("🔍 검증 완료: 사용자별 행 수 일치" if ok else "❌ 검증 실패 (대상 폴더에 다른 기록이 섞였는지 확인)")
+    return ok
+
+def show_range(dst: str, user_id: str, kind: str, start, end):
+    started = time.perf_counter()
+    columns = read_range(dst, user_id, kind, start, end)
+    elapsed = (time.perf_counter() - started) * 1000
+    count = len(columns['ts_us'])
+    print(f"📖 {user_id} {kind}: {count}행 ({elapsed:.1f}ms)")
+    if not count:
+        return
+    span = [datetime.datetime.fromtimestamp(columns['timestamp'][i], KST).isoformat() for i in (0, -1)]
+    print(f"   {span[0]} ~ {span[1]}")
+    names = list(KIND_COLUMNS[kind])
+    print('   ' + ', '.join(['timestamp'] + names))
+    for i in range(min(count, 5)):
+        print('   ' + ', '.join([f"{columns['timestamp'][i]:.6f}"] + [str(columns[name][i]) for name in names]))
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert data_backup CSVs to the columnar backup format")
+    parser.add_argument('--src', default=os.path.join(BACKEND_DIR, 'data_backup'), help="CSV 백업 폴더")
+    parser.add_argument('--dst', default=os.path.join(BACKEND_DIR, 'data_backup_columnar'), help="컬럼형 백업 폴더")
+    parser.add_argument('--overwrite', action='store_true', help="같은 범위 세그먼트도 다시 쓰기")
+    parser.add_argument('--verify', action='store_true', help="변환 후 다시 읽어 사용자별 행 수 확인")
+    parser.add_argument('--read', metavar='USER_ID', help="변환 대신 한 사용자의 기록 조회")
+    parser.add_argument('--kind', choices=sorted(KIND_COLUMNS), default='imu')
+    parser.add_argument('--start', help="조회 시작 (ISO 8601, 시간대 없으면 KST)")
+    parser.add_argument('--end', help="조회 끝 (ISO 8601, 시간대 없으면 KST)")
+    args = parser.parse_args()
+
+    if args.read:
+        show_range(args.dst, args.read, args.kind, args.start, args.end)
+    elif not convert(args.src, args.dst, overwrite=args.overwrite, verify=args.verify):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,480 @@
+"""
+다중 디바이스 WebSocket 부하 생성기 (/ws/{user_id})
+- 시뮬레이션 라즈베리파이 수천 대를 asyncio로 실행, 각 디바이스는 data_backup의 IMU/낙상 기록을
+  create_imu_package / create_fall_package와 같은 JSON 형식으로 재생
+- 라즈베리파이와 같은 동작: 접속 시 connection_health_check, SEND_RATE 간격 IMU (절대 데드라인),
+  25초 하트비트, 지수 백오프 재연결 (--session-length로 불안정한 Wi-Fi 재현)
+- 동시 접속 단계별 리포트: 서버 응답 지연 백분위수 (imu_data_received / fall_alert / heartbeat_ack),
+  메시지 손실, 연결 실패/끊김/재연결, 처리량, 생성기 자체 지연 (생성기 포화와 서버 포화 구분)
+- serve: 대체 DB(메모리, 지연 주입)로 WebSocketManager를 띄운 로컬 서버 (실제 Supabase 미사용)
+
+사용법:
+    python tools/websocket_load_test.py serve --port 8001 --db-latency-ms 5
+    python tools/websocket_load_test.py run --url ws://127.0.0.1:8001 --devices 10,100,1000 --duration 30
+    (수천 개 연결 시 양쪽 프로세스 모두 ulimit -n 상향 필요)
+"""
+import argparse
+import asyncio
+import csv
+import glob
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+from collections import deque
+
+import numpy as np
+import websockets
+
+# 백엔드 및 프로젝트 루트를 Python 경로에 추가
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(BACKEND_DIR)
+sys.path.append(BACKEND_DIR)
+sys.path.append(ROOT_DIR)
+
+# 라즈베리파이와 같은 패키지 형식/전송 주기/재연결 설정
+from Optimized_Walking_Raspberry import (
+    RECONNECT_DELAY, SEND_RATE, create_fall_package, create_imu_package
+)
+
+DATA_DIR = os.path.join(BACKEND_DIR, 'data_backup')
+IMU_FIELDS = ('acc_x', 'acc_y', 'acc_z', 'gyr_x', 'gyr_y', 'gyr_z')
+HEARTBEAT_INTERVAL = 25.0   # 라즈베리파이 periodic_health_check와 동일
+MAX_RECONNECT_DELAY = 30.0
+
+def load_streams(data_dir=DATA_DIR):
+    """기록된 IMU 샘플 목록과 낙상 이벤트 (확률, 센서 6축) 목록"""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(data_dir, 'imu_*.csv'))):
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    samples.append([float(row[field]) for field in IMU_FIELDS])
+                except (KeyError, TypeError, ValueError):
+                    continue
+    falls = []
+    for path in sorted(glob.glob(os.path.join(data_dir, 'fall_*.csv'))):
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    sensor = json.loads(row['sensor_data'])
+                    falls.append((float(row['confidence_score']),
+                                  [sensor['acceleration'][axis] for axis in 'xyz']
+                                  + [sensor['gyroscope'][axis] for axis in 'xyz']))
+                except (KeyError, TypeError, ValueError):
+                    continue
+    if not samples:
+        raise SystemExit(f"IMU 기록이 없습니다: {data_dir}/imu_*.csv")
+    if not falls:
+        falls = [(0.9, samples[0])]
+    return samples, falls
+
+class LevelStats:
+    """동시 접속 단계 하나의 집계 (모든 디바이스 공유, 단일 이벤트 루프라 락 불필요)"""
+
+    def __init__(self):
+        self.sent = {'imu': 0, 'fall': 0, 'heartbeat': 0}
+        self.acked = {'imu': 0, 'fall': 0, 'heartbeat': 0}
+        self.latency = {'imu': [], 'fall': [], 'heartbeat': []}
+        self.lost = {'imu': 0, 'fall': 0, 'heartbeat': 0}
+        self.in_flight = 0
+        self.connects = 0
+        self.connect_failures = 0
+        self.disconnects = 0        # 서버/네트워크에 의해 끊긴 세션
+        self.planned_disconnects = 0
+        self.send_lag = []          # 예정 전송 시각 대비 지연 (생성기 포화 지표)
+        self.bytes_sent = 0
+
+class SimulatedDevice:
+    """라즈베리파이 1대 (websocket_handler + OptimizedDataSender의 전송 동작 재현)"""
+
+    def __init__(self, user_id, url, samples, falls, stats, args):
+        self.user_id = user_id
+        self.url = f"{url.rstrip('/')}/ws/{user_id}"
+        self.samples = samples
+        self.falls = falls
+        self.stats = stats
+        self.args = args
+        self.position = random.randrange(len(samples))  # 디바이스마다 다른 위치부터 재생
+        self.pending = {}            # (종류, timestamp) → 전송 시각
+        self.pending_heartbeats = deque()
+        self.reconnect_attempts = 0
+
+    async def run(self, stop):
+        while not stop.is_set():
+            try:
+                async with websockets.connect(self.url, open_timeout=self.args.connect_timeout,
+                                              ping_interval=30, ping_timeout=15, close_timeout=10,
+                                              max_size=2**20, compression=None) as websocket:
+                    self.stats.connects += 1
+                    self.reconnect_attempts = 0
+                    planned = await self._session(websocket, stop)
+                    if planned:
+                        self.stats.planned_disconnects += 1
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.InvalidHandshake):
+                self.stats.connect_failures += 1
+            except websockets.exceptions.ConnectionClosed:
+                self.stats.disconnects += 1
+            self._expire_pending(session_closed=True)
+            if stop.is_set():
+                break
+            # 라즈베리파이와 같은 지수 백오프
+            self.reconnect_attempts += 1
+            delay = min(self.args.reconnect_delay * 2 ** self.reconnect_attempts, MAX_RECONNECT_DELAY)
+            try:
+                await asyncio.wait_for(stop.wait(), delay * random.uniform(0.5, 1.0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _session(self, websocket, stop):
+        """연결 1회: 전송/수신 태스크 실행, 계획된 종료면 True"""
+        await self._send(websocket, {
+            "type": "connection_health_check",
+            "user_id": self.user_id,
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S+09:00'),
+            "status": "connected",
+            "frame_formats": []  # JSON 형식 재생
+        })
+        session_end = None
+        if self.args.session_length > 0:
+            session_end = time.monotonic() + random.expovariate(1.0 / self.args.session_length)
+        receiver = asyncio.create_task(self._receive(websocket))
+        try:
+            planned = await self._transmit(websocket, stop, session_end)
+        finally:
+            receiver.cancel()
+        if planned or stop.is_set():
+            await websocket.close()
+            return planned
+        return False
+
+    async def _transmit(self, websocket, stop, session_end):
+        period = 1.0 / self.args.rate
+        start = time.monotonic()
+        next_heartbeat = start + HEARTBEAT_INTERVAL
+        next_fall = start + random.expovariate(1.0 / self.args.fall_interval) if self.args.fall_interval else None
+        tick = 0
+        while not stop.is_set():
+            deadline = start + tick * period
+            now = time.monotonic()
+            if deadline > now:
+                await asyncio.sleep(deadline - now)
+                now = time.monotonic()
+            self.stats.send_lag.append(now - deadline)
+            tick += 1
+            if session_end is not None and now >= session_end:
+                return True
+
+            if next_fall is not None and now >= next_fall:
+                probability, sensor = self.falls[random.randrange(len(self.falls))]
+                package = create_fall_package(self.user_id, probability, sensor, {'walking': False, 'confidence': 0.0})
+                await self._send(websocket, package, ('fall', package['data']['timestamp']))
+                next_fall = now + random.expovariate(1.0 / self.args.fall_interval)
+            if now >= next_heartbeat:
+                self.pending_heartbeats.append(time.perf_counter())
+                await self._send(websocket, {"type": "heartbeat", "user_id": self.user_id,
+                                             "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S+09:00')}, 'heartbeat')
+                next_heartbeat = now + HEARTBEAT_INTERVAL
+
+            sample = self.samples[self.position]
+            self.position = (self.position + 1) % len(self.samples)
+            package = create_imu_package(sample, self.user_id, {'walking': True, 'confidence': 0.8, 'roc_based': True},
+                                         time.time(), deadband=False)
+            await self._send(websocket, package, ('imu', package['data']['timestamp']))
+            if tick % self.args.rate == 0:
+                self._expire_pending()
+        return False
+
+    async def _send(self, websocket, message, key=None):
+        payload = json.dumps(message, ensure_ascii=False)
+        if key == 'heartbeat':
+            self.stats.sent['heartbeat'] += 1
+        elif key is not None:
+            self.pending[key] = time.perf_counter()
+            self.stats.sent[key[0]] += 1
+        await websocket.send(payload)
+        self.stats.bytes_sent += len(payload)
+
+    async def _receive(self, websocket):
+        async for message in websocket:
+            received = time.perf_counter()
+            try:
+                reply = json.loads(message)
+            except (TypeError, ValueError):
+                continue
+            kind = reply.get('type')
+            data = reply.get('data') or {}
+            if kind == 'imu_data_received':
+                key = ('imu', data.get('timestamp'))
+            elif kind == 'fall_alert' and data.get('user_id') == self.user_id:
+                key = ('fall', data.get('timestamp'))
+            elif kind == 'heartbeat_ack' and self.pending_heartbeats:
+                self.stats.acked['heartbeat'] += 1
+                self.stats.latency['heartbeat'].append(received - self.pending_heartbeats.popleft())
+                continue
+            else:
+                continue
+            sent_at = self.pending.pop(key, None)
+            if sent_at is not None:
+                self.stats.acked[key[0]] += 1
+                self.stats.latency[key[0]].append(received - sent_at)
+
+    def _expire_pending(self, session_closed=False):
+        """응답 제한 시간이 지난 메시지를 손실로 집계 (세션 종료 시 남은 메시지 전부)"""
+        limit = time.perf_counter() - self.args.ack_timeout
+        for key, sent_at in list(self.pending.items()):
+            if session_closed or sent_at < limit:
+                del self.pending[key]
+                self.stats.lost[key[0]] += 1
+        if session_closed:
+            self.stats.lost['heartbeat'] += len(self.pending_heartbeats)
+            self.pending_heartbeats.clear()
+
+    def finish(self):
+        """측정 종료: 제한 시간이 지난 메시지는 손실, 나머지는 전송 중으로 제외"""
+        self._expire_pending()
+        self.stats.in_flight += len(self.pending)
+        self.pending.clear()
+
+async def run_level(n_devices, samples, falls, args):
+    stats = LevelStats()
+    stop = asyncio.Event()
+    devices = [SimulatedDevice(f"{args.user_prefix}{i:05d}", args.url, samples, falls, stats, args)
+               for i in range(n_devices)]
+    tasks = []
+    for i, device in enumerate(devices):
+        tasks.append(asyncio.create_task(device.run(stop)))
+        if args.ramp and i % 50 == 49:
+            await asyncio.sleep(args.ramp * 50 / n_devices)  # 접속 폭주 완화
+    started = time.monotonic()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.sleep(args.drain)  # 마지막 응답 대기 (수신 태스크는 연결 종료 전까지 동작)
+    for device in devices:
+        device.finish()
+    await asyncio.wait(tasks, timeout=args.drain + 10)
+    for task in tasks:
+        task.cancel()
+    stats.elapsed = time.monotonic() - started
+    return stats
+
+def percentiles_ms(values):
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+    ms = np.asarray(values) * 1000
+    return {'p50': float(np.percentile(ms, 50)), 'p95': float(np.percentile(ms, 95)),
+            'p99': float(np.percentile(ms, 99)), 'max': float(ms.max())}
+
+def level_report(n_devices, stats, duration):
+    report = {
+        'devices': n_devices,
+        'connects': stats.connects,
+        'connect_failures': stats.connect_failures,
+        'disconnects': stats.disconnects,
+        'planned_disconnects': stats.planned_disconnects,
+        'sent': dict(stats.sent),
+        'acked': dict(stats.acked),
+        'lost': dict(stats.lost),
+        'in_flight': stats.in_flight,
+        'throughput_msg_s': sum(stats.sent.values()) / duration,
+        'ack_throughput_msg_s': sum(stats.acked.values()) / duration,
+        'bytes_sent': stats.bytes_sent,
+        'latency_ms': {kind: percentiles_ms(values) for kind, values in stats.latency.items()},
+        'generator_lag_ms': percentiles_ms(stats.send_lag),
+    }
+    settled = stats.sent['imu'] - stats.in_flight
+    report['imu_loss_pct'] = 100.0 * stats.lost['imu'] / settled if settled > 0 else 0.0
+    return report
+
+def print_report(reports):
+    def fmt(value):
+        return f"{value:.1f}" if value is not None else "-"
+
+    print(f"\n{'devices':>8} {'conn':>6} {'fail':>5} {'drop':>5} {'imu sent':>9} {'loss%':>6} "
+          f"{'msg/s':>8} {'ack p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'fall p99':>9} {'gen lag p99':>12}")
+    for r in reports:
+        imu = r['latency_ms']['imu']
+        print(f"{r['devices']:>8} {r['connects']:>6} {r['connect_failures']:>5} {r['disconnects']:>5} "
+              f"{r['sent']['imu']:>9} {r['imu_loss_pct']:>6.2f} {r['ack_throughput_msg_s']:>8.0f} "
+              f"{fmt(imu['p50']):>8} {fmt(imu['p95']):>8} {fmt(imu['p99']):>8} {fmt(imu['max']):>8} "
+              f"{fmt(r['latency_ms']['fall']['p99']):>9} {fmt(r['generator_lag_ms']['p99']):>12}")
+    print("(지연: ms, conn: 성공한 연결 수, fail: 연결 실패, drop: 예기치 않은 끊김, "
+          "gen lag: 생성기 전송 지연 - 크면 생성기 포화로 결과 신뢰 불가)")
+
+async def run(args):
+    samples, falls = load_streams(args.data_dir)
+    levels = [int(level) for level in args.devices.split(',')]
+    print(f"🚀 Load test: {args.url}, levels {levels}, {args.duration}s each, IMU {args.rate}Hz/device, "
+          f"{len(samples)} recorded samples, {len(falls)} recorded falls")
+    reports = []
+    for n_devices in levels:
+        stats = await run_level(n_devices, samples, falls, args)
+        report = level_report(n_devices, stats, args.duration)
+        reports.append(report)
+        imu = report['latency_ms']['imu']
+        print(f"   {n_devices} devices: {stats.connects} connects, {stats.connect_failures} failures, "
+              f"imu ack p99 {imu['p99'] or 0:.1f}ms, loss {report['imu_loss_pct']:.2f}%")
+        await asyncio.sleep(args.pause)
+    print_report(reports)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports, f, indent=2)
+        print(f"💾 Report saved: {args.output}")
+
+class StandInDatabase:
+    """
+    Supabase 대체 DB (부하 테스트 전용)
+    - 사용자/세션 조회·저장을 메모리에서 처리, 호출마다 --db-latency-ms만큼 동기 지연 (실제 클라이언트도 동기 호출)
+    - 메서드별 호출 수/행 수 집계 (GET /loadtest/db)
+    """
+    is_mock = False
+
+    def __init__(self, latency_ms=0.0):
+        self.latency = latency_ms / 1000.0
+        self.users = {}
+        self.calls = {}
+        self.rows = {}
+
+    def _record(self, name, rows=1):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.rows[name] = self.rows.get(name, 0) + rows
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_user_by_id(self, user_id):
+        self._record('get_user_by_id')
+        return self.users.get(user_id)
+
+    def create_user(self, user_data):
+        self._record('create_user')
+        self.users[user_data['user_id']] = user_data
+        return {"data": user_data, "status": "success", "mock": False}
+
+    def save_imu_batch(self, imu_data_list):
+        self._record('save_imu_batch', len(imu_data_list))
+        return {"data": imu_data_list, "status": "success", "mock": False, "count": len(imu_data_list)}
+
+    def save_fall_batch(self, fall_data_list):
+        self._record('save_fall_batch', len(fall_data_list))
+        return {"data": fall_data_list, "status": "success", "mock": False}
+
+    def save_user_state_batch(self, state_data_list):
+        self._record('save_user_state_batch', len(state_data_list))
+        return {"data": state_data_list, "status": "success", "mock": False}
+
+    def save_walking_session(self, session_data):
+        self._record('save_walking_session')
+        return f"loadtest_session_{self.calls['save_walking_session']}"
+
+    def __getattr__(self, name):
+        # save_imu_data, save_fall_data, save_emergency_event 등 나머지 저장 메서드
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            self._record(name)
+            return {"data": args[-1] if args else kwargs, "status": "success", "mock": False}
+        return method
+
+    def get_stats(self):
+        return {'users': len(self.users), 'calls': dict(self.calls), 'rows': dict(self.rows)}
+
+def serve(args):
+    """대체 DB로 WebSocketManager를 띄운 로컬 서버 (app.main의 AI/RAG 라우트 없이 /ws/{user_id}만 제공)"""
+    import uvicorn
+    from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+    # websocket_manager가 import하기 전에 대체 DB 등록
+    database = StandInDatabase(args.db_latency_ms)
+    module = types.ModuleType('database.supabase_client')
+    module.supabase_client = database
+    sys.modules.setdefault('database', types.ModuleType('database'))
+    sys.modules['database.supabase_client'] = module
+    # CSV 백업은 임시 작업 폴더에 기록 (backend/data_backup 보호)
+    workdir = args.workdir or tempfile.mkdtemp(prefix='walkerholic_loadtest_')
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()),
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    from app.core.websocket_manager import websocket_manager
+
+    app = FastAPI(title="WALKERHOLIC load test server")
+
+    @app.websocket("/ws/{user_id}")
+    async def websocket_endpoint(websocket: WebSocket, user_id: str):
+        # app/api/routes.py의 websocket_endpoint와 같은 수신 루프
+        await websocket_manager.connect(websocket, user_id)
+        try:
+            await websocket.send_json({"type": "connection_established", "message": f"사용자 {user_id} 연결 성공"})
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                data = message["text"] if message.get("text") is not None else message.get("bytes")
+                if data is not None:
+                    await websocket_manager.handle_received_data(data, user_id)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            websocket_manager.disconnect(user_id)
+
+    @app.get("/loadtest/db")
+    async def database_stats():
+        stats = {**database.get_stats(), 'connections': len(websocket_manager.active_connections)}
+        if hasattr(websocket_manager, 'persistence'):
+            stats['persistence'] = websocket_manager.get_persistence_stats()
+        if hasattr(websocket_manager, 'user_cache'):
+            stats['user_cache'] = websocket_manager.get_user_cache_stats()
+        if hasattr(websocket_manager, 'csv_backup'):
+            stats['csv_backup'] = websocket_manager.csv_backup.get_stats()
+        if getattr(websocket_manager, 'columnar_backup', None) is not None:
+            stats['columnar_backup'] = websocket_manager.columnar_backup.get_stats()
+        return stats
+
+    print(f"🧪 Load test server: ws://{args.host}:{args.port}/ws/{{user_id}} "
+          f"(stand-in DB latency {args.db_latency_ms}ms, CSV backup in {workdir})")
+    uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level.lower(),
+                ws_max_size=2**20, backlog=4096)
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-device WebSocket load generator")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="시뮬레이션 디바이스로 서버 부하 측정")
+    run_parser.add_argument('--url', default='ws://127.0.0.1:8000', help="서버 주소 (/ws/{user_id} 제외)")
+    run_parser.add_argument('--devices', default='10,100,1000', help="동시 접속 단계 (쉼표 구분)")
+    run_parser.add_argument('--duration', type=float, default=30.0, help="단계별 측정 시간 (초)")
+    run_parser.add_argument('--rate', type=int, default=SEND_RATE, help="디바이스당 IMU 전송 주기 (Hz)")
+    run_parser.add_argument('--fall-interval', type=float, default=120.0,
+                            help="디바이스당 평균 낙상 간격 (초, 0: 낙상 없음)")
+    run_parser.add_argument('--session-length', type=float, default=0.0,
+                            help="평균 연결 유지 시간 (초, 지수 분포로 끊고 재연결, 0: 유지)")
+    run_parser.add_argument('--reconnect-delay', type=float, default=RECONNECT_DELAY, help="재연결 기본 대기 (초)")
+    run_parser.add_argument('--connect-timeout', type=float, default=10.0)
+    run_parser.add_argument('--ack-timeout', type=float, default=5.0, help="응답이 없으면 손실로 보는 시간 (초)")
+    run_parser.add_argument('--ramp', type=float, default=5.0, help="단계 시작 시 접속을 나누는 시간 (초)")
+    run_parser.add_argument('--drain', type=float, default=3.0, help="측정 종료 후 응답 대기 (초)")
+    run_parser.add_argument('--pause', type=float, default=2.0, help="단계 사이 대기 (초)")
+    run_parser.add_argument('--user-prefix', default='raspberry_pi_load_')
+    run_parser.add_argument('--data-dir', default=DATA_DIR, help="imu_*.csv / fall_*.csv 기록 폴더")
+    run_parser.add_argument('--output', help="단계별 리포트 JSON 저장 경로")
+
+    serve_parser = sub.add_parser('serve', help="대체 DB를 사용하는 로컬 서버 실행")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8001)
+    serve_parser.add_argument('--db-latency-ms', type=float, default=0.0, help="DB 호출당 동기 지연 (ms)")
+    serve_parser.add_argument('--workdir', help="CSV 백업 작업 폴더 (기본: 임시 폴더)")
+    serve_parser.add_argument('--log-level', default='warning')
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        serve(args)
+    else:
+        asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
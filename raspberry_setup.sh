@@ -28,6 +28,7 @@ pip install --upgrade pip
 # 라즈베리파이용 requirements.txt 생성
 cat > raspberry_requirements.txt << EOF
 numpy>=1.21.0,<2.0.0
+tflite-runtime>=2.10.0
 tensorflow>=2.10.0,<3.0.0
 smbus2>=0.4.0
 websockets>=11.0.0
@@ -74,7 +75,7 @@ SEQ_LENGTH = 150
 STRIDE = 5
 
 # 모델 경로
-MODEL_PATH = 'models/fall_detection.tflite'
+MODEL_PATH = 'models/fall_detection_builtin.tflite'
 SCALERS_DIR = 'scalers'
 
 # 로그 설정
@@ -115,9 +116,10 @@ fi
 echo "✅ MPU6050 센서가 감지되었습니다."
 
 # 모델 파일 확인
-if [ ! -f "models/fall_detection.tflite" ]; then
+if [ ! -f "models/fall_detection_builtin.tflite" ]; then
     echo "⚠️  낙상 감지 모델이 없습니다."
     echo "   서버에서 모델 파일을 다운로드하거나 복사하세요."
+    echo "   (tflite-runtime은 Flex 연산을 지원하지 않으므로 tools/convert_fall_model.py로 변환한 모델 필요)"
 fi
 
 # 스케일러 파일 확인
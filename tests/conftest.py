@@ -0,0 +1,9 @@
+"""라즈베리파이 스크립트 테스트 공통 설정 (저장소 루트와 backend를 import 경로에 추가)"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, 'backend')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,96 @@
+"""컬럼형 백업: 세그먼트 왕복, 시간 범위 읽기 경계, CSV 변환, 실시간 기록기"""
+
+import csv
+import datetime
+import json
+import os
+
+import numpy as np
+
+from app.core.columnar_backup import (KST, SENSOR_COLUMNS, ColumnarBackupWriter, convert_csv_file, fall_row,
+                                      imu_row, list_segments, read_range, write_segment)
+
+START = 1_760_000_000.0   # epoch 초
+
+def imu_records(user_id, count, start=START, step=0.1):
+    rng = np.random.default_rng(7)
+    values = rng.normal(size=(count, 6)) * 3
+    return [dict({'user_id': user_id, 'timestamp': start + i * step}, **dict(zip(SENSOR_COLUMNS, map(float, row))))
+            for i, row in enumerate(values)]
+
+def test_imu_segment_round_trip(tmp_path):
+    records = imu_records('u1', 500)
+    write_segment(str(tmp_path), 'imu', 'u1', [imu_row(record) for record in records])
+
+    result = read_range(str(tmp_path), 'u1')
+    expected_ts = np.array([imu_row(record)[0] for record in records])
+    assert np.array_equal(result['ts_us'], expected_ts)
+    for name in SENSOR_COLUMNS:
+        expected = np.array([record[name] for record in records], dtype=np.float32)
+        assert result[name].dtype == np.float32
+        assert np.array_equal(result[name], expected)
+
+def test_fall_row_round_trip_keeps_extra_sensor_keys(tmp_path):
+    sensor = {'acceleration': {'x': 0.1, 'y': 0.2, 'z': 9.8}, 'gyroscope': {'x': 1, 'y': 2, 'z': 3}, 'roll': 12.5}
+    rows = [fall_row({'timestamp': '2026-10-18T10:00:00+09:00', 'fall_detected': 'true',
+                      'confidence_score': 0.93, 'sensor_data': json.dumps(sensor)}),
+            fall_row({'timestamp': '2026-10-18T10:00:05+09:00', 'confidence_score': 0.71,
+                      'sensor_data': {'acceleration': {'x': 1.0}}})]
+    write_segment(str(tmp_path), 'fall', 'u1', rows)
+
+    result = read_range(str(tmp_path), 'u1', 'fall')
+    assert result['fall_detected'].tolist() == [True, True]
+    assert result['confidence_score'].tolist() == [np.float32(0.93), np.float32(0.71)]
+    assert result['acc_z'][0] == np.float32(9.8) and result['gyr_z'][0] == 3
+    assert np.isnan(result['acc_y'][1])
+    assert json.loads(result['sensor_extra'][0]) == {'roll': 12.5}
+    assert result['sensor_extra'][1] == ''
+
+def test_range_read_is_inclusive_and_spans_segments(tmp_path):
+    rows = [imu_row(record) for record in imu_records('u1', 100)]
+    for i in range(0, 100, 30):
+        write_segment(str(tmp_path), 'imu', 'u1', rows[i:i + 30])
+    write_segment(str(tmp_path), 'imu', 'u2', [imu_row(record) for record in imu_records('u2', 100)])
+
+    # 경계 시각의 행 포함, 두 번째~세 번째 세그먼트에 걸친 범위
+    start, end = START + 2.5, START + 7.0
+    assert len(list_segments(str(tmp_path), 'u1', 'imu', start, end)) == 3
+    result = read_range(str(tmp_path), 'u1', 'imu', start, end)
+    assert np.allclose(result['timestamp'], START + np.arange(25, 71) * 0.1)
+    assert np.all(np.diff(result['ts_us']) > 0)
+
+    empty = read_range(str(tmp_path), 'u1', 'imu', START + 100, START + 200)
+    assert len(empty['ts_us']) == 0 and len(empty['acc_x']) == 0
+    assert len(read_range(str(tmp_path), 'nobody')['ts_us']) == 0
+
+def test_segments_partitioned_by_kst_day(tmp_path):
+    # 2026-10-18 23:59:58 KST부터 4초 → 날짜 폴더 2개
+    midnight = 1_792_335_600.0
+    records = imu_records('u1', 5, start=midnight - 2, step=1.0)
+    writer = ColumnarBackupWriter(str(tmp_path), check_interval=3600)
+    for record in records:
+        writer.write('imu', record)
+    writer.close()
+
+    assert sorted(os.listdir(tmp_path / 'u1')) == ['20261018', '20261019']
+    assert len(read_range(str(tmp_path), 'u1', 'imu', midnight, midnight + 10)['ts_us']) == 3
+    assert writer.get_stats()['written'] == 5 and writer.get_stats()['segments'] == 2
+
+def test_convert_csv_file_skips_bad_rows(tmp_path):
+    path = tmp_path / 'imu_u1_20251009.csv'
+    records = imu_records('u1', 20)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, ['user_id', 'timestamp'] + list(SENSOR_COLUMNS))
+        writer.writeheader()
+        for record in records:
+            # CSV 백업의 timestamp는 ISO 문자열
+            record['timestamp'] = datetime.datetime.fromtimestamp(record['timestamp'], KST).isoformat()
+            writer.writerow(record)
+        writer.writerow({'user_id': 'u1', 'timestamp': 'not-a-time'})
+
+    root = str(tmp_path / 'columnar')
+    stats = convert_csv_file(str(path), root, segment_rows=8)
+    assert stats['rows'] == 20 and stats['skipped'] == 1 and stats['segments'] == 3
+    assert len(read_range(root, 'u1')['ts_us']) == 20
+    # 같은 범위 재변환은 건너뜀
+    assert convert_csv_file(str(path), root, segment_rows=8)['segments'] == 0
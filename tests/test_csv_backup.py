@@ -0,0 +1,76 @@
+"""CSV 백업 기록기: KST 자정 파일 전환, 헤더 1회, 열린 파일 재사용/상한"""
+
+import calendar
+import csv
+import os
+
+import pytest
+
+from app.core import csv_backup
+from app.core.csv_backup import CsvBackupWriter, kst_day
+
+FIELDS = ['timestamp', 'value']
+# 2026-10-18 23:59:59 KST (UTC+9)
+BEFORE_MIDNIGHT = calendar.timegm((2026, 10, 18, 14, 59, 59))
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [BEFORE_MIDNIGHT]
+    monkeypatch.setattr(csv_backup.time, 'time', lambda: now[0])
+    return now
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+def test_kst_day_boundary():
+    assert kst_day(BEFORE_MIDNIGHT) == '20261018'
+    assert kst_day(BEFORE_MIDNIGHT + 1) == '20261019'
+
+def test_rotates_at_kst_midnight(tmp_path, clock):
+    writer = CsvBackupWriter(str(tmp_path), flush_interval=3600, fsync_interval=0)
+    writer.write('imu_u1', FIELDS, {'timestamp': 'a', 'value': 1})
+    writer.flush()
+    clock[0] += 1
+    writer.write('imu_u1', FIELDS, {'timestamp': 'b', 'value': 2})
+    writer.flush()
+
+    assert writer.get_stats()['rotations'] == 1
+    assert writer.get_stats()['open_files'] == 1   # 이전 날짜 파일은 닫힘
+    writer.close()
+    assert read_rows(tmp_path / 'imu_u1_20261018.csv') == [FIELDS, ['a', '1']]
+    assert read_rows(tmp_path / 'imu_u1_20261019.csv') == [FIELDS, ['b', '2']]
+
+def test_rows_buffered_before_midnight_stay_in_old_file(tmp_path, clock):
+    writer = CsvBackupWriter(str(tmp_path), flush_interval=3600, fsync_interval=0)
+    writer.write('fall_u1', FIELDS, {'timestamp': 'a', 'value': 1})
+    clock[0] += 1
+    writer.write('fall_u1', FIELDS, {'timestamp': 'b', 'value': 2})
+    writer.close()   # 자정 이후 한 번에 기록해도 행은 적재 시각의 날짜 파일로
+    assert read_rows(tmp_path / 'fall_u1_20261018.csv') == [FIELDS, ['a', '1']]
+    assert read_rows(tmp_path / 'fall_u1_20261019.csv') == [FIELDS, ['b', '2']]
+
+def test_header_written_once_across_reopen(tmp_path, clock):
+    writer = CsvBackupWriter(str(tmp_path), flush_interval=3600, fsync_interval=0)
+    for i in range(3):
+        writer.write('imu_u1', FIELDS, {'timestamp': str(i), 'value': i})
+        writer.flush()
+    writer.close()
+    # 재시작 후 같은 날짜 파일에 이어 쓰기
+    writer = CsvBackupWriter(str(tmp_path), flush_interval=3600, fsync_interval=0)
+    writer.write('imu_u1', FIELDS, {'timestamp': '3', 'value': 3})
+    writer.close()
+
+    rows = read_rows(tmp_path / 'imu_u1_20261018.csv')
+    assert rows[0] == FIELDS
+    assert [row[0] for row in rows[1:]] == ['0', '1', '2', '3']
+    assert writer.get_stats()['opened'] == 1
+
+def test_max_open_files_closes_least_recent(tmp_path, clock):
+    writer = CsvBackupWriter(str(tmp_path), flush_interval=3600, fsync_interval=0, max_open_files=2)
+    for user in ('u1', 'u2', 'u3'):
+        writer.write(f'imu_{user}', FIELDS, {'timestamp': user, 'value': 0})
+        writer.flush()
+    assert writer.get_stats()['open_files'] == 2
+    writer.close()
+    assert sorted(os.listdir(tmp_path)) == [f'imu_{user}_20261018.csv' for user in ('u1', 'u2', 'u3')]
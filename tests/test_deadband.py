@@ -0,0 +1,64 @@
+"""데드밴드 압축(라즈베리파이) → 서버 선형 보간 복원 오차 상한과 공백 처리"""
+
+import datetime
+
+import numpy as np
+
+from Optimized_Walking_Raspberry import DeadbandCompressor
+from app.core.deadband import IMU_FIELDS, DeadbandReconstructor
+
+RATE = 100
+START = 1_700_000_000.0
+
+def walking_signal(seconds):
+    t = np.arange(int(seconds * RATE)) / RATE
+    columns = [np.sin(2 * np.pi * 1.8 * t + phase) * scale for phase, scale in
+               zip(np.linspace(0, 1.5, 6), (0.5, 0.3, 1.2, 0.8, 0.6, 0.4))]
+    return START + t, np.stack(columns, axis=1)
+
+def to_row(timestamp, sample):
+    row = {'user_id': 'u1', 'timestamp': datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).isoformat()}
+    row.update(zip(IMU_FIELDS, (float(v) for v in sample)))
+    return row
+
+def compress(times, samples, **options):
+    compressor = DeadbandCompressor(**options)
+    points = []
+    for timestamp, sample in zip(times, samples):
+        points.extend(compressor.update(timestamp, sample))
+    points.extend(compressor.flush())
+    return compressor, points
+
+def test_reconstruction_error_within_bound():
+    times, samples = walking_signal(5)
+    compressor, points = compress(times, samples, error_bound=0.05, max_interval=1.0)
+    assert len(points) < len(samples) / 2
+
+    reconstructor = DeadbandReconstructor('u1')
+    rows = [row for timestamp, sample in points for row in reconstructor.add(to_row(timestamp, sample))]
+    assert reconstructor.gaps == 0
+    for row in rows:
+        t = datetime.datetime.fromisoformat(row['timestamp']).timestamp()
+        index = int(round((t - START) * RATE))
+        assert abs(t - times[index]) < 1e-6  # 10Hz 격자는 원본 샘플 시각과 일치
+        restored = np.array([row[field] for field in IMU_FIELDS])
+        assert np.max(np.abs(restored - samples[index])) <= 0.05 + 1e-6
+
+    stats = compressor.get_stats()
+    assert stats['max_error'] <= 0.05 + 1e-9
+    assert stats['samples'] == len(samples)
+
+def test_idle_stream_sends_every_max_interval():
+    times = START + np.arange(300) / RATE
+    _, points = compress(times, np.zeros((300, 6)), error_bound=0.05, max_interval=0.5)
+    gaps = np.diff([timestamp for timestamp, _ in points])
+    assert np.all(gaps <= 0.5 + 1e-9)
+
+def test_long_gap_starts_new_segment():
+    reconstructor = DeadbandReconstructor('u1', max_gap=2.0)
+    assert len(reconstructor.add(to_row(START, [0.0] * 6))) == 1
+    assert len(reconstructor.add(to_row(START + 1.0, [1.0] * 6))) == 10
+    # 공백 뒤 샘플은 보간 없이 그대로 1행
+    rows = reconstructor.add(to_row(START + 5.0, [2.0] * 6))
+    assert len(rows) == 1 and rows[0]['acc_x'] == 2.0
+    assert reconstructor.gaps == 1
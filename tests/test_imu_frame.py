@@ -0,0 +1,79 @@
+"""라즈베리파이 encode_imu_frame ↔ 서버 decode_imu_frame 왕복"""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from Optimized_Walking_Raspberry import FRAME_INT16_RANGE, encode_imu_frame, imu_frame_to_packages
+from app.core.deadband import is_deadband_frame
+from app.core.imu_frame import IMU_FIELDS, decode_imu_frame, is_imu_frame
+
+BASE_TIME = 1748310568.125
+
+def make_batch(count=10, seed=0):
+    rng = np.random.default_rng(seed)
+    samples = rng.normal(0.0, 1.5, (count, 6)).astype(np.float32)
+    timestamps = BASE_TIME + np.arange(count) * 0.1
+    return samples, timestamps
+
+def row_values(rows):
+    return np.array([[row[field] for field in IMU_FIELDS] for row in rows])
+
+def row_times(rows):
+    return np.array([datetime.datetime.fromisoformat(row['timestamp']).timestamp() for row in rows])
+
+def test_float32_round_trip_is_exact():
+    samples, timestamps = make_batch()
+    frame = encode_imu_frame(samples, timestamps, encoding='float32', deadband=False)
+
+    assert is_imu_frame(frame)
+    assert not is_deadband_frame(frame)
+    rows, state_info = decode_imu_frame(frame, 'pi')
+    assert state_info is None
+    assert [row['user_id'] for row in rows] == ['pi'] * len(samples)
+    np.testing.assert_array_equal(row_values(rows).astype(np.float32), samples)
+    np.testing.assert_allclose(row_times(rows), timestamps, atol=1e-3)
+
+def test_int16_round_trip_within_quantization_step():
+    samples, timestamps = make_batch()
+    frame = encode_imu_frame(samples, timestamps, encoding='int16', deadband=False)
+
+    rows, _ = decode_imu_frame(frame, 'pi')
+    step = FRAME_INT16_RANGE / 32767.0
+    assert np.abs(row_values(rows) - samples).max() <= step / 2 + 1e-6
+
+def test_state_and_deadband_flags_round_trip():
+    samples, timestamps = make_batch(count=3)
+    frame = encode_imu_frame(samples, timestamps, {'state': 'Walking', 'confidence': 0.75},
+                             encoding='float32', deadband=True)
+
+    assert is_deadband_frame(frame)
+    rows, state_info = decode_imu_frame(frame, 'pi')
+    assert state_info['state'] == 'Walking'
+    assert state_info['confidence'] == pytest.approx(0.75)
+    assert state_info['timestamp'] == rows[-1]['timestamp']
+
+def test_json_fallback_packages_match_decoded_rows():
+    samples, timestamps = make_batch(count=5)
+    frame = encode_imu_frame(samples, timestamps, {'state': 'Daily', 'confidence': 0.5}, encoding='float32')
+
+    rows, _ = decode_imu_frame(frame, 'pi')
+    packages = imu_frame_to_packages(frame, 'pi')
+    assert len(packages) == len(rows)
+    np.testing.assert_allclose(row_values([p['data'] for p in packages]), row_values(rows), atol=1e-6)
+    assert all(p['state_info']['state'] == 'Daily' for p in packages)
+
+def test_truncated_frame_is_rejected():
+    samples, timestamps = make_batch()
+    frame = encode_imu_frame(samples, timestamps, encoding='float32')
+
+    with pytest.raises(ValueError):
+        decode_imu_frame(frame[:-1], 'pi')
+    with pytest.raises(ValueError):
+        decode_imu_frame(frame[:10], 'pi')
+
+def test_frame_longer_than_offset_range_is_rejected():
+    samples, _ = make_batch(count=2)
+    with pytest.raises(ValueError):
+        encode_imu_frame(samples, [BASE_TIME, BASE_TIME + 70.0])
@@ -0,0 +1,25 @@
+"""추론 런타임: 로드 실패는 한 번만 시도하고 이후 추론은 캐시된 오류로 즉시 실패"""
+
+import numpy as np
+import pytest
+
+from walking_runtime import InferenceRuntime
+
+def test_failed_load_is_cached(monkeypatch):
+    attempts = []
+
+    def missing_backend(name):
+        attempts.append(name)
+        raise ImportError(f"{name} not installed")
+
+    monkeypatch.setattr(InferenceRuntime, '_import_backend', staticmethod(missing_backend))
+    runtime = InferenceRuntime('models/missing.tflite')
+    window = np.zeros((1, 150, 6), dtype=np.float32)
+
+    for _ in range(5):
+        with pytest.raises(ImportError):
+            runtime.set_input(window)
+
+    assert attempts == list(InferenceRuntime.BACKENDS)
+    stats = runtime.get_stats()
+    assert stats['backend'] is None and 'not installed' in stats['load_error']
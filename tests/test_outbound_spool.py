@@ -0,0 +1,123 @@
+"""OutboundSpool 기록/재전송 순서, 재시작 후 읽기 위치, 잘린/손상된 레코드 복구"""
+
+import json
+import os
+
+import pytest
+
+from Optimized_Walking_Raspberry import OutboundSpool
+from app.core.imu_frame import decode_imu_frame
+
+def open_spool(directory, **options):
+    # 기록은 테스트에서 직접 flush() (백그라운드 주기 기록 비활성)
+    return OutboundSpool(str(directory), flush_interval=3600, fsync_policy='never', **options)
+
+def drain(spool):
+    records = []
+    while True:
+        record = spool.peek()
+        if record is None:
+            return records
+        records.append(record)
+        spool.ack()
+
+def fall_ids(records):
+    return [json.loads(payload)['id'] for kind, payload in records if kind == OutboundSpool.KIND_FALL]
+
+def segment_paths(directory):
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.log'))
+
+def test_records_replay_in_order(tmp_path):
+    spool = open_spool(tmp_path)
+    spool.append_imu(1000.0, [0.1] * 6, {'state': 'Walking', 'confidence': 0.9})
+    spool.append_imu(1000.1, [0.2] * 6)
+    spool.append_fall({'id': 1})
+    spool.append_imu(1000.3, [0.3] * 6)
+    spool.flush()
+
+    records = drain(spool)
+    assert [kind for kind, _ in records] == [OutboundSpool.KIND_IMU_FRAME, OutboundSpool.KIND_FALL,
+                                            OutboundSpool.KIND_IMU_FRAME]
+    rows, _ = decode_imu_frame(records[0][1], 'pi')
+    assert [row['acc_x'] for row in rows] == pytest.approx([0.1, 0.2])
+    assert fall_ids(records) == [1]
+    assert not spool.has_backlog()
+
+def test_unacked_record_is_replayed_again(tmp_path):
+    spool = open_spool(tmp_path)
+    spool.append_fall({'id': 1})
+    spool.flush()
+
+    assert fall_ids([spool.peek()]) == [1]
+    assert fall_ids([spool.peek()]) == [1]  # ack 전에는 같은 레코드
+    spool.ack()
+    assert spool.peek() is None
+
+def test_restart_resumes_from_saved_cursor(tmp_path):
+    spool = open_spool(tmp_path)
+    for i in range(3):
+        spool.append_fall({'id': i})
+    spool.flush()
+    spool.peek()
+    spool.ack()
+    spool.flush()  # 읽기 위치 저장
+
+    restarted = open_spool(tmp_path)
+    assert fall_ids(drain(restarted)) == [1, 2]
+
+def test_truncated_tail_is_skipped_and_cursor_moves_past_it(tmp_path):
+    spool = open_spool(tmp_path)
+    for i in range(3):
+        spool.append_fall({'id': i})
+    spool.flush()
+    # 전원 차단: 마지막 레코드 중간에서 잘림
+    path = segment_paths(tmp_path)[0]
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 3)
+
+    restarted = open_spool(tmp_path)
+    restarted.append_fall({'id': 3})
+    restarted.flush()
+    assert fall_ids(drain(restarted)) == [0, 1, 3]
+    assert restarted.get_stats()['corrupt_segments'] == 1
+    restarted.flush()
+
+    # 잘린 세그먼트는 삭제, 읽기 위치는 다음 세그먼트 → 재시작해도 이미 보낸 레코드를 다시 보내지 않음
+    with open(os.path.join(tmp_path, 'cursor.json')) as f:
+        cursor = json.load(f)
+    assert not os.path.exists(path)
+    assert cursor['segment'] > int(os.path.basename(path)[8:-4])
+    assert drain(open_spool(tmp_path)) == []
+
+def test_crc_mismatch_stops_at_corrupt_record(tmp_path):
+    spool = open_spool(tmp_path)
+    spool.append_fall({'id': 0})
+    spool.flush()
+    first_size = os.path.getsize(segment_paths(tmp_path)[0])
+    spool.append_fall({'id': 1})
+    spool.append_fall({'id': 2})
+    spool.flush()
+    # 두 번째 레코드 페이로드 1바이트 손상 (길이는 그대로, CRC 불일치)
+    path = segment_paths(tmp_path)[0]
+    with open(path, 'r+b') as f:
+        f.seek(first_size + OutboundSpool.RECORD_HEADER.size + 2)
+        byte = f.read(1)
+        f.seek(-1, os.SEEK_CUR)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+    restarted = open_spool(tmp_path)
+    restarted.append_fall({'id': 3})
+    restarted.flush()
+    # 손상 지점 이후 같은 세그먼트는 건너뛰고 다음 세그먼트부터 계속
+    assert fall_ids(drain(restarted)) == [0, 3]
+    assert restarted.get_stats()['corrupt_segments'] == 1
+
+def test_capacity_limit_evicts_oldest_segments(tmp_path):
+    spool = open_spool(tmp_path, max_bytes=600, segment_bytes=200)
+    for i in range(20):
+        spool.append_fall({'id': i, 'padding': 'x' * 40})
+        spool.flush()
+
+    ids = fall_ids(drain(spool))
+    assert spool.get_stats()['evicted_kb'] > 0
+    assert ids == sorted(ids) and ids[-1] == 19 and ids[0] > 0
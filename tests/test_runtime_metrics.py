@@ -0,0 +1,63 @@
+"""실행 시간 계측: 여러 스레드의 record()와 tick() 조각 회전이 동시에 일어나도 카운트 손실 없음"""
+
+import sys
+import threading
+
+import pytest
+
+from Optimized_Walking_Raspberry import RuntimeMetrics
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+def test_concurrent_record_and_tick(fast_switching):
+    clock = [0.0]
+    metrics = RuntimeMetrics(window=1.0, slices=4, clock=lambda: clock[0])
+    per_thread = 20000
+    stop = threading.Event()
+
+    def recorder(stage):
+        for i in range(per_thread):
+            metrics.record(stage, (i % 50) * 1e-5)
+            metrics.count('records')
+
+    def ticker():
+        while not stop.is_set():
+            clock[0] += 0.25
+            metrics.tick()
+
+    # 수집/추론/메인 스레드처럼 같은 단계와 다른 단계를 함께 기록
+    threads = [threading.Thread(target=recorder, args=(stage,))
+               for stage in ('sensor_read', 'fall_inference', 'loop', 'loop')]
+    tick_thread = threading.Thread(target=ticker)
+    tick_thread.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stop.set()
+    tick_thread.join()
+
+    stages = metrics.stage_stats()
+    assert metrics.overhead()['records'] == 4 * per_thread
+    assert metrics.snapshot()['counters']['records'] == 4 * per_thread
+    assert {stage: metrics._totals[stage][0] for stage in stages} == {
+        'sensor_read': per_thread, 'fall_inference': per_thread, 'loop': 2 * per_thread}
+    assert all(stats['count'] <= metrics._totals[stage][0] for stage, stats in stages.items())
+
+def test_window_keeps_only_recent_slices():
+    clock = [0.0]
+    metrics = RuntimeMetrics(window=1.0, slices=4, clock=lambda: clock[0])
+    metrics.record('loop', 1e-3)
+    for _ in range(3):
+        clock[0] += 0.25
+        metrics.tick()
+    assert metrics.stage_stats()['loop']['count'] == 1
+    clock[0] += 0.25
+    metrics.tick()
+    stats = metrics.stage_stats()['loop']
+    assert stats['count'] == 0 and stats['max_ms'] == pytest.approx(1.0)
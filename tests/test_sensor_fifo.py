@@ -0,0 +1,54 @@
+"""MPU6050 FIFO 읽기: 배치 단위 드레인의 버스 트랜잭션 수, 샘플 간격, 오버플로 없음 (가상 시계)"""
+
+import time
+
+import numpy as np
+import pytest
+
+import Optimized_Walking_Raspberry as walking
+from Optimized_Walking_Raspberry import SAMPLING_RATE, OptimizedSensor, SimulatedSMBus
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0.0)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, 'time', clock.time)
+    monkeypatch.setattr(time, 'sleep', clock.sleep)
+    return clock
+
+def read_samples(clock, read_mode, n=200):
+    bus = SimulatedSMBus(clock=clock.time)
+    sensor = OptimizedSensor(bus=bus, read_mode=read_mode)
+    bus.transactions = 0
+    timestamps = []
+    for _ in range(n):
+        if read_mode != 'fifo':
+            clock.sleep(1.0 / SAMPLING_RATE)  # 스케줄러 주기 대신
+        sensor.get_data()
+        timestamps.append(sensor.last_timestamp)
+    return sensor, bus.transactions / n, np.diff(timestamps)
+
+def test_fifo_drains_in_batches(clock):
+    sensor, per_sample, intervals = read_samples(clock, 'fifo')
+    _, word_per_sample, _ = read_samples(clock, 'word')
+
+    assert word_per_sample == 12
+    # 배치당 INT_STATUS + FIFO_COUNT 2회 + 24바이트 블록 읽기 → 샘플당 약 1회
+    assert per_sample <= 1.0 + 1e-9
+    assert sensor.fifo_overflows == 0
+    np.testing.assert_allclose(intervals, 1.0 / SAMPLING_RATE)
+
+def test_fifo_waits_for_a_batch_instead_of_polling(clock):
+    bus = SimulatedSMBus(clock=clock.time)
+    sensor = OptimizedSensor(bus=bus, read_mode='fifo')
+    sensor.get_data()
+    assert sensor.pending() == walking.FIFO_BATCH_SAMPLES - 1
@@ -0,0 +1,81 @@
+"""스트리밍 낙상 추론: 게이트가 건너뛴 stride 이후에도 상태 유지, 윈도우 추론과 같은 출력, 기준 모델 골든 출력 일치"""
+
+import hashlib
+import os
+
+import numpy as np
+
+from Optimized_Walking_Raspberry import (SEQ_LENGTH, STRIDE, FusedScaler, OptimizedFallDetector,
+                                         SampleRingBuffer, StreamingFallModel)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN_PATH = os.path.join(ROOT_DIR, 'models', 'fall_detection_golden.npz')
+
+def make_stream(n=1200, seed=3):
+    """정지(1g, 작은 잡음) + 중간에 충격 구간 → 정규화 값"""
+    rng = np.random.default_rng(seed)
+    raw = np.zeros((n, 6))
+    raw[:, 2] = 1.0
+    raw += rng.normal(scale=0.01, size=(n, 6))
+    raw[600:620] += rng.normal(scale=2.0, size=(20, 6))
+    scaler = FusedScaler.load()
+    samples = raw * scaler.a + scaler.b if scaler else raw
+    return samples.astype(np.float32)
+
+def run_detector(gate_mode):
+    buffer = SampleRingBuffer(SEQ_LENGTH + 100)
+    clock = [0.0]
+    detector = OptimizedFallDetector(buffer, gate_mode=gate_mode, clock=lambda: clock[0],
+                                     inference_mode='streaming')
+    model = detector.runtime
+    cold_passes = []
+    predict_window = model.predict_window
+    model.predict_window = lambda window: cold_passes.append(buffer.count) or predict_window(window)
+
+    outputs = {}
+    for i, sample in enumerate(make_stream()):
+        clock[0] = i / 100
+        detector.add_data(sample)
+        if detector.should_predict():
+            result = detector.predict()
+            if result is not None:
+                outputs[buffer.count] = (result['probability'], predict_window(buffer.window(SEQ_LENGTH)))
+    return detector, outputs, cold_passes
+
+def test_gated_strides_keep_streaming_states_warm():
+    detector, outputs, cold_passes = run_detector('gate')
+    assert detector.gate.skipped > 0 and len(outputs) > 1
+    # 윈도우 재계산은 시작 직후 상태가 SEQ_LENGTH 문맥을 채우기 전까지만
+    assert cold_passes and max(cold_passes) < 2 * SEQ_LENGTH
+    assert detector.runtime.get_stats()['feeds'] == detector.gate.skipped
+    for streamed, windowed in outputs.values():
+        assert abs(streamed - windowed) < 1e-5
+
+def test_gate_does_not_change_outputs():
+    _, gated, _ = run_detector('gate')
+    _, ungated, _ = run_detector('off')
+    assert len(ungated) == (1200 - SEQ_LENGTH) // STRIDE + 1
+    for end, (probability, _) in gated.items():
+        assert probability == ungated[end][0]
+
+def test_numpy_port_matches_golden_output():
+    """tools/streaming_fall_model.py --write-golden으로 저장한 기준 TFLite 출력과 numpy 윈도우/스트리밍 추론 비교"""
+    with np.load(GOLDEN_PATH) as golden:
+        samples, lengths = golden['samples'], golden['lengths']
+        expected = golden['probabilities']
+        source_sha256 = str(golden['source_sha256'])
+    with open(os.path.join(ROOT_DIR, 'models', 'fall_detection.tflite'), 'rb') as f:
+        assert hashlib.sha256(f.read()).hexdigest() == source_sha256, "golden output is stale"
+
+    model = StreamingFallModel.load(os.path.join(ROOT_DIR, 'models', 'fall_detection_stream.npz'))
+    windowed, streamed = [], []
+    for stream in np.split(samples, np.cumsum(lengths)[:-1]):
+        model.reset()
+        model.push(stream[:SEQ_LENGTH - STRIDE])
+        for end in range(SEQ_LENGTH, len(stream) + 1, STRIDE):
+            windowed.append(model.predict_window(stream[end - SEQ_LENGTH:end]))
+            streamed.append(model.update(stream[end - STRIDE:end]))
+
+    assert len(windowed) == len(expected)
+    np.testing.assert_allclose(windowed, expected, atol=1e-4)
+    np.testing.assert_allclose(streamed, expected, atol=1e-4)
@@ -0,0 +1,134 @@
+"""사용자 존재 확인 캐시: 단일 비행, 조회 중 무효화, 부정 캐시, 항목 상한"""
+
+import asyncio
+
+from app.core.user_cache import UserExistenceCache
+
+class GatedLoader:
+    """release 전까지 조회가 끝나지 않는 loader (호출 횟수 기록)"""
+
+    def __init__(self, result=True):
+        self.result = result
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, user_id):
+        self.calls.append(user_id)
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+def test_concurrent_lookups_share_one_load():
+    async def scenario():
+        loader = GatedLoader()
+        cache = UserExistenceCache(loader)
+        waiters = [asyncio.ensure_future(cache.ensure('u1')) for _ in range(10)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*waiters)
+        assert await cache.ensure('u1')   # 캐시 적중
+        return loader, cache, results
+
+    loader, cache, results = asyncio.run(scenario())
+    assert results == [True] * 10
+    assert loader.calls == ['u1']
+    stats = cache.get_stats()
+    assert stats['loads'] == 1 and stats['coalesced'] == 9 and stats['hits'] == 1
+    assert stats['inflight'] == 0
+
+def test_invalidate_during_load_discards_result():
+    async def scenario():
+        loader = GatedLoader()
+        cache = UserExistenceCache(loader)
+        first = asyncio.ensure_future(cache.ensure('u1'))
+        await asyncio.sleep(0)
+        cache.invalidate('u1')
+        # 무효화 이후 요청은 진행 중인 조회에 합류하지 않고 새로 조회
+        second = asyncio.ensure_future(cache.ensure('u1'))
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(first, second)
+        return loader, cache, results
+
+    loader, cache, results = asyncio.run(scenario())
+    assert results == [True, True]
+    assert loader.calls == ['u1', 'u1']
+    stats = cache.get_stats()
+    assert stats['entries'] == 1 and stats['inflight'] == 0   # 두 번째 조회 결과만 남음
+
+def test_invalidate_all_during_load_leaves_cache_empty():
+    async def scenario():
+        loader = GatedLoader()
+        cache = UserExistenceCache(loader)
+        pending = asyncio.ensure_future(cache.ensure('u1'))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        loader.release.set()
+        assert await pending
+        return cache
+
+    stats = asyncio.run(scenario()).get_stats()
+    assert stats['entries'] == 0 and stats['inflight'] == 0
+
+def test_cancelled_waiter_does_not_cancel_load():
+    async def scenario():
+        loader = GatedLoader()
+        cache = UserExistenceCache(loader)
+        waiter = asyncio.ensure_future(cache.ensure('u1'))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        loader.release.set()
+        await asyncio.sleep(0.01)
+        assert await cache.ensure('u1')
+        return loader, cache
+
+    loader, cache = asyncio.run(scenario())
+    assert loader.calls == ['u1']
+    assert cache.get_stats()['hits'] == 1
+
+def test_failed_load_is_negatively_cached_until_invalidated():
+    async def scenario():
+        loader = GatedLoader(result=RuntimeError('db down'))
+        loader.release.set()
+        cache = UserExistenceCache(loader, negative_ttl=60)
+        assert not await cache.ensure('u1')
+        assert not await cache.ensure('u1')   # 부정 캐시 적중, 재조회 없음
+        loader.result = True
+        cache.invalidate(missing_only=True)
+        assert await cache.ensure('u1')
+        return loader, cache
+
+    loader, cache = asyncio.run(scenario())
+    assert loader.calls == ['u1', 'u1']
+    stats = cache.get_stats()
+    assert stats['load_errors'] == 1 and stats['negative_hits'] == 1 and stats['invalidations'] == 1
+
+def test_expired_entry_is_reloaded():
+    async def scenario():
+        loader = GatedLoader()
+        loader.release.set()
+        cache = UserExistenceCache(loader, ttl=0.01)
+        await cache.ensure('u1')
+        await asyncio.sleep(0.02)
+        await cache.ensure('u1')
+        return loader, cache
+
+    loader, cache = asyncio.run(scenario())
+    assert loader.calls == ['u1', 'u1']
+    assert cache.get_stats()['expired'] == 1
+
+def test_max_entries_evicts_least_recently_used():
+    async def scenario():
+        loader = GatedLoader()
+        loader.release.set()
+        cache = UserExistenceCache(loader, max_entries=2)
+        for user in ('u1', 'u2', 'u1', 'u3'):
+            await cache.ensure(user)
+        await cache.ensure('u1')   # 최근에 쓴 u1은 남음
+        await cache.ensure('u2')   # u2는 제거되어 다시 조회
+        return loader, cache
+
+    loader, cache = asyncio.run(scenario())
+    assert loader.calls == ['u1', 'u2', 'u3', 'u2']
+    assert cache.get_stats()['evictions'] == 2
@@ -0,0 +1,228 @@
+"""write-behind 대기열: 채널 순서, 재시도, 가득 찼을 때 drop_oldest/block 정책"""
+
+import asyncio
+
+import pytest
+
+from app.core import write_behind
+from app.core.write_behind import WriteBehindQueue
+
+@pytest.fixture(autouse=True)
+def fast_retry(monkeypatch):
+    monkeypatch.setattr(write_behind, 'RETRY_BASE_DELAY', 0.001)
+    monkeypatch.setattr(write_behind, 'BLOCK_TIMEOUT', 0.05)
+
+class Recorder:
+    """저장된 레코드를 순서대로 기록, fail_once의 레코드는 첫 시도만 실패"""
+
+    def __init__(self, fail_once=()):
+        self.rows = []
+        self.calls = 0
+        self.fail_once = set(fail_once)
+
+    def __call__(self, records):
+        self.calls += 1
+        if any(record['seq'] in self.fail_once for record in records):
+            self.fail_once -= {record['seq'] for record in records}
+            return {'error': 'insert failed'}
+        self.rows.extend(records)
+        return {'success': True}
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_batches_and_preserves_order():
+    async def scenario():
+        queue = WriteBehindQueue()
+        recorder = Recorder()
+        queue.add_channel('imu', recorder, max_batch=4, max_delay=0.01)
+        for seq in range(10):
+            queue.put_nowait('imu', {'seq': seq})
+        await queue.close()
+        return queue, recorder
+
+    queue, recorder = run(scenario())
+    assert [row['seq'] for row in recorder.rows] == list(range(10))
+    assert recorder.calls == 3
+    assert queue.get_stats()['imu']['written'] == 10
+
+def test_failed_batch_is_retried_in_place():
+    async def scenario():
+        queue = WriteBehindQueue()
+        recorder = Recorder(fail_once={1})
+        queue.add_channel('imu', recorder, max_batch=2, max_delay=0.01)
+        for seq in range(6):
+            queue.put_nowait('imu', {'seq': seq})
+        await queue.close()
+        return queue, recorder
+
+    queue, recorder = run(scenario())
+    assert [row['seq'] for row in recorder.rows] == list(range(6))
+    stats = queue.get_stats()['imu']
+    assert stats['retries'] == 2 and stats['failed'] == 0
+
+def test_per_record_writer_gives_up_after_max_retries():
+    async def scenario():
+        queue = WriteBehindQueue()
+        saved = []
+
+        def writer(record):
+            if record['seq'] == 1:
+                raise RuntimeError('db down')
+            saved.append(record['seq'])
+
+        queue.add_channel('fall', writer, bulk=False, max_delay=0.01, max_retries=2)
+        for seq in range(3):
+            queue.put_nowait('fall', {'seq': seq})
+        await queue.close()
+        return queue, saved
+
+    queue, saved = run(scenario())
+    assert saved == [0, 2]
+    assert queue.get_stats()['fall']['failed'] == 1
+
+def test_drop_oldest_when_full():
+    async def scenario():
+        queue = WriteBehindQueue()
+        recorder = Recorder()
+        queue.add_channel('imu', recorder, max_batch=100, max_delay=10.0, max_pending=3)
+        for seq in range(5):
+            queue.put_nowait('imu', {'seq': seq})
+        stats = queue.get_stats()['imu']
+        await queue.close()
+        return stats, recorder
+
+    stats, recorder = run(scenario())
+    assert stats['dropped'] == 2 and stats['pending'] == 3
+    assert [row['seq'] for row in recorder.rows] == [2, 3, 4]
+
+def test_block_waits_for_space(monkeypatch):
+    async def scenario():
+        queue = WriteBehindQueue()
+        recorder = Recorder()
+        queue.add_channel('imu', recorder, max_batch=100, max_delay=0.02, max_pending=2, overflow='block')
+        await queue.put('imu', {'seq': 0})
+        await queue.put('imu', {'seq': 1})
+        # max_delay 뒤 저장 태스크가 배치를 가져가면 자리가 생겨 폐기 없이 적재
+        await queue.put('imu', {'seq': 2})
+        stats = queue.get_stats()['imu']
+        await queue.close()
+        return stats, recorder
+
+    monkeypatch.setattr(write_behind, 'BLOCK_TIMEOUT', 1.0)
+    stats, recorder = run(scenario())
+    assert stats['blocked'] == 1 and stats['dropped'] == 0
+    assert [row['seq'] for row in recorder.rows] == [0, 1, 2]
+
+def test_block_drops_oldest_after_timeout():
+    async def scenario():
+        queue = WriteBehindQueue()
+        recorder = Recorder()
+        queue.add_channel('imu', recorder, max_batch=100, max_delay=10.0, max_pending=2, overflow='block')
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for seq in range(3):
+            await queue.put('imu', {'seq': seq})
+        waited = loop.time() - started
+        stats = queue.get_stats()['imu']
+        await queue.close()
+        return waited, stats, recorder
+
+    waited, stats, recorder = run(scenario())
+    assert waited >= 0.05
+    assert stats['blocked'] == 1 and stats['dropped'] == 1
+    assert [row['seq'] for row in recorder.rows] == [1, 2]
+
+def test_unknown_overflow_policy_rejected():
+    with pytest.raises(ValueError):
+        WriteBehindQueue().add_channel('imu', Recorder(), overflow='spill')
+
+class BadRowWriter:
+    """일괄 저장: bad 행이 하나라도 섞이면 배치 전체 실패"""
+
+    def __init__(self):
+        self.rows = []
+        self.batches = []
+
+    def __call__(self, records):
+        self.batches.append(len(records))
+        if any(record.get('bad') for record in records):
+            return {'error': 'invalid row'}
+        self.rows.extend(records)
+        return {'success': True}
+
+def coalesce(writer, records, **options):
+    async def scenario():
+        queue = WriteBehindQueue()
+        queue.add_channel('imu', writer, coalesce_by='user_id', **options)
+        for record in records:
+            queue.put_nowait('imu', record)
+        pending = queue.channels['imu'].pending_by_key()
+        await queue.close()
+        return queue.get_stats()['imu'], pending
+
+    return run(scenario())
+
+def test_rows_from_many_users_share_one_insert():
+    writer = BadRowWriter()
+    records = [{'user_id': f'u{i % 5}', 'seq': i} for i in range(40)]
+    stats, pending = coalesce(writer, records, max_batch=100, min_batch=50, max_delay=0.01)
+    assert pending == {f'u{i}': 8 for i in range(5)}
+    assert writer.batches == [40]
+    assert stats['written'] == 40
+
+def test_split_retry_isolates_bad_row_and_keeps_user_order():
+    writer = BadRowWriter()
+    records = []
+    for seq in range(10):
+        for user in ('u1', 'u2', 'u3', 'u4'):
+            records.append({'user_id': user, 'seq': seq, 'bad': user == 'u2' and seq == 3})
+    stats, _ = coalesce(writer, records, max_batch=100, min_batch=50, max_delay=0.01, max_retries=2)
+
+    # 나쁜 행 1개만 폐기, 나머지는 모두 저장
+    assert stats['failed'] == 1 and stats['written'] == 39
+    assert stats['splits'] > 0
+    for user in ('u1', 'u2', 'u3', 'u4'):
+        saved = [row['seq'] for row in writer.rows if row['user_id'] == user]
+        assert saved == [seq for seq in range(10) if not (user == 'u2' and seq == 3)]
+
+def test_retrying_user_holds_new_rows_until_resolved():
+    writer = BadRowWriter()
+    records = [{'user_id': 'u1', 'seq': seq, 'bad': seq == 0} for seq in range(3)]
+    records += [{'user_id': 'u1', 'seq': seq} for seq in range(3, 6)]
+    stats, _ = coalesce(writer, records, max_batch=4, min_batch=4, max_delay=0.01, max_retries=1)
+    # 한 사용자 안에서는 재시도 중인 행보다 뒤 행이 먼저 저장되지 않음
+    assert [row['seq'] for row in writer.rows] == [1, 2, 3, 4, 5]
+    assert stats['failed'] == 1
+
+def test_fall_channel_saves_other_falls_when_one_row_is_bad():
+    """낙상 채널 설정(분할 재시도, block): 나쁜 행 하나만 폐기되고 같은 배치의 다른 낙상은 저장"""
+    writer = BadRowWriter()
+    records = [{'user_id': f'pi{i % 3}', 'seq': i, 'bad': i == 4} for i in range(12)]
+    stats, _ = coalesce(writer, records, max_batch=50, min_batch=50, max_delay=0.05,
+                        overflow='block', max_retries=1)
+    assert stats['failed'] == 1 and stats['written'] == 11
+    assert sorted(row['seq'] for row in writer.rows) == [i for i in range(12) if i != 4]
+
+def test_on_written_fires_only_after_confirmed_save():
+    """저장이 확인된 레코드만 on_written 호출 (낙상 응급상황 타이머: 적재 시점이 아니라 저장 후 시작)"""
+    saved = []
+
+    async def scenario():
+        queue = WriteBehindQueue()
+        writer = BadRowWriter()
+        queue.add_channel('fall', writer, coalesce_by='user_id', max_batch=50, min_batch=50,
+                          max_delay=0.05, overflow='block', max_retries=1,
+                          on_written=lambda record: saved.append((record['seq'], len(writer.rows))))
+        for i in range(6):
+            await queue.put('fall', {'user_id': f'pi{i % 2}', 'seq': i, 'bad': i == 3})
+        before = list(saved)
+        await queue.close()
+        return before, writer
+
+    before, writer = run(scenario())
+    assert before == []
+    assert sorted(seq for seq, _ in saved) == [0, 1, 2, 4, 5]
+    # 콜백 시점에 해당 행은 이미 저장됨
+    saved_seqs = [row['seq'] for row in writer.rows]
+    assert all(seq in saved_seqs[:count] for seq, count in saved)
@@ -0,0 +1,260 @@
+"""
+낙상 감지 모델 Flex 연산 제거 (내장 연산만 사용하는 TFLite로 변환)
+- 기준 모델(models/fall_detection.tflite)의 LSTM 루프는 TensorList Flex(Select TF) 연산으로
+  타임스텝 출력을 모으므로 tflite-runtime(Flex 델리게이트 없음)에서 실행되지 않음
+- TensorList를 [n, 1, units] float32 텐서로 바꾸고 연산을 내장 연산으로 교체:
+    FlexTensorListReserve → FILL(0)
+    FlexTensorListSetItem → PACK(인덱스) + RESHAPE + DYNAMIC_UPDATE_SLICE
+    FlexTensorListStack   → RESHAPE
+- 가중치와 나머지 연산(WHILE 루프, LSTM 셀, LayerNorm, Dense)은 그대로 유지
+- 배치 크기는 라즈베리파이 추론과 같은 1로 고정
+
+사용법:
+    python tools/convert_fall_model.py              # models/fall_detection_builtin.tflite 생성 + 확인
+    python tools/convert_fall_model.py --check-only # 기존 변환 결과만 확인
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# 프로젝트 루트를 Python 경로에 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+SOURCE_MODEL_PATH = os.path.join(ROOT_DIR, 'models', 'fall_detection.tflite')
+BUILTIN_MODEL_PATH = os.path.join(ROOT_DIR, 'models', 'fall_detection_builtin.tflite')
+
+FLEX_RESERVE = b'FlexTensorListReserve'
+FLEX_SET_ITEM = b'FlexTensorListSetItem'
+FLEX_STACK = b'FlexTensorListStack'
+
+def _load_schema():
+    """TFLite flatbuffer 스키마 (변환 시에만 tensorflow 필요)"""
+    try:
+        from tensorflow.lite.python import schema_py_generated as schema
+    except ImportError as e:
+        raise SystemExit(f"❌ tensorflow is required for conversion: {e}")
+    return schema
+
+class FlexLowering:
+    """TensorList Flex 연산 → 내장 연산 변환기 (flatbuffer 객체 API 사용)"""
+
+    def __init__(self, schema, model):
+        self.s = schema
+        self.model = model
+        self.list_shapes = {}  # (subgraph, tensor) → [n, 1, units]
+
+    # ---- flatbuffer 헬퍼 ----
+
+    def _custom_name(self, op):
+        return self.model.operatorCodes[op.opcodeIndex].customCode
+
+    def _const_value(self, subgraph, tensor_index):
+        tensor = subgraph.tensors[tensor_index]
+        data = self.model.buffers[tensor.buffer].data
+        if data is None:
+            raise ValueError(f"Tensor {tensor.name} is not a constant")
+        return np.frombuffer(bytes(data), dtype=np.int32).reshape(tensor.shape)
+
+    def _opcode(self, code):
+        """내장 연산 opcode 인덱스 (없으면 추가)"""
+        for i, opcode in enumerate(self.model.operatorCodes):
+            if opcode.builtinCode == code and not opcode.customCode:
+                return i
+        opcode = self.s.OperatorCodeT()
+        opcode.builtinCode = code
+        # 127 초과 연산은 deprecatedBuiltinCode에 PLACEHOLDER_FOR_GREATER_OP_CODES(127)
+        opcode.deprecatedBuiltinCode = min(code, 127)
+        opcode.version = 1
+        self.model.operatorCodes.append(opcode)
+        return len(self.model.operatorCodes) - 1
+
+    def _tensor(self, subgraph, name, shape, tensor_type, data=None):
+        """서브그래프에 텐서 추가 (data가 있으면 상수 버퍼 생성) → 텐서 인덱스"""
+        buffer = self.s.BufferT()
+        if data is not None:
+            buffer.data = np.frombuffer(np.ascontiguousarray(data).tobytes(), dtype=np.uint8)
+        self.model.buffers.append(buffer)
+        tensor = self.s.TensorT()
+        tensor.name = name.encode()
+        tensor.shape = np.asarray(shape, dtype=np.int32)
+        tensor.type = tensor_type
+        tensor.buffer = len(self.model.buffers) - 1
+        subgraph.tensors.append(tensor)
+        return len(subgraph.tensors) - 1
+
+    def _op(self, code, inputs, outputs, options_type=0, options=None):
+        op = self.s.OperatorT()
+        op.opcodeIndex = self._opcode(code)
+        op.inputs = np.asarray(inputs, dtype=np.int32)
+        op.outputs = np.asarray(outputs, dtype=np.int32)
+        op.builtinOptionsType = options_type
+        op.builtinOptions = options
+        return op
+
+    # ---- 리스트 텐서 형상 전파 ----
+
+    def _set_list_shape(self, sg_index, tensor_index, shape):
+        self.list_shapes[(sg_index, int(tensor_index))] = shape
+        tensor = self.model.subgraphs[sg_index].tensors[tensor_index]
+        tensor.type = self.s.TensorType.FLOAT32
+        tensor.shape = np.asarray(shape, dtype=np.int32)
+        tensor.shapeSignature = None
+
+    def _infer_list_shapes(self):
+        """Reserve의 (요소 형상, 개수)에서 리스트 형상을 구해 WHILE 입출력과 cond/body 인자로 전파"""
+        BO = self.s.BuiltinOperator
+        main = self.model.subgraphs[0]
+        for op in main.operators:
+            if self._custom_name(op) == FLEX_RESERVE:
+                element_shape = self._const_value(main, op.inputs[0])
+                count = int(self._const_value(main, op.inputs[1]))
+                self._set_list_shape(0, op.outputs[0], [count, 1, int(element_shape[-1])])
+        for op in main.operators:
+            if self.model.operatorCodes[op.opcodeIndex].builtinCode != BO.WHILE:
+                continue
+            options = op.builtinOptions
+            for position, tensor_index in enumerate(op.inputs):
+                shape = self.list_shapes.get((0, int(tensor_index)))
+                if shape is None:
+                    continue
+                self._set_list_shape(0, op.outputs[position], shape)
+                for sg_index in (options.condSubgraphIndex, options.bodySubgraphIndex):
+                    self._set_list_shape(sg_index, self.model.subgraphs[sg_index].inputs[position], shape)
+                body = self.model.subgraphs[options.bodySubgraphIndex]
+                self._set_list_shape(options.bodySubgraphIndex, body.outputs[position], shape)
+        leftover = [(i, t.name) for i, sg in enumerate(self.model.subgraphs) for t in sg.tensors
+                    if t.type == self.s.TensorType.VARIANT]
+        if leftover:
+            raise ValueError(f"Unsupported TensorList usage: {leftover}")
+
+    # ---- 연산 교체 ----
+
+    def _lower_reserve(self, sg_index, subgraph, op):
+        shape = self.list_shapes[(sg_index, int(op.outputs[0]))]
+        dims = self._tensor(subgraph, 'lowered/fill_dims', [3], self.s.TensorType.INT32,
+                            np.asarray(shape, dtype=np.int32))
+        zero = self._tensor(subgraph, 'lowered/fill_zero', [], self.s.TensorType.FLOAT32,
+                            np.zeros((), dtype=np.float32))
+        return [self._op(self.s.BuiltinOperator.FILL, [dims, zero], [op.outputs[0]],
+                         self.s.BuiltinOptions.FillOptions, self.s.FillOptionsT())]
+
+    def _lower_set_item(self, sg_index, subgraph, op):
+        BO, BOpt, TT = self.s.BuiltinOperator, self.s.BuiltinOptions, self.s.TensorType
+        list_in, index, item = (int(i) for i in op.inputs)
+        shape = self.list_shapes[(sg_index, list_in)]
+        zero = self._tensor(subgraph, 'lowered/zero_index', [], TT.INT32, np.zeros((), dtype=np.int32))
+        start = self._tensor(subgraph, 'lowered/update_start', [3], TT.INT32)
+        update_shape = self._tensor(subgraph, 'lowered/update_shape', [3], TT.INT32,
+                                    np.asarray([1, 1, shape[2]], dtype=np.int32))
+        update = self._tensor(subgraph, 'lowered/update', [1, 1, shape[2]], TT.FLOAT32)
+        pack = self.s.PackOptionsT()
+        pack.valuesCount, pack.axis = 3, 0
+        return [
+            self._op(BO.PACK, [index, zero, zero], [start], BOpt.PackOptions, pack),
+            self._op(BO.RESHAPE, [item, update_shape], [update], BOpt.ReshapeOptions, self.s.ReshapeOptionsT()),
+            self._op(BO.DYNAMIC_UPDATE_SLICE, [list_in, update, start], [op.outputs[0]],
+                     BOpt.DynamicUpdateSliceOptions, self.s.DynamicUpdateSliceOptionsT()),
+        ]
+
+    def _lower_stack(self, sg_index, subgraph, op):
+        shape = self.list_shapes[(sg_index, int(op.inputs[0]))]
+        target = self._tensor(subgraph, 'lowered/stack_shape', [3], self.s.TensorType.INT32,
+                              np.asarray(shape, dtype=np.int32))
+        output = subgraph.tensors[op.outputs[0]]
+        output.shape = np.asarray(shape, dtype=np.int32)
+        output.shapeSignature = None
+        return [self._op(self.s.BuiltinOperator.RESHAPE, [op.inputs[0], target], [op.outputs[0]],
+                         self.s.BuiltinOptions.ReshapeOptions, self.s.ReshapeOptionsT())]
+
+    def _drop_unused_opcodes(self):
+        used = sorted({op.opcodeIndex for sg in self.model.subgraphs for op in sg.operators})
+        remap = {old: new for new, old in enumerate(used)}
+        self.model.operatorCodes = [self.model.operatorCodes[i] for i in used]
+        for subgraph in self.model.subgraphs:
+            for op in subgraph.operators:
+                op.opcodeIndex = remap[op.opcodeIndex]
+
+    def run(self):
+        self._infer_list_shapes()
+        lowerings = {FLEX_RESERVE: self._lower_reserve, FLEX_SET_ITEM: self._lower_set_item,
+                     FLEX_STACK: self._lower_stack}
+        replaced = 0
+        for sg_index, subgraph in enumerate(self.model.subgraphs):
+            operators = []
+            for op in subgraph.operators:
+                name = self._custom_name(op)
+                if name is None:
+                    operators.append(op)
+                elif name in lowerings:
+                    operators.extend(lowerings[name](sg_index, subgraph, op))
+                    replaced += 1
+                else:
+                    raise ValueError(f"Unsupported custom op: {name.decode()}")
+            subgraph.operators = operators
+        # 입력 배치 크기 1 고정 (리스트 형상이 배치 1 기준)
+        main = self.model.subgraphs[0]
+        for tensor_index in main.inputs:
+            tensor = main.tensors[tensor_index]
+            tensor.shape = np.asarray([1, *tensor.shape[1:]], dtype=np.int32)
+            tensor.shapeSignature = None
+        self._drop_unused_opcodes()
+        return replaced
+
+def convert(source=SOURCE_MODEL_PATH, target=BUILTIN_MODEL_PATH):
+    """Flex 연산을 내장 연산으로 바꾼 모델 저장 → 교체한 연산 수"""
+    import flatbuffers
+    schema = _load_schema()
+    with open(source, 'rb') as f:
+        model = schema.ModelT.InitFromObj(schema.Model.GetRootAs(f.read(), 0))
+    replaced = FlexLowering(schema, model).run()
+    builder = flatbuffers.Builder(1024)
+    builder.Finish(model.Pack(builder), file_identifier=b'TFL3')
+    with open(target, 'wb') as f:
+        f.write(builder.Output())
+    return replaced
+
+def check(path=BUILTIN_MODEL_PATH, windows=32, seed=0):
+    """
+    변환 모델 확인: Flex 델리게이트 없는 인터프리터로 실행 +
+    같은 LSTM 가중치의 numpy 윈도우 추론과 확률 비교 (npz가 있을 때)
+    """
+    from walking_runtime import InferenceRuntime
+    runtime = InferenceRuntime(path).load()
+    rng = np.random.default_rng(seed)
+    inputs = rng.standard_normal((windows, 150, 6)).astype(np.float32)
+    probabilities = []
+    for window in inputs:
+        runtime.set_input(window[np.newaxis])
+        probabilities.append(float(runtime.invoke().flatten()[0]))
+    print(f"✅ {os.path.relpath(path, ROOT_DIR)} runs on {runtime.backend} "
+          f"(invoke mean {runtime.get_stats()['invoke_ms_mean']:.2f}ms)")
+
+    from Optimized_Walking_Raspberry import STREAMING_MODEL_PATH, StreamingFallModel
+    if not os.path.exists(STREAMING_MODEL_PATH):
+        print(f"⚠️ {STREAMING_MODEL_PATH} missing - numpy comparison skipped")
+        return True
+    port = StreamingFallModel.load(STREAMING_MODEL_PATH)
+    max_diff = max(abs(port.predict_window(window) - p) for window, p in zip(inputs, probabilities))
+    ok = max_diff < 1e-4
+    print(f"{'✅' if ok else '❌'} numpy port max |Δp| = {max_diff:.2e} over {windows} windows")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Lower TensorList Flex ops in the fall model to builtin ops")
+    parser.add_argument('--source', default=SOURCE_MODEL_PATH)
+    parser.add_argument('--output', default=BUILTIN_MODEL_PATH)
+    parser.add_argument('--check-only', action='store_true', help="변환 생략, 기존 결과만 확인")
+    args = parser.parse_args()
+
+    if not args.check_only:
+        replaced = convert(args.source, args.output)
+        print(f"💾 {os.path.relpath(args.output, ROOT_DIR)}: {replaced} Flex ops lowered "
+              f"({os.path.getsize(args.output) / 1024:.1f}KB)")
+    if not check(args.output):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
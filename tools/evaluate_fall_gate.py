@@ -0,0 +1,100 @@
+"""
+낙상 모델 실행 게이트(MotionGate) 재현율 평가
+- 기록된 IMU 데이터를 shadow 모드 낙상 감지기로 재생: 모델은 매 stride 실행,
+  게이트가 실행했을지 여부를 함께 기록
+- 리포트: 건너뛴 추론 비율, 단계별 발동 횟수, stride/이벤트 단위 재현율
+  (이벤트 = 연속된 양성 stride 묶음, 게이트가 그중 하나라도 실행했으면 감지)
+
+사용법:
+    python tools/evaluate_fall_gate.py
+    python tools/evaluate_fall_gate.py --rate 100 recordings/*.csv   # 100Hz 원시 기록
+    python tools/evaluate_fall_gate.py --heartbeat 5 --stages spike free_fall
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# 프로젝트 루트를 Python 경로에 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from Optimized_Walking_Raspberry import (
+    FALL_GATE_HEARTBEAT, FALL_GATE_STAGES, SEQ_LENGTH, STRIDE,
+    MotionGate, OptimizedFallDetector, SampleRingBuffer
+)
+from recordings import DATA_DIR, find_recordings, load_recording
+
+def replay(samples, timestamps, stages, heartbeat):
+    """한 기록을 shadow 모드로 재생 → (게이트 통계, stride별 양성 여부, stride별 게이트 실행 여부)"""
+    buffer = SampleRingBuffer(SEQ_LENGTH)
+    detector = OptimizedFallDetector(buffer, gate_mode='off')
+    detector.gate = MotionGate(stages=stages, mode='shadow', heartbeat=heartbeat)
+    positives, decisions = [], []
+    for sample, timestamp in zip(samples, timestamps):
+        buffer.append(sample, timestamp)
+        if detector.should_predict():
+            result = detector.predict()
+            if result is None:
+                continue
+            positives.append(result['prediction'] == 1)
+            decisions.append(detector.gate.last_decision)
+    return detector.gate.get_stats(), np.asarray(positives, bool), np.asarray(decisions, bool)
+
+def event_recall(positives, decisions):
+    """연속 양성 stride 묶음 단위 재현율 → (감지된 이벤트 수, 전체 이벤트 수)"""
+    events = caught = 0
+    in_event = hit = False
+    for positive, decision in zip(positives, decisions):
+        if positive:
+            if not in_event:
+                events += 1
+                in_event, hit = True, False
+            if decision and not hit:
+                caught += 1
+                hit = True
+        else:
+            in_event = False
+    return caught, events
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate fall-model gate recall on recorded data")
+    parser.add_argument('recordings', nargs='*', help="6축 CSV (기본: backend/data_backup/imu_*.csv)")
+    parser.add_argument('--rate', type=float, help="기록 시각 대신 사용할 샘플링 주기 (Hz)")
+    parser.add_argument('--raw', action='store_true', help="정규화 전 원시 기록")
+    parser.add_argument('--stages', nargs='+', default=list(FALL_GATE_STAGES), choices=MotionGate.STAGES)
+    parser.add_argument('--heartbeat', type=float, default=FALL_GATE_HEARTBEAT)
+    args = parser.parse_args()
+
+    paths = args.recordings or find_recordings(DATA_DIR)
+    totals = {'checks': 0, 'skipped': 0, 'heartbeats': 0}
+    fired = {stage: 0 for stage in args.stages}
+    stride_positives = stride_caught = events = caught = 0
+    for path in paths:
+        samples, timestamps = load_recording(path, raw=args.raw, rate=args.rate)
+        if len(samples) < SEQ_LENGTH:
+            continue
+        stats, positives, decisions = replay(samples, timestamps, args.stages, args.heartbeat)
+        for key in totals:
+            totals[key] += stats[key]
+        for stage, count in stats['fired'].items():
+            fired[stage] += count
+        stride_positives += int(positives.sum())
+        stride_caught += int((positives & decisions).sum())
+        file_caught, file_events = event_recall(positives, decisions)
+        caught += file_caught
+        events += file_events
+        print(f"📁 {os.path.basename(path)}: {len(positives)} strides, skipped {stats['skip_fraction']:.1%}, "
+              f"fall events {file_caught}/{file_events}")
+
+    skip_fraction = totals['skipped'] / totals['checks'] if totals['checks'] else 0.0
+    print(f"\n📊 Gate evaluation (stages: {', '.join(args.stages)}, heartbeat {args.heartbeat}s, stride {STRIDE})")
+    print(f"   Skipped inferences: {totals['skipped']}/{totals['checks']} ({skip_fraction:.1%}), "
+          f"heartbeats: {totals['heartbeats']}, fired: {fired}")
+    print(f"   Stride recall: {stride_caught}/{stride_positives}"
+          + (f" ({stride_caught / stride_positives:.1%})" if stride_positives else ""))
+    print(f"   Event recall:  {caught}/{events}" + (f" ({caught / events:.1%})" if events else ""))
+
+if __name__ == "__main__":
+    main()
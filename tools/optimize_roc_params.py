@@ -0,0 +1,324 @@
+"""
+보행 감지 ROC 임계값/가중치 최적화
+- OptimizedROCWalkingDetector의 ROC_THRESHOLDS / ROC_WEIGHTS를 거주자 기록으로 재학습
+- 특징 추출: 모든 150샘플 윈도우의 acc_mean, acc_std, step_freq, regularity를
+  NumPy 배치 연산 한 번으로 계산 (_roc_analysis와 같은 규칙: 5포인트 이동평균, ±5 국소 최대 피크)
+- 탐색: 임계값 격자 × (가중치, confidence_min) 격자의 F1을 브로드캐스팅으로 평가
+  · 윈도우는 4개 검사 통과 여부(16가지 패턴)로만 판정되므로 임계값 조합별 패턴 집계 후
+    가중치 규칙은 16개 패턴에 대한 판정표로 평가
+- 결과를 models/roc_params.json으로 저장 → 감지기가 시작 시 로드
+
+라벨: 기록 CSV의 라벨 열(기본 'label', walking/1/true = 보행)의 윈도우 마지막 샘플 값
+     (라벨 없는 기록은 --pseudo-labels로 현재 파라미터 판정을 라벨로 사용 - 동작 확인용)
+
+사용법:
+    python tools/optimize_roc_params.py labeled/*.csv --rate 100
+    python tools/optimize_roc_params.py --pseudo-labels --dry-run
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# 프로젝트 루트를 Python 경로에 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from Optimized_Walking_Raspberry import ROC_PARAMS_PATH, OptimizedROCWalkingDetector
+from recordings import DATA_DIR, find_recordings, load_labels, load_recording
+
+WINDOW = 150            # 감지기 buffer_size
+SMOOTH_WIDTH = 5        # 이동평균 폭
+PEAK_WINDOW = 5         # 피크 국소 최대 비교 반경
+CHUNK_WINDOWS = 4096    # 특징 추출 시 한 번에 처리할 윈도우 수 (메모리 상한)
+FEATURES = ('acc_mean', 'acc_std', 'step_freq', 'regularity')
+THRESHOLD_NAMES = ('acc_mean_min', 'acc_mean_max', 'acc_std_min',
+                   'step_freq_min', 'step_freq_max', 'regularity_min')
+WEIGHT_STEP = 0.05
+CONFIDENCE_GRID = np.round(np.arange(0.3, 0.951, 0.05), 2)
+
+def window_features(acc, times):
+    """(N, WINDOW) 가속도 크기/시각 윈도우 → (N, 4) 특징 (감지기 _roc_analysis와 같은 규칙)"""
+    n, length = acc.shape
+    half = SMOOTH_WIDTH // 2
+    acc_mean = acc.mean(axis=1)
+    acc_std = acc.std(axis=1)
+
+    # np.convolve(..., mode='same')과 같은 제로 패딩 이동평균
+    padded = np.pad(acc, ((0, 0), (half, half)))
+    smooth = sum(padded[:, k:k + length] for k in range(SMOOTH_WIDTH)) / SMOOTH_WIDTH
+    threshold = smooth.mean(axis=1) + 0.3 * smooth.std(axis=1)
+
+    w = PEAK_WINDOW
+    center = smooth[:, w:length - w]
+    local_max = sliding_window_view(smooth, 2 * w + 1, axis=1).max(axis=2)
+    is_peak = (center > threshold[:, None]) & (center == local_max)
+
+    # 피크마다 직전 피크와의 간격 (행별 가변 개수 → 마스크로 처리)
+    peak_times = times[:, w:length - w]
+    positions = np.where(is_peak, np.arange(center.shape[1]), -1)
+    previous = np.maximum.accumulate(positions, axis=1)
+    previous = np.concatenate([np.full((n, 1), -1), previous[:, :-1]], axis=1)
+    has_interval = is_peak & (previous >= 0)
+    intervals = np.where(
+        has_interval,
+        peak_times - np.take_along_axis(peak_times, np.maximum(previous, 0), axis=1),
+        0.0
+    )
+
+    count = has_interval.sum(axis=1)
+    valid = (count > 0) & ~np.any(has_interval & (intervals <= 0), axis=1)
+    mean_interval = intervals.sum(axis=1) / np.maximum(count, 1)
+    deviation = np.where(has_interval, intervals - mean_interval[:, None], 0.0)
+    interval_std = np.sqrt((deviation ** 2).sum(axis=1) / np.maximum(count, 1))
+
+    step_freq = np.zeros(n)
+    np.divide(1.0, mean_interval, out=step_freq, where=valid)
+    regularity = np.where(valid, 1.0 / (1.0 + interval_std), 0.0)
+    return np.stack([acc_mean, acc_std, step_freq, regularity], axis=1)
+
+def extract_features(samples, timestamps, step=1):
+    """기록 하나 → 감지기가 분석하는 모든 윈도우(step 간격)의 특징과 윈도우 끝 인덱스"""
+    xyz = samples[:, :3].astype(np.float64)
+    magnitude = np.sqrt(xyz[:, 0] ** 2 + xyz[:, 1] ** 2 + xyz[:, 2] ** 2)
+    if len(magnitude) < WINDOW:
+        return np.empty((0, len(FEATURES))), np.empty(0, dtype=np.intp)
+    acc_windows = sliding_window_view(magnitude, WINDOW)[::step]
+    time_windows = sliding_window_view(timestamps, WINDOW)[::step]
+    features = [window_features(acc_windows[i:i + CHUNK_WINDOWS], time_windows[i:i + CHUNK_WINDOWS])
+                for i in range(0, len(acc_windows), CHUNK_WINDOWS)]
+    ends = np.arange(len(acc_windows)) * step + WINDOW - 1
+    return np.concatenate(features), ends
+
+def default_params():
+    """감지기에 하드코딩된 KFall 기본값"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector = OptimizedROCWalkingDetector(roc_params_path=None)
+    return dict(detector.ROC_THRESHOLDS), dict(detector.ROC_WEIGHTS)
+
+def test_results(features, thresholds):
+    """(N, 4) 특징 → (N, 4) 검사 통과 여부 (_calculate_roc_confidence와 같은 순서/경계)"""
+    acc_mean, acc_std, step_freq, regularity = features.T
+    return np.stack([
+        (thresholds['acc_mean_min'] <= acc_mean) & (acc_mean <= thresholds['acc_mean_max']),
+        acc_std >= thresholds['acc_std_min'],
+        (thresholds['step_freq_min'] <= step_freq) & (step_freq <= thresholds['step_freq_max']),
+        regularity >= thresholds['regularity_min'],
+    ], axis=1)
+
+def confidences(passed, weights):
+    """
+    검사 통과 여부 (..., 4) × 가중치 (4,) 또는 (W, 4) → 신뢰도 (...) 또는 (..., W)
+    감지기와 같은 순서로 더해 부동소수점 결과 일치 (confidence_min 경계 판정 보존)
+    """
+    weights = np.asarray(weights)
+    if weights.ndim > 1:
+        passed = passed[..., None, :]
+    confidence = 0.0
+    for k in range(len(FEATURES)):
+        confidence = confidence + passed[..., k] * weights[..., k]
+    return confidence
+
+def f1_score(tp, fp, fn):
+    denominator = 2 * tp + fp + fn
+    return np.divide(2 * tp, denominator, out=np.zeros(np.shape(denominator)), where=denominator > 0)
+
+def candidate_values(values, levels, defaults):
+    """분위수 + 기본값으로 임계값 후보 생성"""
+    values = values[np.isfinite(values)]
+    quantiles = np.quantile(values, np.linspace(0, 1, levels)) if len(values) else np.empty(0)
+    return np.unique(np.concatenate([quantiles, defaults]))
+
+def range_grid(candidates):
+    """lo <= hi인 (lo, hi) 쌍"""
+    lo, hi = np.meshgrid(candidates, candidates, indexing='ij')
+    keep = lo <= hi
+    return np.stack([lo[keep], hi[keep]], axis=1)
+
+def pass_codes(feature, grid):
+    """
+    특징 하나 × 임계값 후보 G개 → (윈도우별 통과 패턴 코드, 코드별 통과 여부 (U, G))
+    grid가 (G, 2)면 lo <= x <= hi, (G,)면 x >= t 검사
+    """
+    if grid.ndim == 2:
+        passed = (grid[:, 0, None] <= feature) & (feature <= grid[:, 1, None])
+    else:
+        passed = feature >= grid[:, None]
+    patterns, codes = np.unique(passed.T, axis=0, return_inverse=True)
+    return codes.ravel(), patterns
+
+def weight_grid(step=WEIGHT_STEP):
+    """합계 1.0인 4개 가중치 조합 (step 간격)"""
+    units = int(round(1 / step))
+    k = np.stack(np.meshgrid(*[np.arange(units + 1)] * len(FEATURES), indexing='ij'), axis=-1)
+    k = k.reshape(-1, len(FEATURES))
+    return np.round(k[k.sum(axis=1) == units] * step, 4)
+
+def optimize(features, labels, defaults, levels=8):
+    """임계값 격자 × 가중치 격자 F1 전수 탐색 → (최적 파라미터, F1, 탐색 정보)"""
+    thresholds, weights = defaults
+    acc_mean, acc_std, step_freq, regularity = features.T
+    grids = [
+        range_grid(candidate_values(acc_mean, levels, [thresholds['acc_mean_min'], thresholds['acc_mean_max']])),
+        candidate_values(acc_std, levels, [thresholds['acc_std_min']]),
+        # 피크가 부족한 윈도우(step_freq = regularity = 0)는 후보 계산에서 제외
+        range_grid(candidate_values(step_freq[step_freq > 0], levels,
+                                    [thresholds['step_freq_min'], thresholds['step_freq_max']])),
+        candidate_values(regularity[regularity > 0], levels, [thresholds['regularity_min']]),
+    ]
+
+    # 1. 특징별 통과 패턴 코드 → 4차원 코드 조합별 보행/비보행 윈도우 수
+    coded = [pass_codes(feature, grid) for feature, grid in zip(features.T, grids)]
+    shape = tuple(patterns.shape[0] for _, patterns in coded)
+    flat = np.ravel_multi_index([codes for codes, _ in coded], shape)
+    histogram = np.stack([
+        np.bincount(flat[~labels], minlength=np.prod(shape)),
+        np.bincount(flat[labels], minlength=np.prod(shape)),
+    ], axis=-1).reshape(shape + (2,)).astype(np.float64)
+
+    # 2. 임계값 조합별 16개 통과 패턴(비트: acc_mean, acc_std, step_freq, regularity) 집계
+    bits = [np.stack([~patterns, patterns]).astype(np.float64) for _, patterns in coded]  # (2, U, G)
+    counts = np.einsum('xia,yjb,zkc,wld,ijkln->xyzwabcdn', *bits, histogram, optimize=True)
+    grid_shape = counts.shape[4:8]
+    counts = counts.reshape(16, -1, 2)  # (패턴, 임계값 조합, [비보행, 보행])
+
+    # 3. 가중치 × confidence_min → 16개 패턴 판정표 (중복 제거)
+    weight_options = weight_grid()
+    pattern_bits = ((np.arange(16)[:, None] >> np.arange(3, -1, -1)) & 1).astype(bool)
+    pattern_confidence = confidences(pattern_bits, weight_options).T         # (W, 16)
+    rules = pattern_confidence[:, None, :] >= CONFIDENCE_GRID[None, :, None]  # (W, C, 16)
+    rules = rules.reshape(-1, 16)
+    decisions, rule_index = np.unique(rules, axis=0, return_inverse=True)
+
+    # 4. 판정표 × 임계값 조합 F1 (행렬곱)
+    positives = labels.sum()
+    tp = decisions.astype(np.float64) @ counts[:, :, 1]
+    fp = decisions.astype(np.float64) @ counts[:, :, 0]
+    scores = f1_score(tp, fp, positives - tp)
+    best_score = scores.max()
+
+    # 판정표별로 기존 가중치에 가장 가까운 (가중치, confidence_min)
+    option, level = np.unravel_index(np.arange(rule_index.size), (len(weight_options), len(CONFIDENCE_GRID)))
+    current_weights = np.array([weights[name] for name in FEATURES])
+    rule_distance = (np.abs(weight_options[option] - current_weights).sum(axis=1)
+                     + np.abs(CONFIDENCE_GRID[level] - thresholds['confidence_min']))
+    decision_distance = np.full(len(decisions), np.inf)
+    np.minimum.at(decision_distance, rule_index.ravel(), rule_distance)
+
+    # 동점 조합 중 기존 파라미터에 가장 가까운 것 선택 (임계값은 특징 표준편차로 정규화)
+    tied_decisions, tied_combos = np.nonzero(scores >= best_score - 1e-12)
+    index = np.unravel_index(tied_combos, grid_shape)
+    values = np.column_stack([grid[i].reshape(len(i), -1) for grid, i in zip(grids, index)])
+    scale = features[:, [0, 0, 1, 2, 2, 3]].std(axis=0) + 1e-9
+    current = np.array([thresholds[name] for name in THRESHOLD_NAMES])
+    distance = (np.abs(values - current) / scale).sum(axis=1) + decision_distance[tied_decisions]
+    pick = np.argmin(distance)
+    best_decision = tied_decisions[pick]
+    rules_for_decision = np.flatnonzero(rule_index.ravel() == best_decision)
+    best_rule = rules_for_decision[np.argmin(rule_distance[rules_for_decision])]
+    option, level = option[best_rule], level[best_rule]
+
+    fitted = {name: float(value) for name, value in zip(THRESHOLD_NAMES, values[pick])}
+    fitted['confidence_min'] = float(CONFIDENCE_GRID[level])
+    fitted_weights = {name: float(w) for name, w in zip(FEATURES, weight_options[option])}
+    search = {
+        'threshold_combos': int(np.prod(grid_shape)),
+        'decision_rules': int(len(decisions)),
+        'weight_options': int(len(weight_options) * len(CONFIDENCE_GRID)),
+    }
+    return (fitted, fitted_weights), float(best_score), search
+
+def evaluate(features, labels, params):
+    """파라미터 세트의 윈도우 단위 F1 / 정밀도 / 재현율"""
+    thresholds, weights = params
+    passed = test_results(features, thresholds)
+    predicted = confidences(passed, np.array([weights[name] for name in FEATURES])) >= thresholds['confidence_min']
+    tp = float(np.sum(predicted & labels))
+    fp = float(np.sum(predicted & ~labels))
+    fn = float(np.sum(~predicted & labels))
+    return {
+        'f1': float(f1_score(tp, fp, fn)),
+        'precision': tp / (tp + fp) if tp + fp else 0.0,
+        'recall': tp / (tp + fn) if tp + fn else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit ROC walking thresholds and weights to labeled recordings")
+    parser.add_argument('recordings', nargs='*', help="6축 CSV (기본: backend/data_backup/imu_*.csv)")
+    parser.add_argument('--rate', type=float, help="기록 시각 대신 사용할 샘플링 주기 (Hz)")
+    parser.add_argument('--raw', action='store_true', help="정규화 전 원시 기록")
+    parser.add_argument('--label-column', default='label', help="보행 라벨 열 이름")
+    parser.add_argument('--pseudo-labels', action='store_true',
+                        help="라벨 대신 현재 파라미터 판정 사용 (동작 확인용)")
+    parser.add_argument('--step', type=int, default=1, help="윈도우 간격 (샘플, 감지기는 1)")
+    parser.add_argument('--levels', type=int, default=8, help="특징별 분위수 후보 수")
+    parser.add_argument('--output', default=os.path.join(ROOT_DIR, ROC_PARAMS_PATH))
+    parser.add_argument('--dry-run', action='store_true', help="저장하지 않고 결과만 출력")
+    args = parser.parse_args()
+
+    defaults = default_params()
+    paths = args.recordings or find_recordings(DATA_DIR)
+    start = time.perf_counter()
+    all_features, all_labels = [], []
+    for path in paths:
+        samples, timestamps = load_recording(path, raw=args.raw, rate=args.rate)
+        features, ends = extract_features(samples, timestamps, args.step)
+        if args.pseudo_labels:
+            labels = confidences(test_results(features, defaults[0]),
+                                 np.array([defaults[1][name] for name in FEATURES])) >= defaults[0]['confidence_min']
+        else:
+            labels = load_labels(path, args.label_column)
+            if labels is None:
+                sys.exit(f"❌ {os.path.basename(path)}: no '{args.label_column}' column "
+                         f"(use --label-column or --pseudo-labels)")
+            labels = labels[ends]
+        all_features.append(features)
+        all_labels.append(labels)
+    features = np.concatenate(all_features)
+    labels = np.concatenate(all_labels)
+    extract_s = time.perf_counter() - start
+    if not len(features):
+        sys.exit(f"❌ No {WINDOW}-sample windows in {len(paths)} recordings")
+    print(f"📥 {len(features):,} windows ({labels.sum():,} walking) from {len(paths)} recordings, "
+          f"features in {extract_s:.2f}s")
+
+    start = time.perf_counter()
+    fitted, score, search = optimize(features, labels, defaults, args.levels)
+    search_s = time.perf_counter() - start
+    print(f"🔍 {search['threshold_combos']:,} threshold combos × {search['weight_options']:,} weight rules "
+          f"({search['decision_rules']} distinct) in {search_s:.2f}s")
+
+    baseline = evaluate(features, labels, defaults)
+    result = evaluate(features, labels, fitted)
+    print(f"\n📊 Window F1: {baseline['f1']:.3f} (current) → {result['f1']:.3f} (fitted), "
+          f"precision {result['precision']:.3f}, recall {result['recall']:.3f}")
+    print(f"{'parameter':<16} {'current':>9} {'fitted':>9}")
+    for current, new in ((defaults[0], fitted[0]), (defaults[1], fitted[1])):
+        for name, value in new.items():
+            print(f"{name:<16} {current[name]:>9.3f} {value:>9.3f}")
+
+    if args.dry_run:
+        return
+    params = {
+        'thresholds': fitted[0],
+        'weights': fitted[1],
+        'f1': result['f1'],
+        'baseline_f1': baseline['f1'],
+        'windows': int(len(features)),
+        'walking_windows': int(labels.sum()),
+        'labels': 'pseudo' if args.pseudo_labels else args.label_column,
+        'recordings': [os.path.basename(path) for path in paths],
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(params, f, indent=2)
+    print(f"💾 Parameters saved: {os.path.relpath(args.output, ROOT_DIR)}")
+
+if __name__ == "__main__":
+    main()
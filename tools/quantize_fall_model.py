@@ -0,0 +1,193 @@
+"""
+낙상 감지 모델 사후 양자화(PTQ) 파이프라인
+- Keras 원본(models/results/fall_detection_model.keras, .h5)에서 int8 / float16 TFLite 변형 생성
+- 보정 데이터: backend/data_backup IMU CSV에서 만든 150×6 윈도우
+- 기준 float 모델(models/fall_detection_builtin.tflite, Flex 연산 제거)과 나란히 invoke 지연, 모델 크기, 메모리,
+  FALL_DETECTION_THRESHOLD 기준 판정 일치율 비교 리포트 출력
+
+사용법:
+    python tools/quantize_fall_model.py
+    python tools/quantize_fall_model.py --raw          # CSV가 정규화 전 원시값일 때 scalers/ 적용
+    python tools/quantize_fall_model.py --skip-convert # 이미 생성된 변형만 다시 평가
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+# 프로젝트 루트를 Python 경로에 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from Optimized_Walking_Raspberry import (
+    FALL_DETECTION_THRESHOLD, SEQ_LENGTH, InferenceRuntime, _current_rss_mb
+)
+from recordings import DATA_DIR, find_recordings, load_recording
+
+KERAS_MODEL_PATHS = [
+    os.path.join(ROOT_DIR, 'models', 'results', 'fall_detection_model.keras'),
+    os.path.join(ROOT_DIR, 'models', 'results', 'fall_detection_model.h5'),
+]
+FLOAT_MODEL_PATH = os.path.join(ROOT_DIR, 'models', 'fall_detection_builtin.tflite')
+VARIANT_PATHS = {
+    'float16': os.path.join(ROOT_DIR, 'models', 'fall_detection_fp16.tflite'),
+    'int8': os.path.join(ROOT_DIR, 'models', 'fall_detection_int8.tflite'),
+}
+REPORT_PATH = os.path.join(ROOT_DIR, 'models', 'results', 'quantization_report.json')
+
+def load_windows(data_dir=DATA_DIR, stride=10, raw=False):
+    """
+    IMU CSV → (N, 150, 6) float32 윈도우 (파일 경계를 넘지 않음)
+    data_backup은 라즈베리파이가 정규화 후 전송한 값이므로 기본은 그대로 사용,
+    raw=True면 scalers/의 융합 스케일러로 정규화
+    """
+    windows = []
+    for path in find_recordings(data_dir):
+        samples, _ = load_recording(path, raw=raw)
+        for start in range(0, len(samples) - SEQ_LENGTH + 1, stride):
+            windows.append(samples[start:start + SEQ_LENGTH])
+    if not windows:
+        raise RuntimeError(f"No {SEQ_LENGTH}-sample windows found in {data_dir}")
+    return np.asarray(windows, dtype=np.float32)
+
+def split_windows(windows):
+    """보정/평가 분리 (짝수 → 보정, 홀수 → 평가) - 재현 가능하도록 무작위성 없음"""
+    return windows[0::2], windows[1::2]
+
+def load_keras_model():
+    import tensorflow as tf
+    for path in KERAS_MODEL_PATHS:
+        if os.path.exists(path):
+            try:
+                return tf.keras.models.load_model(path, compile=False), path
+            except Exception as e:
+                print(f"⚠️ Keras model load failed ({os.path.basename(path)}): {e}")
+    raise FileNotFoundError("No loadable Keras fall detection model in models/results")
+
+def convert_variants(calibration):
+    """float16 / int8 변형 생성. int8은 완전 정수 변환 실패 시 float 폴백 연산 허용"""
+    import tensorflow as tf
+    model, source = load_keras_model()
+    print(f"📦 Keras source: {os.path.relpath(source, ROOT_DIR)}")
+
+    def representative_dataset():
+        for window in calibration:
+            yield [window[np.newaxis]]
+
+    # float16: 가중치만 반 정밀도
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    _write(VARIANT_PATHS['float16'], converter.convert())
+
+    # int8: 보정 데이터로 활성값 범위 추정 (입출력은 float32 유지 → 감지기 코드 변경 불필요)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    try:
+        tflite_model = converter.convert()
+    except Exception as e:
+        print(f"⚠️ Full-integer conversion failed, allowing float fallback ops: {e}")
+        converter.target_spec.supported_ops = [
+            tf.lite.OpsSet.TFLITE_BUILTINS_INT8, tf.lite.OpsSet.TFLITE_BUILTINS
+        ]
+        tflite_model = converter.convert()
+    _write(VARIANT_PATHS['int8'], tflite_model)
+
+def _write(path, tflite_model):
+    with open(path, 'wb') as f:
+        f.write(tflite_model)
+    print(f"💾 {os.path.relpath(path, ROOT_DIR)} ({len(tflite_model) / 1024:.1f} KB)")
+
+def _benchmark_worker(model_path, windows, warmup):
+    """별도 프로세스에서 실행 (모델별 RSS 측정이 서로 섞이지 않도록)"""
+    rss_before = _current_rss_mb()
+    runtime = InferenceRuntime(model_path).load()
+    for window in windows[:warmup]:
+        runtime.set_input(window[np.newaxis])
+        runtime.invoke()
+    runtime.invoke_times.clear()
+
+    probabilities = np.empty(len(windows))
+    for i, window in enumerate(windows):
+        runtime.set_input(window[np.newaxis])
+        probabilities[i] = float(runtime.invoke().flatten()[0])
+    stats = runtime.get_stats()
+    stats['rss_total_delta_mb'] = _current_rss_mb() - rss_before
+    return stats, probabilities
+
+def benchmark(model_path, windows, warmup=10):
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(1) as pool:
+        return pool.apply(_benchmark_worker, (model_path, windows, warmup))
+
+def build_report(evaluation):
+    """기준 float 모델 대비 변형별 지연/크기/메모리/판정 일치율"""
+    models = {'float32': FLOAT_MODEL_PATH, **VARIANT_PATHS}
+    results = {}
+    reference = None
+    for name, path in models.items():
+        if not os.path.exists(path):
+            print(f"⚠️ {name}: {os.path.relpath(path, ROOT_DIR)} not found, skipped")
+            continue
+        stats, probabilities = benchmark(path, evaluation)
+        predictions = probabilities >= FALL_DETECTION_THRESHOLD
+        if reference is None:
+            reference = (probabilities, predictions)
+        results[name] = {
+            'path': os.path.relpath(path, ROOT_DIR),
+            'size_kb': os.path.getsize(path) / 1024,
+            'backend': stats['backend'],
+            'startup_ms': stats['startup_ms'],
+            'rss_delta_mb': stats['rss_total_delta_mb'],
+            'invoke_ms_mean': stats.get('invoke_ms_mean'),
+            'invoke_ms_p99': stats.get('invoke_ms_p99'),
+            'fall_rate': float(np.mean(predictions)),
+            'agreement': float(np.mean(predictions == reference[1])),
+            'max_abs_prob_diff': float(np.max(np.abs(probabilities - reference[0]))),
+        }
+    return {
+        'threshold': FALL_DETECTION_THRESHOLD,
+        'evaluation_windows': int(len(evaluation)),
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'models': results,
+    }
+
+def print_report(report):
+    print(f"\n📊 Quantization report ({report['evaluation_windows']} windows, "
+          f"threshold {report['threshold']})")
+    print(f"{'model':<9} {'size KB':>8} {'invoke ms':>10} {'p99 ms':>8} {'RSS MB':>7} "
+          f"{'agree':>7} {'max Δp':>8}")
+    for name, r in report['models'].items():
+        print(f"{name:<9} {r['size_kb']:>8.1f} {r['invoke_ms_mean']:>10.3f} {r['invoke_ms_p99']:>8.3f} "
+              f"{r['rss_delta_mb']:>7.1f} {r['agreement']:>7.2%} {r['max_abs_prob_diff']:>8.4f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Fall model int8/float16 quantization pipeline")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--stride', type=int, default=10, help="윈도우 간격 (샘플)")
+    parser.add_argument('--raw', action='store_true', help="CSV가 정규화 전 값이면 scalers/로 정규화")
+    parser.add_argument('--skip-convert', action='store_true', help="변환 생략, 기존 변형만 평가")
+    parser.add_argument('--report', default=REPORT_PATH)
+    args = parser.parse_args()
+
+    windows = load_windows(args.data_dir, args.stride, args.raw)
+    calibration, evaluation = split_windows(windows)
+    print(f"📥 {len(windows)} windows → calibration {len(calibration)}, evaluation {len(evaluation)}")
+
+    if not args.skip_convert:
+        convert_variants(calibration)
+
+    report = build_report(evaluation)
+    print_report(report)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report saved: {os.path.relpath(args.report, ROOT_DIR)}")
+
+if __name__ == "__main__":
+    main()
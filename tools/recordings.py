@@ -0,0 +1,58 @@
+"""
+6축 IMU 기록 로더 (도구 공용)
+- backend/data_backup/imu_*.csv 또는 같은 열(acc_x..gyr_z)을 가진 임의의 CSV
+- timestamp 열(ISO 8601)이 있으면 epoch 초로 변환, 없으면 SAMPLING_RATE 간격으로 생성
+- data_backup은 라즈베리파이가 정규화 후 전송한 값 → 원시 기록만 raw=True로 정규화
+"""
+import glob
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+# 프로젝트 루트를 Python 경로에 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from Optimized_Walking_Raspberry import SAMPLING_RATE, FusedScaler
+
+DATA_DIR = os.path.join(ROOT_DIR, 'backend', 'data_backup')
+IMU_COLUMNS = ['acc_x', 'acc_y', 'acc_z', 'gyr_x', 'gyr_y', 'gyr_z']
+
+def find_recordings(data_dir=DATA_DIR):
+    return sorted(glob.glob(os.path.join(data_dir, 'imu_*.csv')))
+
+def load_recording(path, raw=False, rate=None):
+    """CSV → (samples (n, 6) float32, timestamps (n,) float64)
+    rate를 지정하면 기록된 시각 대신 해당 주기의 타임스탬프 생성 (업로드용으로 솎아낸 기록 재생 시)"""
+    with open(path) as f:
+        header = f.readline().strip().split(',')
+    columns = [header.index(name) for name in IMU_COLUMNS]
+    samples = np.genfromtxt(path, delimiter=',', skip_header=1, usecols=columns)
+    valid = ~np.isnan(samples).any(axis=1)
+    samples = samples[valid]
+    if raw:
+        scaler = FusedScaler.load(os.path.join(ROOT_DIR, 'scalers'))
+        if scaler is not None:
+            samples = scaler.transform_batch(samples)
+
+    if rate is None and 'timestamp' in header:
+        stamps = np.genfromtxt(path, delimiter=',', skip_header=1,
+                               usecols=[header.index('timestamp')], dtype=str, ndmin=1)[valid]
+        timestamps = np.array([datetime.fromisoformat(s).timestamp() for s in stamps])
+    else:
+        timestamps = np.arange(len(samples)) / (rate or SAMPLING_RATE)
+    return samples.astype(np.float32), timestamps
+
+def load_labels(path, column='label'):
+    """CSV 라벨 열 → 샘플별 bool 배열 (walking/1/true = True, load_recording과 같은 유효 행), 열이 없으면 None"""
+    with open(path) as f:
+        header = f.readline().strip().split(',')
+    if column not in header:
+        return None
+    columns = [header.index(name) for name in IMU_COLUMNS]
+    valid = ~np.isnan(np.genfromtxt(path, delimiter=',', skip_header=1, usecols=columns)).any(axis=1)
+    values = np.genfromtxt(path, delimiter=',', skip_header=1, usecols=[header.index(column)],
+                           dtype=str, ndmin=1)[valid]
+    return np.isin(np.char.lower(np.char.strip(values)), ('walking', '1', '1.0', 'true'))
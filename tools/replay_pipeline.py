@@ -0,0 +1,218 @@
+"""
+엣지 감지 파이프라인 오프라인 재생/벤치마크 하네스
+- 6축 IMU 기록(backend/data_backup/imu_*.csv 등)을 실제 main 루프와 같은 순서로
+  보행 감지 → 낙상 추론 → 상태 관리에 최대 속도로 통과시킴
+- time.time() 대신 샘플 타임스탬프를 돌려주는 재생 시계 주입 (실행 속도와 무관한 결과)
+- 리포트: 처리량(samples/s), 단계별 지연 백분위수, 최대 메모리, 상태 전환 기록
+- 비트 단위 비교: --dump로 stride별 출력(float.hex) 저장, --diff로 다른 코드 버전의 덤프와 비교
+- --metrics: main과 같은 단계를 RuntimeMetrics 히스토그램에 기록하고 계측 비용 비율 보고
+
+사용법:
+    python tools/replay_pipeline.py
+    python tools/replay_pipeline.py --rate 100 recording.csv --fall-mode windowed --gate off
+    python tools/replay_pipeline.py --dump before.jsonl      # 변경 전
+    python tools/replay_pipeline.py --diff before.jsonl      # 변경 후 비교
+    python tools/replay_pipeline.py --repeat 5 --metrics     # 런타임 계측 비용 측정
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# 프로젝트 루트를 Python 경로에 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from Optimized_Walking_Raspberry import (
+    FALL_GATE_MODE, FALL_INFERENCE_MODE, SAMPLE_BUFFER_HEADROOM, SEQ_LENGTH, STRIDE,
+    OptimizedFallDetector, OptimizedROCWalkingDetector, OptimizedStateManager,
+    RuntimeMetrics, SampleRingBuffer, _current_rss_mb
+)
+from recordings import DATA_DIR, find_recordings, load_recording
+
+STAGES = ('buffer', 'walking', 'fall', 'state')
+
+class ReplayClock:
+    """time.time() 대체: 현재 재생 중인 샘플의 타임스탬프 반환"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+class ReplayPipeline:
+    """main()의 단일 스레드 등가 파이프라인 (수집 스레드 대신 기록된 샘플을 순서대로 공급)
+    기록마다 감지기/상태를 새로 만들고, 지연/상태 전환/출력은 누적"""
+
+    def __init__(self, fall_mode=FALL_INFERENCE_MODE, gate_mode=FALL_GATE_MODE, metrics=None):
+        self.fall_mode = fall_mode
+        self.gate_mode = gate_mode
+        self.metrics = metrics
+        self.clock = ReplayClock()
+        self.latencies = {stage: [] for stage in STAGES}
+        self.transitions = []
+        self.outputs = []
+        self.gate_stats = []
+
+    def _build(self, start_time):
+        self.clock.now = start_time
+        self.sample_buffer = SampleRingBuffer(SEQ_LENGTH + SAMPLE_BUFFER_HEADROOM)
+        self.walking_detector = OptimizedROCWalkingDetector(self.sample_buffer, clock=self.clock)
+        self.fall_detector = OptimizedFallDetector(self.sample_buffer, gate_mode=self.gate_mode,
+                                                   clock=self.clock, inference_mode=self.fall_mode)
+        self.state_manager = OptimizedStateManager(clock=self.clock)
+
+    def run(self, samples, timestamps, source):
+        self._build(float(timestamps[0]))
+        perf = time.perf_counter
+        buffer = self.sample_buffer
+        latencies = [self.latencies[stage] for stage in STAGES]
+        record = self.metrics.record if self.metrics is not None else None
+        for index, (sample, timestamp) in enumerate(zip(samples, timestamps)):
+            self.clock.now = float(timestamp)
+            t0 = perf()
+            buffer.append(sample, timestamp)
+            t1 = perf()
+            is_walking, confidence = self.walking_detector.update()
+            t2 = perf()
+            fall_result = None
+            if self.fall_detector.should_predict():
+                fall_result = self.fall_detector.predict()
+            t3 = perf()
+            fall_detected = bool(fall_result and fall_result['prediction'] == 1)
+            previous = self.state_manager.current_state
+            changed = self.state_manager.update_state(is_walking, fall_detected)
+            t4 = perf()
+            for stage, start, stop in zip(latencies, (t0, t1, t2, t3), (t1, t2, t3, t4)):
+                stage.append(stop - start)
+            if record is not None:
+                # main 루프/추론 스레드와 같은 단계 기록 (계측 비용 측정용)
+                record('roc_analysis', t2 - t1)
+                if fall_result is not None:
+                    record('fall_inference', t3 - t2)
+                record('loop', t4 - t0)
+
+            if changed:
+                self.transitions.append({
+                    'source': source, 'index': index, 'timestamp': float(timestamp),
+                    'from': previous.value, 'to': self.state_manager.current_state.value,
+                    'fall_probability': fall_result['probability'] if fall_result else None,
+                })
+            if buffer.count % STRIDE == 0:
+                self.outputs.append({
+                    'source': source, 'index': index,
+                    'walking': bool(is_walking), 'confidence': float(confidence).hex(),
+                    'fall_probability': float(fall_result['probability']).hex() if fall_result else None,
+                    'state': self.state_manager.current_state.value,
+                })
+        if self.fall_detector.gate:
+            self.gate_stats.append(self.fall_detector.gate.get_stats())
+
+    def latency_report(self):
+        report = {}
+        for stage, values in self.latencies.items():
+            us = np.asarray(values) * 1e6
+            report[stage] = {
+                'p50_us': float(np.percentile(us, 50)),
+                'p95_us': float(np.percentile(us, 95)),
+                'p99_us': float(np.percentile(us, 99)),
+                'max_us': float(us.max()),
+            }
+        return report
+
+def diff_outputs(reference, outputs):
+    """stride별 출력 비교 → (불일치 수, 첫 불일치 (기준, 현재))"""
+    mismatches = 0
+    first = None
+    for expected, actual in zip(reference, outputs):
+        if expected != actual:
+            mismatches += 1
+            if first is None:
+                first = (expected, actual)
+    mismatches += abs(len(reference) - len(outputs))
+    return mismatches, first
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay IMU recordings through the edge pipeline")
+    parser.add_argument('recordings', nargs='*', help="6축 CSV (기본: backend/data_backup/imu_*.csv)")
+    parser.add_argument('--rate', type=float, help="기록 시각 대신 사용할 샘플링 주기 (Hz)")
+    parser.add_argument('--raw', action='store_true', help="정규화 전 원시 기록")
+    parser.add_argument('--fall-mode', choices=('windowed', 'streaming'), default=FALL_INFERENCE_MODE)
+    parser.add_argument('--gate', choices=('gate', 'shadow', 'off'), default=FALL_GATE_MODE)
+    parser.add_argument('--repeat', type=int, default=1, help="벤치마크용 반복 재생 횟수")
+    parser.add_argument('--trace-memory', action='store_true', help="tracemalloc으로 Python 힙 최대치 측정 (느려짐)")
+    parser.add_argument('--dump', help="stride별 출력 JSONL 저장 경로")
+    parser.add_argument('--diff', help="이전 덤프와 비트 단위 비교")
+    parser.add_argument('--verbose', action='store_true', help="감지기 로그 출력")
+    parser.add_argument('--metrics', action='store_true', help="RuntimeMetrics 기록 및 계측 비용 보고")
+    args = parser.parse_args()
+
+    recordings = []
+    for path in args.recordings or find_recordings(DATA_DIR):
+        samples, timestamps = load_recording(path, raw=args.raw, rate=args.rate)
+        recordings.append((os.path.basename(path), samples, timestamps))
+    n_samples = sum(len(samples) for _, samples, _ in recordings) * args.repeat
+
+    log = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    if args.trace_memory:
+        tracemalloc.start()
+    rss_before = _current_rss_mb()
+    with log:
+        pipeline = ReplayPipeline(args.fall_mode, args.gate, RuntimeMetrics() if args.metrics else None)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for source, samples, timestamps in recordings:
+                pipeline.run(samples, timestamps, source)
+        elapsed = time.perf_counter() - start
+    rss_after = _current_rss_mb()
+    heap_peak_mb = tracemalloc.get_traced_memory()[1] / 2**20 if args.trace_memory else None
+
+    print(f"▶️ Replayed {len(recordings)} recordings × {args.repeat}: {n_samples} samples in {elapsed:.2f}s "
+          f"({n_samples / elapsed:,.0f} samples/s, {n_samples / elapsed / 100:.0f}× real time @100Hz)")
+    print(f"   Fall inference: {args.fall_mode}, gate: {args.gate}")
+    print("\n⏱️ Per-sample stage latency (µs)")
+    print(f"{'stage':<8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>9}")
+    for stage, r in pipeline.latency_report().items():
+        print(f"{stage:<8} {r['p50_us']:>8.1f} {r['p95_us']:>8.1f} {r['p99_us']:>8.1f} {r['max_us']:>9.1f}")
+    if pipeline.metrics is not None:
+        overhead = pipeline.metrics.overhead()
+        stages = pipeline.metrics.stage_stats()
+        print(f"\n⏲️ RuntimeMetrics: {overhead['records']} records × {overhead['record_cost_us']:.2f}µs "
+              f"= {overhead['overhead_pct']:.3f}% of instrumented work | p99 (ms, bucket bound): "
+              + ", ".join(f"{stage} {stats['p99_ms']:.3f}" for stage, stats in stages.items()))
+    print(f"\n💾 Memory: RSS {rss_after:.1f}MB (+{rss_after - rss_before:.1f}MB during replay)"
+          + (f", Python heap peak {heap_peak_mb:.1f}MB" if heap_peak_mb is not None else ""))
+    if pipeline.gate_stats:
+        checks = sum(g['checks'] for g in pipeline.gate_stats)
+        skipped = sum(g['skipped'] for g in pipeline.gate_stats)
+        print(f"🚪 Gate: skipped {skipped / checks if checks else 0:.1%} of {checks} strides")
+
+    print(f"\n🔀 State transitions ({len(pipeline.transitions)})")
+    for t in pipeline.transitions:
+        probability = f" (fall p={t['fall_probability']:.3f})" if t['fall_probability'] is not None else ""
+        print(f"   {t['source']} #{t['index']} t={t['timestamp']:.2f}: {t['from']} → {t['to']}{probability}")
+
+    if args.dump:
+        with open(args.dump, 'w') as f:
+            for row in pipeline.outputs:
+                f.write(json.dumps(row) + '\n')
+        print(f"\n💾 {len(pipeline.outputs)} stride outputs saved: {args.dump}")
+    if args.diff:
+        with open(args.diff) as f:
+            reference = [json.loads(line) for line in f]
+        mismatches, first = diff_outputs(reference, pipeline.outputs)
+        if mismatches:
+            print(f"\n❌ {mismatches} of {len(reference)} stride outputs differ from {args.diff}")
+            print(f"   first: expected {first[0]}\n          actual   {first[1]}" if first else "")
+            sys.exit(1)
+        print(f"\n✅ Bit-exact match with {args.diff} ({len(reference)} stride outputs)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+상태 유지형(streaming) 낙상 모델 내보내기 + 검증
+- Keras 가중치(models/results/fall_detection_model.h5)를 numpy 스트리밍 모델용 npz로 변환
+- backend/data_backup IMU 기록을 100Hz 스트림처럼 재생하며
+  stride마다 기존 윈도우 추론(TFLite)과 스트리밍 출력 비교
+- 기준 TFLite를 실행할 수 없는 환경에서는 커밋된 골든 출력(models/fall_detection_golden.npz)과 비교,
+  기준도 골든도 없거나 numpy 포팅이 기준과 다르면 종료 코드 1
+- 리포트: 판정 일치율(FALL_DETECTION_THRESHOLD), 최대/평균 확률 차이, 샘플당 처리 비용
+
+사용법:
+    python tools/streaming_fall_model.py                     # 내보내기 + 검증
+    python tools/streaming_fall_model.py --skip-export       # 기존 npz만 검증
+    python tools/streaming_fall_model.py --states 5 10 30    # 상태 수별 비교
+    python tools/streaming_fall_model.py --skip-export --write-golden  # 기준 TFLite 출력을 골든으로 저장
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+
+# 프로젝트 루트를 Python 경로에 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from Optimized_Walking_Raspberry import (
+    FALL_DETECTION_THRESHOLD, SEQ_LENGTH, STREAMING_FALL_STATES, STRIDE,
+    InferenceRuntime, StreamingFallModel
+)
+from recordings import DATA_DIR, find_recordings, load_recording
+
+H5_MODEL_PATH = os.path.join(ROOT_DIR, 'models', 'results', 'fall_detection_model.h5')
+SOURCE_MODEL_PATH = os.path.join(ROOT_DIR, 'models', 'fall_detection.tflite')
+# Flex 연산을 내장 연산으로 바꾼 기준 모델 (tools/convert_fall_model.py, 가중치/그래프 동일)
+FLOAT_MODEL_PATH = os.path.join(ROOT_DIR, 'models', 'fall_detection_builtin.tflite')
+NPZ_PATH = os.path.join(ROOT_DIR, 'models', 'fall_detection_stream.npz')
+GOLDEN_PATH = os.path.join(ROOT_DIR, 'models', 'fall_detection_golden.npz')
+PORT_TOLERANCE = 1e-4  # numpy 포팅 vs 기준 모델 최대 허용 확률 차이 (float32 연산 순서 차이)
+
+# npz 키 → Keras h5 가중치 경로
+H5_WEIGHTS = {
+    'lstm_kernel': 'lstm/lstm/lstm_cell/kernel:0',
+    'lstm_recurrent_kernel': 'lstm/lstm/lstm_cell/recurrent_kernel:0',
+    'lstm_bias': 'lstm/lstm/lstm_cell/bias:0',
+    'ln_gamma': 'layer_normalization/layer_normalization/gamma:0',
+    'ln_beta': 'layer_normalization/layer_normalization/beta:0',
+    'lstm_1_kernel': 'lstm_1/lstm_1/lstm_cell/kernel:0',
+    'lstm_1_recurrent_kernel': 'lstm_1/lstm_1/lstm_cell/recurrent_kernel:0',
+    'lstm_1_bias': 'lstm_1/lstm_1/lstm_cell/bias:0',
+    'ln_1_gamma': 'layer_normalization_1/layer_normalization_1/gamma:0',
+    'ln_1_beta': 'layer_normalization_1/layer_normalization_1/beta:0',
+    'dense_kernel': 'dense/dense/kernel:0',
+    'dense_bias': 'dense/dense/bias:0',
+    'ln_2_gamma': 'layer_normalization_2/layer_normalization_2/gamma:0',
+    'ln_2_beta': 'layer_normalization_2/layer_normalization_2/beta:0',
+    'dense_1_kernel': 'dense_1/dense_1/kernel:0',
+    'dense_1_bias': 'dense_1/dense_1/bias:0',
+}
+
+def export_weights(h5_path=H5_MODEL_PATH, npz_path=NPZ_PATH):
+    """Keras h5 → npz (라즈베리파이에서는 numpy만으로 로드)"""
+    import h5py
+    with h5py.File(h5_path, 'r') as f:
+        group = f['model_weights']
+        weights = {name: np.asarray(group[path], dtype=np.float32) for name, path in H5_WEIGHTS.items()}
+    np.savez(npz_path, **weights)
+    print(f"💾 {os.path.relpath(npz_path, ROOT_DIR)} ({os.path.getsize(npz_path) / 1024:.1f} KB)")
+
+def load_streams(data_dir=DATA_DIR):
+    """IMU CSV 파일별 연속 샘플 스트림 (정규화된 값)"""
+    streams = []
+    for path in find_recordings(data_dir):
+        samples, _ = load_recording(path)
+        if len(samples) >= SEQ_LENGTH:
+            streams.append(samples)
+    if not streams:
+        raise RuntimeError(f"No IMU streams with at least {SEQ_LENGTH} samples in {data_dir}")
+    return streams
+
+def stride_windows(samples):
+    return [samples[end - SEQ_LENGTH:end] for end in range(SEQ_LENGTH, len(samples) + 1, STRIDE)]
+
+def windowed_reference(streams, model_path=FLOAT_MODEL_PATH):
+    """기존 방식: stride 경계마다 150샘플 윈도우 TFLite 추론 (실행 불가 시 None)"""
+    try:
+        runtime = InferenceRuntime(model_path).load()
+    except ImportError as e:
+        print(f"⚠️ TFLite reference unavailable: {e}")
+        return None, None
+    outputs = []
+    for samples in streams:
+        probabilities = []
+        for window in stride_windows(samples):
+            runtime.set_input(window[np.newaxis])
+            probabilities.append(float(runtime.invoke().flatten()[0]))
+        outputs.append(np.asarray(probabilities))
+    return outputs, runtime.get_stats()
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def write_golden(streams, reference, path=GOLDEN_PATH):
+    """기준 TFLite의 stride별 출력을 입력 스트림과 함께 저장 (모델 해시 포함)"""
+    np.savez_compressed(
+        path,
+        samples=np.concatenate(streams).astype(np.float32),
+        lengths=np.asarray([len(samples) for samples in streams]),
+        probabilities=np.concatenate(reference).astype(np.float32),
+        source_sha256=file_sha256(SOURCE_MODEL_PATH),
+        model_sha256=file_sha256(FLOAT_MODEL_PATH),
+    )
+    print(f"💾 {os.path.relpath(path, ROOT_DIR)} ({os.path.getsize(path) / 1024:.1f} KB)")
+
+def load_golden(path=GOLDEN_PATH):
+    """골든 출력 → (스트림 목록, 스트림별 확률). 없거나 기준 모델과 해시가 다르면 None"""
+    if not os.path.exists(path):
+        print(f"❌ Golden output missing: {os.path.relpath(path, ROOT_DIR)}")
+        return None, None
+    with np.load(path) as golden:
+        if str(golden['source_sha256']) != file_sha256(SOURCE_MODEL_PATH):
+            print(f"❌ Golden output is stale ({os.path.relpath(SOURCE_MODEL_PATH, ROOT_DIR)} changed) - "
+                  f"regenerate with --write-golden")
+            return None, None
+        streams = np.split(golden['samples'], np.cumsum(golden['lengths'])[:-1])
+        probabilities = golden['probabilities']
+    # 스트림별 stride 출력 수 = (길이 - SEQ_LENGTH) // STRIDE + 1
+    counts = [(len(samples) - SEQ_LENGTH) // STRIDE + 1 for samples in streams]
+    return streams, np.split(probabilities, np.cumsum(counts)[:-1])
+
+def numpy_windowed(streams, npz_path=NPZ_PATH):
+    """같은 가중치의 numpy 윈도우 추론 (포팅 검증)"""
+    model = StreamingFallModel.load(npz_path)
+    outputs = []
+    n_windows = 0
+    start = time.perf_counter()
+    for samples in streams:
+        windows = stride_windows(samples)
+        outputs.append(np.asarray([model.predict_window(window) for window in windows]))
+        n_windows += len(windows)
+    window_ms = (time.perf_counter() - start) / n_windows * 1000
+    return outputs, window_ms
+
+def streaming_outputs(streams, num_states, npz_path=NPZ_PATH):
+    """스트리밍 방식: STRIDE 샘플씩 공급하며 같은 경계에서 출력"""
+    model = StreamingFallModel.load(npz_path, num_states=num_states)
+    outputs = []
+    samples_fed = 0
+    start = time.perf_counter()
+    for samples in streams:
+        model.reset()
+        model.push(samples[:SEQ_LENGTH - STRIDE])
+        probabilities = []
+        for end in range(SEQ_LENGTH, len(samples) + 1, STRIDE):
+            probabilities.append(model.update(samples[end - STRIDE:end]))
+        outputs.append(np.asarray(probabilities))
+        samples_fed += len(samples)
+    per_sample_us = (time.perf_counter() - start) / samples_fed * 1e6
+    return outputs, per_sample_us, model
+
+def compare(reference, candidate):
+    reference = np.concatenate(reference)
+    candidate = np.concatenate(candidate)
+    agreement = np.mean((reference >= FALL_DETECTION_THRESHOLD) == (candidate >= FALL_DETECTION_THRESHOLD))
+    diff = np.abs(reference - candidate)
+    return float(agreement), float(diff.max()), float(diff.mean())
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and validate the streaming fall model")
+    parser.add_argument('--skip-export', action='store_true')
+    parser.add_argument('--states', type=int, nargs='+',
+                        default=sorted({STREAMING_FALL_STATES, SEQ_LENGTH // STRIDE}))
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--write-golden', action='store_true', help="기준 TFLite 출력을 골든 파일로 저장")
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        export_weights()
+
+    streams = load_streams(args.data_dir)
+    reference, runtime_stats = windowed_reference(streams)
+    if reference is not None:
+        source = 'TFLite'
+        if args.write_golden:
+            write_golden(streams, reference)
+    elif args.write_golden:
+        sys.exit("❌ --write-golden needs a runnable TFLite reference")
+    else:
+        # 기준 TFLite를 실행할 수 없으면 커밋된 골든 출력(같은 모델, 같은 입력)과 비교
+        source = 'golden'
+        streams, reference = load_golden()
+        if reference is None:
+            sys.exit("❌ No windowed reference: TFLite unavailable and no valid golden output")
+
+    port, window_ms = numpy_windowed(streams)
+    print(f"📥 {len(streams)} streams, {sum(len(p) for p in port)} stride outputs (reference: {source})")
+
+    # numpy 포팅 검증: 윈도우 단위 numpy 추론 == 기준 모델
+    agreement, max_diff, _ = compare(reference, port)
+    print(f"🔍 numpy windowed vs {source}: agreement {agreement:.2%}, max |Δp| {max_diff:.2e}")
+    if max_diff > PORT_TOLERANCE:
+        sys.exit(f"❌ numpy port diverges from the {source} reference (max |Δp| {max_diff:.2e} > {PORT_TOLERANCE})")
+    costs = f"numpy {window_ms * 1000 / STRIDE:.1f}µs/sample"
+    if runtime_stats is not None:
+        costs = f"windowed TFLite {runtime_stats['invoke_ms_mean'] * 1000 / STRIDE:.1f}µs/sample, " + costs
+
+    print(f"\n📊 Streaming vs windowed (threshold {FALL_DETECTION_THRESHOLD}, {costs})")
+    print(f"{'states':>6} {'min context':>11} {'agree':>8} {'max |Δp|':>9} {'mean |Δp|':>10} {'µs/sample':>10}")
+    for num_states in args.states:
+        candidate, per_sample_us, model = streaming_outputs(streams, num_states)
+        agreement, max_diff, mean_diff = compare(reference, candidate)
+        min_context = SEQ_LENGTH - model.period + STRIDE
+        print(f"{num_states:>6} {min_context:>11} {agreement:>8.2%} {max_diff:>9.4f} "
+              f"{mean_diff:>10.5f} {per_sample_us:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+라즈베리파이 스크립트 공용 런타임 헬퍼
+- Optimized_Walking_Raspberry.py와 Compact_ROC_Walking.py가 함께 사용
+- 센서/전송/모델 초기화 같은 모듈 부작용 없이 import 가능 (numpy와 표준 라이브러리만 사용)
+- DeadlineScheduler: 100Hz 절대 데드라인 스케줄러
+- InferenceRuntime: TFLite 인터프리터 지연 로드 (tflite_runtime 우선)
+- load_roc_params: tools/optimize_roc_params.py가 만든 ROC 파라미터 로드
+"""
+
+import json
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+DEFAULT_RATE = 100  # 센서 샘플링 주기 (Hz)
+# 🆕 재학습한 ROC 임계값/가중치 (tools/optimize_roc_params.py로 생성, 없으면 KFall 기본값 사용)
+ROC_PARAMS_PATH = 'models/roc_params.json'
+# 🆕 100Hz 절대 데드라인 스케줄러: 마감 초과 시 'catch_up' (밀린 주기 연속 실행) | 'skip' (밀린 주기 생략) | 'mark' (생략 + 공백 기록)
+MISSED_DEADLINE_POLICY = 'skip'
+MAX_CATCH_UP_SLOTS = DEFAULT_RATE  # catch_up 정책에서 따라잡을 최대 주기 수 (1초)
+# 🆕 추론 런타임: 'auto' (tflite_runtime 우선, 없으면 tensorflow) | 'tflite_runtime' | 'tensorflow'
+INFERENCE_BACKEND = 'auto'
+INFERENCE_NUM_THREADS = 2   # 4코어 중 수집/메인 스레드 몫을 제외한 인터프리터 스레드 수
+USE_XNNPACK = True          # False: 기본 XNNPACK 델리게이트 없이 내장 커널만 사용
+
+def load_roc_params(path=ROC_PARAMS_PATH):
+    """🆕 ROC 파라미터 파일 로드 → {'thresholds', 'weights', ...} (파일이 없거나 손상 시 None)"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            params = json.load(f)
+        params['thresholds'] = {k: float(v) for k, v in params['thresholds'].items()}
+        params['weights'] = {k: float(v) for k, v in params['weights'].items()}
+        missing = [k for k in ('acc_mean_min', 'acc_mean_max', 'acc_std_min', 'step_freq_min',
+                               'step_freq_max', 'regularity_min', 'confidence_min')
+                   if k not in params['thresholds']]
+        if missing:
+            raise KeyError(f"missing thresholds {missing}")
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"⚠️ ROC parameter load failed ({path}): {e} - using KFall defaults")
+        return None
+    return params
+
+def _current_rss_mb():
+    """현재 프로세스 상주 메모리(RSS, MB) - /proc 미지원 시 최대 RSS 사용"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class InferenceRuntime:
+    """
+    TFLite 인터프리터 런타임 계층 (지연 import)
+    - tflite_runtime 우선, 없으면 전체 tensorflow의 tf.lite로 대체
+    - 첫 추론 시점까지 import/모델 로드를 미뤄 시작 시간과 메모리 절약
+    - 백엔드별 시작 시간, RSS 증가량, invoke 지연 통계 제공
+    """
+    BACKENDS = ('tflite_runtime', 'tensorflow')
+
+    def __init__(self, model_path, backend=INFERENCE_BACKEND,
+                 num_threads=INFERENCE_NUM_THREADS, use_xnnpack=USE_XNNPACK, history=1000):
+        if backend != 'auto' and backend not in self.BACKENDS:
+            raise ValueError(f"Unknown inference backend: {backend}")
+        self.model_path = model_path
+        self.requested_backend = backend
+        self.num_threads = num_threads
+        self.use_xnnpack = use_xnnpack
+        self.backend = None
+        self.interpreter = None
+        self._input_index = None
+        self._output_index = None
+        self.load_error = None  # 🔧 MODIFIED: 로드 실패 캐시 (실패 후 매 추론마다 import/로드 재시도 방지)
+        
+        # 통계
+        self.startup_ms = None
+        self.rss_delta_mb = None
+        self.invoke_times = deque(maxlen=history)
+
+    @staticmethod
+    def _import_backend(name):
+        """(Interpreter 클래스, OpResolverType 또는 None) 반환"""
+        if name == 'tflite_runtime':
+            from tflite_runtime import interpreter as tflite
+            return tflite.Interpreter, getattr(tflite, 'OpResolverType', None)
+        import tensorflow as tf
+        return tf.lite.Interpreter, getattr(tf.lite.experimental, 'OpResolverType', None)
+
+    def _create_interpreter(self, name):
+        """인터프리터 생성 + 텐서 할당 + 0 입력 시험 추론 (미지원 연산은 invoke 시점에 드러남)"""
+        interpreter_cls, resolver_type = self._import_backend(name)
+        kwargs = {'model_path': self.model_path, 'num_threads': self.num_threads}
+        if not self.use_xnnpack and resolver_type is not None:
+            kwargs['experimental_op_resolver_type'] = resolver_type.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+        interpreter = interpreter_cls(**kwargs)
+        interpreter.allocate_tensors()
+        input_detail = interpreter.get_input_details()[0]
+        self._input_index = input_detail['index']
+        self._output_index = interpreter.get_output_details()[0]['index']
+        interpreter.set_tensor(self._input_index, np.zeros(input_detail['shape'], dtype=input_detail['dtype']))
+        interpreter.invoke()
+        return interpreter
+
+    def load(self):
+        """런타임 import + 모델 로드 (최초 1회, 실패도 1회만 시도하고 이후 같은 오류를 즉시 재발생)"""
+        if self.interpreter is not None:
+            return self
+        if self.load_error is not None:
+            raise self.load_error
+        
+        start = time.perf_counter()
+        rss_before = _current_rss_mb()
+        candidates = self.BACKENDS if self.requested_backend == 'auto' else (self.requested_backend,)
+        errors = []
+        for name in candidates:
+            try:
+                self.interpreter = self._create_interpreter(name)
+                break
+            except (ImportError, RuntimeError, ValueError) as e:
+                # 예: tflite_runtime에는 Flex(Select TF) 연산이 없음 → 다음 백엔드 시도
+                errors.append(f"{name}: {e}")
+        else:
+            self.load_error = ImportError(f"No TFLite runtime can run {self.model_path} ({'; '.join(errors)})")
+            print(f"❌ Inference runtime load failed (not retried): {self.load_error}")
+            raise self.load_error
+        
+        self.backend = name
+        
+        self.startup_ms = (time.perf_counter() - start) * 1000
+        self.rss_delta_mb = _current_rss_mb() - rss_before
+        print(f"🧠 Inference runtime: {name} (threads: {self.num_threads}, XNNPACK: {self.use_xnnpack}), "
+              f"startup {self.startup_ms:.0f}ms, RSS +{self.rss_delta_mb:.1f}MB")
+        return self
+
+    def set_input(self, array):
+        self.load()
+        self.interpreter.set_tensor(self._input_index, array)
+
+    def invoke(self):
+        """추론 실행 후 출력 텐서 반환"""
+        start = time.perf_counter()
+        self.interpreter.invoke()
+        self.invoke_times.append(time.perf_counter() - start)
+        return self.interpreter.get_tensor(self._output_index)
+
+    def get_stats(self):
+        """백엔드, 시작 시간, RSS 증가량, invoke 지연 통계"""
+        stats = {
+            'backend': self.backend,
+            'load_error': str(self.load_error) if self.load_error else None,
+            'num_threads': self.num_threads,
+            'xnnpack': self.use_xnnpack,
+            'startup_ms': self.startup_ms,
+            'rss_delta_mb': self.rss_delta_mb,
+            'invokes': len(self.invoke_times),
+        }
+        if self.invoke_times:
+            invoke_ms = np.asarray(self.invoke_times) * 1000
+            stats.update({
+                'invoke_ms_mean': float(np.mean(invoke_ms)),
+                'invoke_ms_p99': float(np.percentile(invoke_ms, 99)),
+            })
+        return stats
+
+class DeadlineScheduler:
+    """
+    절대 데드라인 기반 주기 스케줄러 (드리프트 없음)
+    - k번째 샘플 시각 = 시작 시각 + k / rate (작업 시간과 무관하게 고정)
+    - 마감 초과 정책: catch_up / skip / mark
+    - 지터, 마감 초과(overrun), 누락 샘플 통계 제공
+    """
+    POLICIES = ('catch_up', 'skip', 'mark')
+
+    def __init__(self, rate=DEFAULT_RATE, policy=MISSED_DEADLINE_POLICY,
+                 clock=time.monotonic, sleep=time.sleep, history=1000):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown missed-deadline policy: {policy}")
+        self.period = 1.0 / rate
+        self.policy = policy
+        self._clock = clock
+        self._sleep = sleep
+        self._start = None
+        self._deadline = None
+        
+        # 통계
+        self.ticks = 0
+        self.overruns = 0
+        self.missed_slots = 0
+        self.max_lateness = 0.0
+        self.jitter = deque(maxlen=history)
+        self.gaps = deque(maxlen=100)  # mark 정책: (데드라인 시각, 누락 샘플 수)
+
+    def wait(self):
+        """다음 샘플 시각까지 대기. 이번 주기 직전에 건너뛴 샘플 수를 반환 (skip/mark)"""
+        now = self._clock()
+        if self._deadline is None:
+            self._start = self._deadline = now
+            self.ticks = 1
+            return 0
+        
+        self._deadline += self.period
+        missed = 0
+        if now < self._deadline:
+            self._sleep(self._deadline - now)
+        else:
+            lateness = now - self._deadline
+            self.overruns += 1
+            self.max_lateness = max(self.max_lateness, lateness)
+            behind = int(lateness / self.period)
+            if behind and (self.policy != 'catch_up' or behind > MAX_CATCH_UP_SLOTS):
+                # 밀린 주기는 버리고 가장 최근 샘플 시각으로 재정렬 (시작 기준 격자는 유지)
+                missed = behind
+                self._deadline += behind * self.period
+                self.missed_slots += missed
+                if self.policy == 'mark':
+                    self.gaps.append((self._deadline, missed))
+        
+        self.jitter.append(self._clock() - self._deadline)
+        self.ticks += 1
+        return missed
+
+    def get_stats(self):
+        """지터/마감 초과 통계"""
+        stats = {
+            'policy': self.policy,
+            'ticks': self.ticks,
+            'overruns': self.overruns,
+            'missed_slots': self.missed_slots,
+            'max_lateness_ms': self.max_lateness * 1000,
+        }
+        if self.jitter:
+            jitter_ms = np.asarray(self.jitter) * 1000
+            stats.update({
+                'jitter_mean_ms': float(np.mean(jitter_ms)),
+                'jitter_p99_ms': float(np.percentile(jitter_ms, 99)),
+                'jitter_max_ms': float(np.max(jitter_ms)),
+            })
+        if self._start is not None and self.ticks > 1:
+            elapsed = self._clock() - self._start
+            stats['effective_rate_hz'] = (self.ticks - 1) / elapsed if elapsed > 0 else 0.0
+        if self.gaps:
+            stats['last_gap'] = {'deadline': self.gaps[-1][0], 'missed': self.gaps[-1][1]}
+        return stats